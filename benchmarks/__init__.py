@@ -0,0 +1 @@
+"""Benchmarks of the framework's own primitives against the local stand-in site"""
@@ -0,0 +1,78 @@
+from selenium.webdriver.common.by import By
+from pages.twitch_page import TwitchPage
+from utils.artifacts import artifact_pipeline
+from utils.waits import WaitUtils
+
+# Path of the fixture page on the stand-in server
+FIXTURE_PATH = "/static/benchmark.html"
+
+TARGET_BUTTON = (By.ID, "target-button")
+COUNTER_BUTTON = (By.ID, "counter-button")
+TEXT_INPUT = (By.ID, "text-input")
+FAR_TARGET = (By.ID, "far-target")
+MISSING = (By.ID, "does-not-exist")
+POPUP_CLOSE = (By.CSS_SELECTOR, '[data-a-target="modal-close-button"]')
+ITEMS = (By.CSS_SELECTOR, '[data-test-selector="TitleLink"]')
+RESULT_CARDS = (By.CSS_SELECTOR, '[data-a-target="search-result-card"]')
+
+
+class Benchmark:
+    """One primitive to time, with optional untimed setup before every repetition"""
+
+    def __init__(self, name, run, setup=None, max_repetitions=None):
+        """
+        Args:
+            name: Benchmark name used in reports and baselines
+            run: Callable taking the page object; this is what gets timed
+            setup: Callable taking the page object, run untimed before each repetition
+            max_repetitions: Upper bound for slow benchmarks (e.g. absent-element waits)
+        """
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.max_repetitions = max_repetitions
+
+
+def _scroll_to_top(page):
+    page.driver.execute_script("window.scrollTo(0, 0);")
+
+
+def _show_popup(page):
+    page.driver.execute_script("showPopup();")
+
+
+def _take_screenshot_and_flush(page):
+    page.take_screenshot("benchmark")
+    artifact_pipeline.flush()
+
+
+def primitive_benchmarks():
+    """Return the BasePage, TwitchPage and WaitUtils primitives to benchmark, in run order"""
+    return [
+        Benchmark("find_element", lambda page: page.find_element(TARGET_BUTTON)),
+        Benchmark("find_elements", lambda page: page.find_elements(ITEMS)),
+        Benchmark("click", lambda page: page.click(COUNTER_BUTTON)),
+        Benchmark("input_text", lambda page: page.input_text(TEXT_INPUT, "StarCraft II")),
+        Benchmark("scroll_to_element", lambda page: page.scroll_to_element(locator=FAR_TARGET),
+                  setup=_scroll_to_top),
+        Benchmark("is_element_present_hit", lambda page: page.is_element_present(TARGET_BUTTON)),
+        Benchmark("is_element_present_miss", lambda page: page.is_element_present(MISSING),
+                  max_repetitions=5),
+        Benchmark("is_element_present_now_miss", lambda page: page.is_element_present_now(MISSING)),
+        Benchmark("handle_popup", lambda page: page.handle_popup(POPUP_CLOSE), setup=_show_popup),
+        # Capture plus file write, comparable with baselines from before the artifact pipeline
+        Benchmark("take_screenshot", _take_screenshot_and_flush),
+        Benchmark("take_screenshot_queued", lambda page: page.take_screenshot("benchmark")),
+        Benchmark("find_first_of", lambda page: page.find_first_of(
+            [MISSING, (By.CSS_SELECTOR, ".missing"), TARGET_BUTTON], timeout=2)),
+        Benchmark("query_elements", lambda page: page.query_elements(RESULT_CARDS, ("text", "visible"))),
+        Benchmark("wait_for_element_visible", lambda page: WaitUtils.wait_for_element_visible(
+            page.driver, TARGET_BUTTON)),
+        Benchmark("wait_for_dom_idle", lambda page: WaitUtils.wait_for_dom_idle(
+            page.driver, idle_ms=100, timeout=5)),
+    ]
+
+
+def create_page(driver):
+    """Return the page object the benchmarks run against"""
+    return TwitchPage(driver)
@@ -0,0 +1,183 @@
+"""Benchmark the framework's page-object and wait primitives.
+
+Each primitive runs a fixed number of times against a fixture page served by the
+local stand-in site. Latency percentiles and WebDriver round trips per call are
+saved as JSON and can be compared against a baseline.
+
+Usage:
+    python -m benchmarks.run [-r 30] [--headless] [--baseline reports/benchmarks/baseline.json]
+    python -m benchmarks.run --headless --save-baseline
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from config import get_config
+from utils import PROJECT_ROOT
+from utils.artifacts import artifact_pipeline
+from utils.command_metrics import CommandRecorder, percentile
+from utils.driver_factory import DriverFactory
+from utils.standin import StandinServer
+from utils.waits import WaitUtils
+from benchmarks.primitives import FIXTURE_PATH, create_page, primitive_benchmarks
+
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, "reports", "benchmarks")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+def run_benchmarks(page, recorder, benchmarks, repetitions=30, warmup=3):
+    """
+    Time every benchmark and count the WebDriver commands each call issues
+
+    Args:
+        page: Page object on the fixture page
+        recorder: CommandRecorder that instruments page.driver
+        benchmarks: Benchmark definitions, see benchmarks.primitives
+        repetitions: Timed calls per benchmark
+        warmup: Untimed calls per benchmark before measuring
+
+    Returns:
+        dict: benchmark name -> latency percentiles (ms) and round trips per call
+    """
+    results = {}
+    for benchmark in benchmarks:
+        count = min(repetitions, benchmark.max_repetitions or repetitions)
+        durations, round_trips, commands = [], [], {}
+        for index in range(min(warmup, count) + count):
+            if benchmark.setup:
+                benchmark.setup(page)
+            before = len(recorder.records)
+            started = time.perf_counter()
+            benchmark.run(page)
+            elapsed = time.perf_counter() - started
+            if index < min(warmup, count):
+                continue
+            issued = recorder.records[before:]
+            durations.append(elapsed * 1000)
+            round_trips.append(len(issued))
+            for record in issued:
+                commands[record["command"]] = commands.get(record["command"], 0) + 1
+
+        results[benchmark.name] = {
+            "repetitions": count,
+            "p50_ms": percentile(durations, 0.50),
+            "p95_ms": percentile(durations, 0.95),
+            "p99_ms": percentile(durations, 0.99),
+            "mean_ms": statistics.mean(durations),
+            "min_ms": min(durations),
+            "max_ms": max(durations),
+            "round_trips": statistics.mean(round_trips),
+            "commands": {command: total / count for command, total in sorted(commands.items())}
+        }
+        logging.info(f"{benchmark.name}: p50 {results[benchmark.name]['p50_ms']:.1f}ms, "
+                     f"{results[benchmark.name]['round_trips']:.1f} round trips")
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare results with a baseline run
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Results from a previous run
+        tolerance: Allowed relative p50 slowdown before a benchmark counts as regressed
+
+    Returns:
+        list: One dict per benchmark present in both runs, with p50 change and round-trip delta
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0.0
+        round_trip_delta = current["round_trips"] - previous["round_trips"]
+        rows.append({
+            "benchmark": name,
+            "baseline_p50_ms": previous["p50_ms"],
+            "p50_ms": current["p50_ms"],
+            "change": change,
+            "round_trip_delta": round_trip_delta,
+            "regressed": change > tolerance or round_trip_delta > 0
+        })
+    return rows
+
+
+def write_results(path, results, meta):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark framework primitives against the stand-in site")
+    parser.add_argument("-r", "--repetitions", type=int, default=30, help="Timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls per benchmark before measuring")
+    parser.add_argument("--device", default=get_config().get('default_device', 'pixel_2'))
+    parser.add_argument("--headless", action="store_true", help="Run the browser headless")
+    parser.add_argument("--implicit-wait", type=float, default=0,
+                        help="Implicit wait in seconds, defaults to 0 like the driver fixture")
+    parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline to compare against, if it exists")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p50 slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="Also save the results as the baseline")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    benchmarks = [b for b in primitive_benchmarks() if not args.only or b.name in args.only]
+    recorder = CommandRecorder()
+
+    with StandinServer() as server:
+        driver = DriverFactory.create_driver(device_name=args.device, headless=args.headless,
+                                             recorder=recorder, throttling=DriverFactory.NO_THROTTLING)
+        try:
+            WaitUtils.set_implicit_wait(driver, args.implicit_wait)
+            driver.get(server.url + FIXTURE_PATH)
+            results = run_benchmarks(create_page(driver), recorder, benchmarks, args.repetitions, args.warmup)
+        finally:
+            driver.quit()
+            artifact_pipeline.shutdown()
+
+    meta = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "device": args.device,
+        "headless": args.headless,
+        "implicit_wait": args.implicit_wait,
+        "repetitions": args.repetitions,
+        "warmup": args.warmup
+    }
+    print(f"Results written to {write_results(args.output, results, meta)}")
+
+    print(f"\n{'benchmark':<26} {'p50':>9} {'p95':>9} {'p99':>9} {'trips':>6}")
+    for name, stats in results.items():
+        print(f"{name:<26} {stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms {stats['round_trips']:>6.1f}")
+
+    regressed = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)["results"]
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for row in compare(results, baseline, args.tolerance):
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"{row['benchmark']:<26} {row['baseline_p50_ms']:>7.1f}ms -> {row['p50_ms']:>7.1f}ms "
+                  f"({row['change']:+.0%}, {row['round_trip_delta']:+.1f} trips){flag}")
+            if row["regressed"]:
+                regressed.append(row["benchmark"])
+
+    if args.save_baseline:
+        print(f"Baseline saved to {write_results(args.baseline, results, meta)}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,94 @@
 """Configuration for the Twitch test automation framework"""
 
 import os
+import threading
+from types import MappingProxyType
 import yaml
+from utils.exceptions import ConfigurationError
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.yaml")
+
+# Environment overrides: AQA_CONFIG__WAITS__EXPLICIT=5 sets config['waits']['explicit']
+ENV_PREFIX = "AQA_CONFIG__"
+
+# Required keys and the types their values must have
+SCHEMA = {
+    "base_url": str,
+    "waits": {"implicit": (int, float), "explicit": (int, float)},
+    "screenshots": {"path": str}
+}
+
+_lock = threading.Lock()
+_cache = {"key": None, "config": None}
+
+
+def _freeze(value):
+    """Recursively convert dicts and lists into read-only equivalents"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _env_overrides():
+    return tuple(sorted((name, value) for name, value in os.environ.items() if name.startswith(ENV_PREFIX)))
+
+
+def _apply_overrides(data, overrides):
+    for name, raw_value in overrides:
+        path = [part.lower() for part in name[len(ENV_PREFIX):].split("__")]
+        target = data
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+            if not isinstance(target, dict):
+                raise ConfigurationError(f"{name} overrides '{part}', which is not a section")
+        # Parse as YAML so numbers and booleans keep their types
+        target[path[-1]] = yaml.safe_load(raw_value)
+
+
+def _validate(data, schema=SCHEMA, prefix=""):
+    for key, expected in schema.items():
+        if key not in data:
+            raise ConfigurationError(f"Missing required config key '{prefix}{key}'")
+        if isinstance(expected, dict):
+            if not isinstance(data[key], dict):
+                raise ConfigurationError(f"Config key '{prefix}{key}' must be a section")
+            _validate(data[key], expected, f"{prefix}{key}.")
+        elif not isinstance(data[key], expected) or isinstance(data[key], bool):
+            raise ConfigurationError(f"Config key '{prefix}{key}' has invalid value {data[key]!r}")
+
+
+def get_config():
+    """
+    Return the process-wide configuration
+
+    The YAML file is parsed once and cached. It is re-read only when its
+    modification time or the AQA_CONFIG__* environment overrides change.
+
+    Returns:
+        Mapping: Validated, read-only configuration
+
+    Raises:
+        ConfigurationError: If the file is invalid or misses required keys
+    """
+    key = (os.stat(CONFIG_PATH).st_mtime_ns, _env_overrides())
+    with _lock:
+        if _cache["key"] != key:
+            with open(CONFIG_PATH, 'r') as f:
+                data = yaml.safe_load(f) or {}
+            _apply_overrides(data, key[1])
+            _validate(data)
+            _cache["config"] = _freeze(data)
+            _cache["key"] = key
+        return _cache["config"]
+
 
 def load_config():
     """
     Load configuration from config.yaml file
-    
+
     Returns:
-        dict: The loaded configuration
+        Mapping: The loaded configuration (cached and read-only, see get_config)
     """
-    config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
-    
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f) 
\ No newline at end of file
+    return get_config()
@@ -5,17 +5,102 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
 from typing import Any, List, Tuple, Union
 from utils.exceptions import ElementNotFoundError, ElementNotClickableError
-from utils.retry import retry_on_exception
-import yaml
+from config import get_config
+from utils import worker_path
+from utils.artifacts import artifact_pipeline
+from utils.locator_registry import locator_registry
+from utils.retry import remaining_timeout, retry_on_exception
+from utils.waits import WaitUtils
+from utils.web_vitals import web_vitals_collector
 import logging
 import time
 
+# Browser-side equivalents of find_elements for every By strategy, shared by the scripts below
+ELEMENT_QUERY_JS = """
+function isVisible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function query(by, value) {
+    switch (by) {
+        case 'css selector': return Array.from(document.querySelectorAll(value));
+        case 'id': return Array.from(document.querySelectorAll('#' + CSS.escape(value)));
+        case 'name': return Array.from(document.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+        case 'class name': return Array.from(document.getElementsByClassName(value));
+        case 'tag name': return Array.from(document.getElementsByTagName(value));
+        case 'link text':
+            return Array.from(document.querySelectorAll('a')).filter(a => a.innerText.trim() === value);
+        case 'partial link text':
+            return Array.from(document.querySelectorAll('a')).filter(a => a.innerText.includes(value));
+        case 'xpath': {
+            const snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        }
+    }
+    return [];
+}
+"""
+
+# Evaluates the candidate locators in order in one browser round trip and stops at the first
+# match. Returns the index of that locator, its element and the cost in seconds of each
+# query issued, so the candidates after the winner are never queried.
+LOCATOR_RACE_SCRIPT = ELEMENT_QUERY_JS + """
+const candidates = arguments[0];
+const visibleOnly = arguments[1];
+
+const querySeconds = [];
+for (let index = 0; index < candidates.length; index++) {
+    const [by, value] = candidates[index];
+    const started = performance.now();
+    let elements = [];
+    try { elements = query(by, value); } catch (e) { elements = []; }
+    if (visibleOnly) elements = elements.filter(isVisible);
+    querySeconds.push((performance.now() - started) / 1000);
+    if (elements.length) return {index: index, element: elements[0], query_seconds: querySeconds};
+}
+return null;
+"""
+
+# Reads the requested properties of every matching element in one browser round trip.
+# Known properties are computed; any other name is read with getAttribute.
+BULK_QUERY_SCRIPT = ELEMENT_QUERY_JS + """
+const [by, value] = arguments[0];
+const properties = arguments[1];
+const limit = arguments[2];
+
+let elements = query(by, value);
+if (limit) elements = elements.slice(0, limit);
+return elements.map((el) => {
+    const row = {};
+    properties.forEach((property) => {
+        switch (property) {
+            case 'element': row.element = el; break;
+            case 'text': row.text = (el.innerText || el.textContent || '').trim(); break;
+            case 'href': row.href = el.href || el.getAttribute('href'); break;
+            case 'visible': row.visible = isVisible(el); break;
+            case 'tag': row.tag = el.tagName.toLowerCase(); break;
+            case 'value': row.value = el.value; break;
+            case 'rect': {
+                const r = el.getBoundingClientRect();
+                row.rect = {x: r.x, y: r.y, width: r.width, height: r.height};
+                break;
+            }
+            default: row[property] = el.getAttribute(property);
+        }
+    });
+    return row;
+});
+"""
+
 class BasePage:
     def __init__(self, driver: Any) -> None:
         """Initialize base page with WebDriver instance"""
         self.driver = driver
-        with open('config/config.yaml', 'r') as file:
-            self.config = yaml.safe_load(file)
+        self.config = get_config()
         self.wait = WebDriverWait(driver, self.config['waits']['explicit'])
         self.logger = logging.getLogger(__name__)
     
@@ -28,6 +113,7 @@ class BasePage:
             locator: Locator in tuple format (By.ID, 'id_value') or By object
             value: Element identifier (used only if locator is a By object)
             timeout: Custom timeout in seconds, defaults to explicit wait config
+                (capped by the deadline of the retry policy around the call)
             
         Returns:
             WebElement: Found element
@@ -35,7 +121,7 @@ class BasePage:
         Raises:
             ElementNotFoundError: If element cannot be found
         """
-        timeout = timeout or self.config['waits']['explicit']
+        timeout = remaining_timeout(timeout or self.config['waits']['explicit'])
         
         # Handle different locator formats
         if isinstance(locator, tuple) and len(locator) == 2:
@@ -67,7 +153,7 @@ class BasePage:
         Raises:
             ElementNotFoundError: If no elements are found
         """
-        timeout = timeout or self.config['waits']['explicit']
+        timeout = remaining_timeout(timeout or self.config['waits']['explicit'])
         
         # Handle different locator formats
         if isinstance(locator, tuple) and len(locator) == 2:
@@ -83,13 +169,94 @@ class BasePage:
             self.logger.error(f"Failed to find elements {by}='{val}': {str(e)}")
             raise ElementNotFoundError(f"Elements {by}='{val}' not found: {str(e)}")
     
+    def find_first_of(self, locators: List[Tuple], timeout: int = None, visible: bool = False, name: str = None,
+                      interchangeable: bool = False) -> Tuple[Any, Tuple]:
+        """
+        Race several fallback locators and return the first one that matches
+        
+        All candidates are evaluated together in a single browser-side poll, so a
+        lookup costs at most one timeout instead of one timeout per locator. When
+        several locators match, the earliest one in the list wins and the later ones
+        are not queried. Named lookups leave never-matching locators out of the race
+        (see the locator registry) and record their outcome.
+        
+        Args:
+            locators: Candidate locators in priority order, as (By.*, 'value') tuples
+            timeout: Custom timeout in seconds, defaults to explicit wait config
+            visible: Only accept elements that are currently displayed
+            name: Logical element name used for adaptive ranking, e.g. 'browse_button'
+            interchangeable: The locators are alternative spellings of the same element, so
+                named lookups may try the cheapest working one first instead of the declared order
+            
+        Returns:
+            Tuple[WebElement, Tuple]: The matched element and the locator that won
+            
+        Raises:
+            ElementNotFoundError: If no locator matches within the timeout
+        """
+        timeout = remaining_timeout(timeout if timeout is not None else self.config['waits']['explicit'])
+        if name:
+            locators = locator_registry.rank(name, locators, by_latency=interchangeable)
+        candidates = [list(locator) for locator in locators]
+        
+        started = time.time()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(LOCATOR_RACE_SCRIPT, candidates, visible)
+            )
+        except TimeoutException as e:
+            if name:
+                locator_registry.record(name, locators, matched=[], seconds=time.time() - started)
+            self.logger.debug(f"None of {len(locators)} locators matched within {timeout}s")
+            raise ElementNotFoundError(f"None of the locators {locators} matched: {str(e)}")
+        
+        if name:
+            evaluated = len(result['query_seconds'])
+            locator_registry.record(name, locators[:evaluated], matched=[result['index']], winner=result['index'],
+                                    seconds=time.time() - started, query_seconds=result['query_seconds'])
+        winner = locators[result['index']]
+        self.logger.debug(f"Locator race won by {winner}")
+        return result['element'], winner
+    
+    def query_elements(self, locator: Union[Tuple, By, str], properties: List[str] = ('text',), value: str = None,
+                       timeout: int = 0, limit: int = None) -> List[dict]:
+        """
+        Read properties of all matching elements in a single WebDriver round trip
+        
+        Avoids the N+1 pattern of find_elements followed by .text/.get_attribute per element.
+        
+        Args:
+            locator: Locator in tuple format (By.ID, 'id_value') or By object
+            properties: Names to read per element: 'text', 'href', 'visible', 'rect', 'tag',
+                'value', 'element' (the WebElement itself) or any attribute name
+            value: Element identifier (used only if locator is a By object)
+            timeout: Seconds to wait for at least one match (0 returns immediately)
+            limit: Maximum number of elements to return
+            
+        Returns:
+            List[dict]: One dict of property values per element, in document order
+        """
+        # Standardize locator format
+        if not isinstance(locator, tuple):
+            locator = (locator, value)
+        args = (BULK_QUERY_SCRIPT, list(locator), list(properties), limit)
+        
+        if not timeout:
+            return self.driver.execute_script(*args)
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(*args)
+            )
+        except TimeoutException:
+            return []
+    
     @retry_on_exception()
     def click_element(self, element: Any) -> None:
         """
         Click element with retry mechanism
         
         Args:
-            element: WebElement to click
+            element: WebElement to click (a stale element is not retried, re-locate it instead)
             
         Raises:
             ElementNotClickableError: If element cannot be clicked
@@ -186,11 +353,12 @@ class BasePage:
         
         Args:
             times: Number of times to scroll
-            delay: Delay between scrolls in seconds
+            delay: Maximum time in seconds to wait for the scroll to end and new content to settle
         """
         for i in range(times):
             self.driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-            time.sleep(delay)
+            WaitUtils.wait_for_scroll_end(self.driver, timeout=delay)
+            self.wait_for_dom_idle(idle_ms=200, timeout=delay)
             self.logger.info(f'Scrolled page {i + 1} time(s)')
     
     def scroll_to_element(self, element: Any = None, locator: Union[Tuple, By, str] = None, value: str = None) -> None:
@@ -209,7 +377,7 @@ class BasePage:
             
         try:
             self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-            time.sleep(0.5)  # Small delay to let the scroll complete
+            WaitUtils.wait_for_scroll_end(self.driver, timeout=2)
             self.logger.debug("Scrolled to element")
         except Exception as e:
             self.logger.error(f"Failed to scroll to element: {str(e)}")
@@ -238,12 +406,13 @@ class BasePage:
             name: Name for the screenshot file (without extension)
             
         Returns:
-            str: Path to the saved screenshot
+            str: Path of the screenshot (written in the background by the artifact pipeline, or
+                only if the test fails when failure-only retention is on)
         """
-        path = f"{self.config['screenshots']['path']}/{name}.png"
+        path = f"{worker_path(self.config['screenshots']['path'])}/{name}.png"
         try:
-            self.driver.save_screenshot(path)
-            self.logger.info(f'Screenshot saved to {path}')
+            artifact_pipeline.capture(self.driver, path)
+            self.logger.info(f'Screenshot queued for {path}')
             return path
         except Exception as e:
             self.logger.error(f"Failed to take screenshot: {str(e)}")
@@ -291,7 +460,7 @@ class BasePage:
         Returns:
             WebElement: The visible element
         """
-        timeout = timeout or self.config['waits']['explicit']
+        timeout = remaining_timeout(timeout or self.config['waits']['explicit'])
         
         # Standardize locator format
         if not isinstance(locator, tuple):
@@ -305,6 +474,39 @@ class BasePage:
             self.logger.error(f"Element not visible within timeout: {str(e)}")
             raise
     
+    def wait_for_dom_idle(self, idle_ms: int = 500, timeout: int = None) -> dict:
+        """
+        Wait until the page has no DOM mutations and no fetch/XHR in flight for idle_ms
+        
+        Args:
+            idle_ms: Required quiet period in milliseconds
+            timeout: Custom timeout in seconds, defaults to explicit wait config
+            
+        Returns:
+            dict: Result reported by the browser, with 'state' set to 'idle' or 'timeout'
+        """
+        timeout = timeout or self.config['waits']['explicit']
+        result = WaitUtils.wait_for_dom_idle(self.driver, idle_ms=idle_ms, timeout=timeout)
+        if result['state'] != 'idle':
+            self.logger.warning(f"Page not idle after {timeout}s: {result}")
+        return result
+    
+    def collect_navigation_metrics(self, label: str) -> dict:
+        """
+        Record Navigation Timing, resource timing and Web Vitals of the current page
+        
+        Args:
+            label: Name of the navigation, e.g. 'home' or 'streamer'
+            
+        Returns:
+            dict: The collected sample, or None if collection is disabled
+        """
+        return web_vitals_collector.collect(self.driver, label)
+    
+    def mark_soft_navigation(self) -> None:
+        """Mark the start of an in-page (pushState) route change before clicking the link that triggers it"""
+        web_vitals_collector.mark_soft_navigation(self.driver)
+    
     def wait_for_url_contains(self, text: str, timeout: int = None) -> bool:
         """
         Wait for URL to contain specific text
@@ -316,7 +518,7 @@ class BasePage:
         Returns:
             bool: True if condition was met within timeout
         """
-        timeout = timeout or self.config['waits']['explicit']
+        timeout = remaining_timeout(timeout or self.config['waits']['explicit'])
         
         try:
             return WebDriverWait(self.driver, timeout).until(
@@ -333,7 +535,7 @@ class BasePage:
         Args:
             locator: Locator in tuple format (By.ID, 'id_value') or By object
             value: Element identifier (used only if locator is a By object)
-            timeout: Custom timeout in seconds for quick check
+            timeout: Custom timeout in seconds for quick check, 0 checks once without waiting
             
         Returns:
             bool: True if element is present, False otherwise
@@ -342,10 +544,49 @@ class BasePage:
         if not isinstance(locator, tuple):
             locator = (locator, value)
             
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
-            return True
-        except TimeoutException:
-            return False
\ No newline at end of file
+        if not timeout:
+            return self.is_element_present_now(locator)
+            
+        # A scoped implicit wait would stretch every poll of the explicit wait
+        with WaitUtils.implicit_wait(self.driver, 0):
+            try:
+                WebDriverWait(self.driver, remaining_timeout(timeout)).until(
+                    EC.presence_of_element_located(locator)
+                )
+                return True
+            except TimeoutException:
+                return False
+    
+    def is_element_present_now(self, locator: Union[Tuple, By, str], value: str = None) -> bool:
+        """
+        Check if element is on the page right now, without waiting
+        
+        A single find_elements call with the implicit wait at 0, so an absent
+        element costs one WebDriver round trip.
+        
+        Args:
+            locator: Locator in tuple format (By.ID, 'id_value') or By object
+            value: Element identifier (used only if locator is a By object)
+            
+        Returns:
+            bool: True if element is present, False otherwise
+        """
+        if not isinstance(locator, tuple):
+            locator = (locator, value)
+            
+        with WaitUtils.implicit_wait(self.driver, 0):
+            return len(self.driver.find_elements(*locator)) > 0
+    
+    def scoped_implicit_wait(self, seconds: float = None):
+        """
+        Context manager that applies an implicit wait only inside its with-block
+        
+        Args:
+            seconds: Implicit wait in seconds (defaults to waits.implicit from config)
+            
+        Returns:
+            Context manager restoring the previous implicit wait on exit
+        """
+        if seconds is None:
+            seconds = self.config['waits']['implicit']
+        return WaitUtils.implicit_wait(self.driver, seconds)
@@ -92,6 +92,19 @@ class HomePage(TwitchPage):
         self.logger.info("Getting featured streams")
         return self.find_elements(self.FEATURED_STREAMS)
     
+    def get_featured_stream_data(self, properties=('text', 'visible', 'rect')):
+        """
+        Get plain data for all featured streams in one round trip
+        
+        Args:
+            properties: Properties to read per stream (see BasePage.query_elements)
+            
+        Returns:
+            list: One dict per featured stream
+        """
+        self.logger.info("Getting featured stream data")
+        return self.query_elements(self.FEATURED_STREAMS, properties, timeout=self.config['waits']['explicit'])
+    
     def click_featured_stream(self, index=0):
         """
         Click on a featured stream
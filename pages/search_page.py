@@ -45,6 +45,22 @@ class SearchPage(BasePage):
         self.logger.info("Getting search results")
         return self.find_elements(self.SEARCH_RESULTS)
     
+    def get_search_result_data(self, properties=('text', 'href', 'visible'), timeout=None):
+        """
+        Get plain data for all search result cards in one round trip
+        
+        Args:
+            properties: Properties to read per card (see BasePage.query_elements)
+            timeout: Seconds to wait for the first card, defaults to explicit wait config
+            
+        Returns:
+            list: One dict per search result card
+        """
+        timeout = self.config['waits']['explicit'] if timeout is None else timeout
+        results = self.query_elements(self.SEARCH_RESULTS, properties, timeout=timeout)
+        self.logger.info(f"Got data for {len(results)} search results")
+        return results
+    
     def has_results(self):
         """
         Check if search returned any results
@@ -52,7 +68,7 @@ class SearchPage(BasePage):
         Returns:
             bool: True if results exist, False otherwise
         """
-        results = self.get_search_results()
+        results = self.get_search_result_data(properties=('visible',))
         has_results = len(results) > 0
         self.logger.info(f"Search has results: {has_results}")
         return has_results
@@ -1,6 +1,9 @@
 from selenium.webdriver.common.by import By
 from pages.base_page import BasePage
+from utils import worker_path
+from utils.artifacts import artifact_pipeline
 from utils.logging_utils import get_logger
+from utils.waits import WaitUtils
 import time
 import os
 
@@ -36,8 +39,9 @@ class StreamerPage(BasePage):
         """
         self.logger.info("Waiting for video player to load")
         self.wait_for_element_visible(self.VIDEO_PLAYER, timeout)
-        # Additional wait to ensure player is loaded
-        time.sleep(2)
+        # Wait for the video itself to be able to play rather than a fixed delay
+        state = WaitUtils.wait_for_video_ready(self.driver, self.VIDEO_PLAYER[1], timeout)
+        self.logger.info(f"Video player state: {state}")
         return self
     
     def handle_mature_content_warning(self):
@@ -111,19 +115,19 @@ class StreamerPage(BasePage):
             filename: Name of the screenshot file (default: auto-generated)
             
         Returns:
-            str: Path to the saved screenshot
+            str: Path of the screenshot (written in the background by the artifact pipeline)
         """
         if not filename:
             timestamp = time.strftime("%Y%m%d-%H%M%S")
             streamer_name = self.get_streamer_name().replace(" ", "_")[:20]
             filename = f"{streamer_name}_{timestamp}.png"
         
-        screenshots_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                      "reports", "screenshots")
+        screenshots_dir = worker_path(os.path.join(os.path.dirname(os.path.dirname(__file__)), 
+                                                   "reports", "screenshots"))
         os.makedirs(screenshots_dir, exist_ok=True)
         
         screenshot_path = os.path.join(screenshots_dir, filename)
         
-        self.logger.info(f"Taking screenshot: {screenshot_path}")
-        self.driver.save_screenshot(screenshot_path)
+        artifact_pipeline.capture(self.driver, screenshot_path)
+        self.logger.info(f"Screenshot queued for {screenshot_path}")
         return screenshot_path 
\ No newline at end of file
@@ -3,9 +3,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from .base_page import BasePage
+from utils.exceptions import ElementNotFoundError
+from utils.waits import WaitUtils
 from typing import Any
 import random
-import time
 from selenium.webdriver.common.action_chains import ActionChains
 
 class TwitchPage(BasePage):
@@ -24,6 +25,31 @@ class TwitchPage(BasePage):
         (By.CSS_SELECTOR, '[data-test-selector="search-button"]')  # Test selector search button
     ]
     SEARCH_INPUT = (By.CSS_SELECTOR, 'input[aria-label="Search Input"]')  # Updated search input locator
+    SEARCH_INPUTS = [
+        SEARCH_INPUT,
+        (By.CSS_SELECTOR, '[data-a-target="search-input"]'),
+        (By.CSS_SELECTOR, '[data-test-selector="search-input"]'),
+        (By.CSS_SELECTOR, 'input[type="search"]'),
+        (By.CSS_SELECTOR, 'input[placeholder*="Search"]')
+    ]
+    SEARCH_RESULTS = [
+        (By.CSS_SELECTOR, '[data-test-selector="TitleLink"]'),
+        (By.CSS_SELECTOR, '[class*="search-result"]'),
+        (By.CSS_SELECTOR, '[class*="SearchResult"]'),
+        (By.CSS_SELECTOR, 'a[href*="/videos"]'),
+        (By.CSS_SELECTOR, 'a[href*="/channel"]')
+    ]
+    SUGGESTION_ITEMS = [
+        (By.CSS_SELECTOR, '[data-test-selector="search-suggestion"]'),
+        (By.CSS_SELECTOR, '[data-a-target="search-result-item"]'),
+        (By.CSS_SELECTOR, '[aria-label*="search result"]'),
+        (By.CSS_SELECTOR, '.search-result__suggestion'),
+        (By.CSS_SELECTOR, '[class*="search"] [class*="suggestion"]'),
+        (By.CSS_SELECTOR, '[class*="SearchResult"]'),
+        (By.CSS_SELECTOR, 'a[href*="/directory/game"]'),  # Game category links
+        (By.CSS_SELECTOR, 'a[href*="/videos"]'),  # Video links
+        (By.CSS_SELECTOR, 'a[href*="/channel"]')  # Channel links
+    ]
     SEARCH_SUGGESTIONS = (By.CSS_SELECTOR, '[data-test-selector="search-suggestion"]')  # Search suggestions dropdown
     STREAMER_LINK = (By.CSS_SELECTOR, '[data-test-selector="TitleLink"]')
     MATURE_CONTENT_ACCEPT = (By.CSS_SELECTOR, '[data-test-selector="mature-accept-button"]')
@@ -40,9 +66,10 @@ class TwitchPage(BasePage):
     ]
     
     def navigate(self) -> 'TwitchPage':
-        """Navigate to Twitch homepage and wait for it to load"""
-        self.driver.get("https://www.twitch.tv")
+        """Navigate to the configured base_url (Twitch or the stand-in site) and wait for it to load"""
+        self.driver.get(self.config['base_url'])
         self.wait_for_page_load()
+        self.collect_navigation_metrics('home')
         self.set_consent_cookie()
         self.handle_app_promotion()
         return self
@@ -50,23 +77,20 @@ class TwitchPage(BasePage):
     def set_consent_cookie(self) -> None:
         """Handle cookie consent using multiple strategies"""
         # First try clicking the consent button if visible
-        for locator in self.COOKIE_CONSENT_BUTTON:
+        try:
+            element, locator = self.find_first_of(self.COOKIE_CONSENT_BUTTON, timeout=3, name='cookie_consent')
             try:
-                if self.is_element_present(locator, timeout=3):
-                    element = self.find_element(locator)
-                    try:
-                        element.click()
-                    except:
-                        self.driver.execute_script("arguments[0].click();", element)
-                    self.logger.info("Clicked cookie consent button")
-                    # Wait for banner to disappear
-                    WebDriverWait(self.driver, 5).until_not(
-                        EC.presence_of_element_located(locator)
-                    )
-                    return
-            except Exception as e:
-                self.logger.debug(f"Failed to click cookie consent with locator {locator}: {str(e)}")
-                continue
+                element.click()
+            except:
+                self.driver.execute_script("arguments[0].click();", element)
+            self.logger.info(f"Clicked cookie consent button using locator: {locator}")
+            # Wait for banner to disappear
+            WebDriverWait(self.driver, 5).until_not(
+                EC.presence_of_element_located(locator)
+            )
+            return
+        except Exception as e:
+            self.logger.debug(f"Failed to click cookie consent button: {str(e)}")
 
         # If button not found, try setting cookies directly
         try:
@@ -117,14 +141,16 @@ class TwitchPage(BasePage):
             self.logger.debug(f"No app promotion banner found or failed to dismiss: {str(e)}")
     
     def wait_for_page_load(self):
-        """Wait for the page to load completely"""
-        WebDriverWait(self.driver, 20).until(
-            lambda driver: driver.execute_script('return document.readyState') == 'complete'
+        """Wait for the document and main content to load, then briefly for the SPA to go quiet"""
+        WebDriverWait(self.driver, 10).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
         )
-        # Wait for main content to be visible
+        # Wait for main content to be present
         WebDriverWait(self.driver, 10).until(
-            lambda driver: driver.find_element(By.CSS_SELECTOR, 'main') or True
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'main'))
         )
+        # Twitch keeps polling in the background, so the idle wait is only a short settle budget
+        self.wait_for_dom_idle(timeout=3)
     
     def wait_for_navigation(self, old_url):
         """Wait for page URL to change"""
@@ -140,43 +166,42 @@ class TwitchPage(BasePage):
             elements.forEach(el => el.remove());
         """)
         
-        # Try to find and click browse button with multiple locators
-        for browse_locator in self.BROWSE_BUTTON:
+        # Race all browse locators at once
+        try:
+            browse_element, browse_locator = self.find_first_of(self.BROWSE_BUTTON, timeout=3, name='browse_button')
+        except ElementNotFoundError as e:
+            self.logger.debug(f"Failed to find browse button: {str(e)}")
+            raise Exception("Could not find or click browse button with any locator")
+        
+        self.scroll_to_element(browse_element)
+        
+        # Wait for element to be clickable
+        WebDriverWait(self.driver, 5).until(
+            EC.element_to_be_clickable(browse_locator)
+        )
+        
+        # Store current URL to verify navigation
+        old_url = self.driver.current_url
+        # Browse is an in-app route change; metrics should only cover what follows the click
+        self.mark_soft_navigation()
+        
+        # Try multiple click strategies
+        try:
+            actions = ActionChains(self.driver)
+            actions.move_to_element(browse_element).click().perform()
+            self.logger.info(f"Clicked browse button using locator: {browse_locator}")
+        except Exception as e:
+            self.logger.debug(f"Failed to click browse with ActionChains: {str(e)}")
             try:
-                if self.is_element_present(browse_locator, timeout=3):
-                    browse_element = self.find_element(browse_locator)
-                    self.scroll_to_element(browse_element)
-                    
-                    # Wait for element to be clickable
-                    WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable(browse_locator)
-                    )
-                    
-                    # Store current URL to verify navigation
-                    old_url = self.driver.current_url
-                    
-                    # Try multiple click strategies
-                    try:
-                        actions = ActionChains(self.driver)
-                        actions.move_to_element(browse_element).click().perform()
-                        self.logger.info(f"Clicked browse button using locator: {browse_locator}")
-                    except Exception as e:
-                        self.logger.debug(f"Failed to click browse with ActionChains: {str(e)}")
-                        try:
-                            self.driver.execute_script("arguments[0].click();", browse_element)
-                            self.logger.info("Clicked browse button using JavaScript")
-                        except Exception as e:
-                            self.logger.debug(f"Failed to click browse with JavaScript: {str(e)}")
-                            continue
-                    
-                    # Wait for navigation to complete
-                    self.wait_for_navigation(old_url)
-                    return
+                self.driver.execute_script("arguments[0].click();", browse_element)
+                self.logger.info("Clicked browse button using JavaScript")
             except Exception as e:
-                self.logger.debug(f"Failed to find browse button with locator {browse_locator}: {str(e)}")
-                continue
+                self.logger.debug(f"Failed to click browse with JavaScript: {str(e)}")
+                raise Exception("Could not find or click browse button with any locator")
         
-        raise Exception("Could not find or click browse button with any locator")
+        # Wait for navigation to complete
+        self.wait_for_navigation(old_url)
+        self.collect_navigation_metrics('browse')
     
     def click_search(self) -> None:
         """Click Browse button and wait for it to be active"""
@@ -196,28 +221,14 @@ class TwitchPage(BasePage):
     
     def search_for(self, query: str) -> None:
         """Enter search query"""
-        search_locators = [
-            (By.CSS_SELECTOR, 'input[aria-label="Search Input"]'),
-            (By.CSS_SELECTOR, '[data-a-target="search-input"]'),
-            (By.CSS_SELECTOR, '[data-test-selector="search-input"]'),
-            (By.CSS_SELECTOR, 'input[type="search"]'),
-            (By.CSS_SELECTOR, 'input[placeholder*="Search"]')
-        ]
+        try:
+            search_input, _ = self.find_first_of(self.SEARCH_INPUTS, timeout=3, visible=True, name='search_input',
+                                               interchangeable=True)
+        except ElementNotFoundError:
+            raise Exception("Could not find visible search input with any locator")
         
-        # Reduced timeout from 5 to 3 seconds
-        for locator in search_locators:
-            try:
-                search_input = WebDriverWait(self.driver, 3).until(
-                    EC.presence_of_element_located(locator)
-                )
-                if search_input.is_displayed():
-                    search_input.clear()
-                    search_input.send_keys(query)
-                    return
-            except TimeoutException:
-                continue
-                
-        raise Exception("Could not find visible search input with any locator")
+        search_input.clear()
+        search_input.send_keys(query)
     
     def select_streamer(self, index: int = None) -> None:
         """Select streamer from search results"""
@@ -243,8 +254,10 @@ class TwitchPage(BasePage):
         
         self.scroll_to_element(streamer)
         old_url = self.driver.current_url
+        self.mark_soft_navigation()
         self.click_with_actions(streamer)
         self.wait_for_navigation(old_url)
+        self.collect_navigation_metrics('streamer')
         self.logger.info(f'Selected streamer at index {index}')
     
     def handle_mature_content(self) -> None:
@@ -275,109 +288,55 @@ class TwitchPage(BasePage):
     
     def select_first_suggestion(self) -> None:
         """Select the first item from search suggestions dropdown"""
-        # Try different locators for search suggestions
-        suggestion_locators = [
-            (By.CSS_SELECTOR, '[data-test-selector="search-suggestion"]'),
-            (By.CSS_SELECTOR, '[data-a-target="search-result-item"]'),
-            (By.CSS_SELECTOR, '[aria-label*="search result"]'),
-            (By.CSS_SELECTOR, '.search-result__suggestion'),
-            (By.CSS_SELECTOR, '[class*="search"] [class*="suggestion"]'),
-            (By.CSS_SELECTOR, '[class*="SearchResult"]'),
-            (By.CSS_SELECTOR, 'a[href*="/directory/game"]'),  # Game category links
-            (By.CSS_SELECTOR, 'a[href*="/videos"]'),  # Video links
-            (By.CSS_SELECTOR, 'a[href*="/channel"]')  # Channel links
-        ]
-        
-        # Reduced sleep from 1 to 0.5 seconds
-        time.sleep(0.5)
+        # Let the suggestions dropdown finish rendering
+        self.wait_for_dom_idle(idle_ms=200, timeout=2)
         
         # First try - just press Enter which is the simplest approach
         try:
             self.logger.info("Trying primary approach: pressing Enter key on search input")
-            search_locators = [
-                (By.CSS_SELECTOR, 'input[aria-label="Search Input"]'),
-                (By.CSS_SELECTOR, '[data-a-target="search-input"]'),
-                (By.CSS_SELECTOR, 'input[type="search"]')
-            ]
+            search_input, _ = self.find_first_of(self.SEARCH_INPUTS, timeout=3, name='search_input', interchangeable=True)
+            search_input.send_keys("\n")  # Send Enter key
             
-            for locator in search_locators:
-                try:
-                    search_input = self.driver.find_element(*locator)
-                    search_input.send_keys("\n")  # Send Enter key
-                    
-                    # Wait for results
-                    WebDriverWait(self.driver, 5).until(
-                        lambda d: any(
-                            d.find_elements(By.CSS_SELECTOR, selector)
-                            for selector in [
-                                '[data-test-selector="TitleLink"]', 
-                                '[class*="search-result"]',
-                                '[class*="SearchResult"]',
-                                'a[href*="/videos"]',
-                                'a[href*="/channel"]'
-                            ]
-                        )
-                    )
-                    
-                    self.logger.info("Used Enter key to submit search")
-                    return
-                except Exception:
-                    continue
+            # Wait for results
+            self.find_first_of(self.SEARCH_RESULTS, timeout=5, name='search_results')
+            
+            self.logger.info("Used Enter key to submit search")
+            return
         except Exception as e:
             self.logger.debug(f"Enter key approach failed: {str(e)}")
         
         # Second try - click on suggestions
-        for locator in suggestion_locators:
+        try:
+            # Wait for any kind of suggestion to appear
+            self.logger.info("Trying to find search suggestions")
+            suggestion, locator = self.find_first_of(self.SUGGESTION_ITEMS, timeout=3, name='search_suggestion')
+            
+            # Ensure the suggestion is visible
+            self.scroll_to_element(suggestion)
+            
+            # Try different click strategies
             try:
-                # Wait for suggestions to appear
-                self.logger.info(f"Trying to find search suggestions with locator: {locator}")
-                suggestions = WebDriverWait(self.driver, 3).until(
-                    EC.presence_of_all_elements_located(locator)
-                )
-                
-                if not suggestions:
-                    self.logger.warning(f"No suggestions found with locator: {locator}")
-                    continue
-                
-                # Ensure the suggestion is visible
-                self.scroll_to_element(suggestions[0])
-                
-                # Try different click strategies
+                # Try regular click
+                suggestion.click()
+            except Exception as e:
+                self.logger.debug(f"Regular click failed: {str(e)}")
                 try:
-                    # Try regular click
-                    suggestions[0].click()
+                    # Try ActionChains
+                    actions = ActionChains(self.driver)
+                    actions.move_to_element(suggestion).click().perform()
                 except Exception as e:
-                    self.logger.debug(f"Regular click failed: {str(e)}")
-                    try:
-                        # Try ActionChains
-                        actions = ActionChains(self.driver)
-                        actions.move_to_element(suggestions[0]).click().perform()
-                    except Exception as e:
-                        self.logger.debug(f"ActionChains click failed: {str(e)}")
-                        # Try JavaScript click
-                        self.driver.execute_script("arguments[0].click();", suggestions[0])
-                
-                # Wait for navigation or results to load
-                WebDriverWait(self.driver, 5).until(
-                    lambda d: any(
-                        d.find_elements(By.CSS_SELECTOR, selector)
-                        for selector in [
-                            '[data-test-selector="TitleLink"]', 
-                            '[data-a-target="video-player"]',
-                            '[class*="search-result"]',
-                            '[class*="SearchResult"]',
-                            'a[href*="/videos"]',
-                            'a[href*="/channel"]'
-                        ]
-                    )
-                )
-                
-                self.logger.info(f"Successfully selected first search suggestion with locator: {locator}")
-                return
-                
-            except Exception as e:
-                self.logger.debug(f"Failed to select search suggestion with locator {locator}: {str(e)}")
-                continue
+                    self.logger.debug(f"ActionChains click failed: {str(e)}")
+                    # Try JavaScript click
+                    self.driver.execute_script("arguments[0].click();", suggestion)
+            
+            # Wait for navigation or results to load
+            self.find_first_of(self.SEARCH_RESULTS + [(By.CSS_SELECTOR, '[data-a-target="video-player"]')], timeout=5)
+            
+            self.logger.info(f"Successfully selected first search suggestion with locator: {locator}")
+            return
+            
+        except Exception as e:
+            self.logger.debug(f"Failed to select search suggestion: {str(e)}")
         
         # Third try - direct URL navigation
         try:
@@ -385,12 +344,13 @@ class TwitchPage(BasePage):
             if query:
                 self.logger.info(f"Trying direct URL navigation for query: {query}")
                 url_query = query.replace(' ', '%20')
-                self.driver.get(f"https://www.twitch.tv/search?term={url_query}")
+                self.driver.get(f"{self.config['base_url']}/search?term={url_query}")
                 
                 # Wait for page to load
                 WebDriverWait(self.driver, 10).until(
                     lambda d: d.find_element(By.CSS_SELECTOR, 'main').is_displayed()
                 )
+                self.collect_navigation_metrics('search_direct')
                 self.logger.info("Successfully navigated directly to search results")
                 return
         except Exception as e:
@@ -400,10 +360,11 @@ class TwitchPage(BasePage):
         try:
             self.logger.info("Using fallback: ensuring we're on a valid page")
             if not self.driver.find_element(By.CSS_SELECTOR, 'main').is_displayed():
-                self.driver.get("https://www.twitch.tv")
+                self.driver.get(self.config['base_url'])
                 WebDriverWait(self.driver, 10).until(
                     lambda d: d.find_element(By.CSS_SELECTOR, 'main').is_displayed()
                 )
+                self.collect_navigation_metrics('home_fallback')
             return
         except Exception as e:
             self.logger.error(f"Final fallback failed: {str(e)}")
@@ -1,27 +1,107 @@
 import pytest
-import yaml
+import json
 import logging
 import os
+import warnings
 from datetime import datetime
-from utils.driver_factory import DriverFactory
+from functools import partial
+from config import ENV_PREFIX, get_config
+from utils import PROJECT_ROOT, get_worker_id, worker_path
+from utils.artifacts import artifact_pipeline
+from utils.driver_factory import DriverFactory, DriverPool
+from utils.gif_generator import GifGenerator
+from utils.command_metrics import command_recorder
+from utils.locator_registry import locator_registry
+from utils.resource_blocking import resource_blocker
+from utils.retry import retry_metrics
+from utils.standin import StandinServer
+from utils.step_budgets import StepBudgetWarning, describe, evaluate_steps, resolve_budgets
+from utils.test_history import HISTORY_DIR, DurationHistory, history_path_for_worker, step_timer
+from utils.traffic import TrafficArchive, archive_name
+from utils.waits import WaitUtils
+from utils.web_vitals import METRICS_DIR, web_vitals_collector
+
+# Per-test timing state, filled by the reporting hooks below
+_duration_history = None
+_baseline_history = None
+_phase_durations = {}
+_step_durations = {}
+_step_reports = []
+_traffic_totals = {'recorded': 0, 'served': 0, 'missed': 0}
 
 @pytest.fixture(scope='session', autouse=True)
-def setup_logging():
-    """Set up logging configuration"""
+def setup_logging(request):
+    """Set up logging configuration (no session log file when only failures keep artifacts)"""
+    handlers = [logging.StreamHandler()]
+    if _retention_mode(request.config) != 'failures':
+        handlers.insert(0, logging.FileHandler(f"test_execution{'_' + get_worker_id() if get_worker_id() else ''}.log"))
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('test_execution.log'),
-            logging.StreamHandler()
-        ]
+        handlers=handlers
     )
 
+def _retention_mode(pytest_config):
+    """'all' writes every artifact, 'failures' buffers them in memory until a test fails"""
+    return pytest_config.getoption("--artifacts") or get_config().get('retention', {}).get('mode', 'all')
+
+@pytest.fixture(autouse=True)
+def artifact_retention(request):
+    """
+    Keep the test's step screenshots and log lines in memory and write them only if it fails
+
+    Autouse, so it is set up before the driver fixture and its teardown (which writes
+    the kept artifacts) runs after the driver's failure screenshot.
+    """
+    if _retention_mode(request.config) != 'failures':
+        yield None
+        return
+    
+    settings = get_config().get('retention', {})
+    buffer = artifact_pipeline.start_retention(max_frames=settings.get('max_frames', 20),
+                                               max_log_lines=settings.get('max_log_lines', 1000))
+    yield buffer
+    
+    failed = any(getattr(request.node, f"rep_{when}", None) is not None and getattr(request.node, f"rep_{when}").failed
+                 for when in ('setup', 'call'))
+    keep = failed or request.node.get_closest_marker('capture_artifacts') is not None
+    log_path = None
+    if keep:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        log_path = os.path.join(worker_path(os.path.join(PROJECT_ROOT, "reports", "logs")),
+                                f"{request.node.name}_{timestamp}.log")
+    written = artifact_pipeline.finish_retention(keep, log_path)
+    if keep:
+        logging.info(f"Kept {written} buffered screenshots and the test log of {request.node.name}")
+    artifact_pipeline.attach_pending()
+
+@pytest.fixture(scope='session', autouse=True)
+def standin(request):
+    """Serve the local stand-in site and point base_url at it when --standin is given"""
+    if not request.config.getoption("--standin"):
+        yield None
+        return
+    
+    server = StandinServer.from_config(get_config().get('standin', {})).start()
+    env_name = f"{ENV_PREFIX}BASE_URL"
+    previous = os.environ.get(env_name)
+    # get_config() picks up the override, so page objects and fixtures see the stand-in URL
+    os.environ[env_name] = server.url
+    logging.info(f"Running against the stand-in site at {server.url}")
+    yield server
+    
+    if previous is None:
+        os.environ.pop(env_name, None)
+    else:
+        os.environ[env_name] = previous
+    server.stop()
+
 @pytest.fixture(scope='session')
-def config():
-    """Load test configuration"""
-    with open('config/config.yaml', 'r') as file:
-        return yaml.safe_load(file)
+def config(standin):
+    """Load test configuration (shared, cached instance also used by page objects)"""
+    config = get_config()
+    artifact_pipeline.configure(config.get('artifacts'))
+    return config
 
 @pytest.fixture
 def device(request):
@@ -38,38 +118,354 @@ def headless(request):
     """Get headless mode from command line or use default"""
     return request.config.getoption("--headless")
 
+@pytest.fixture
+def throttling(config, request):
+    """Throttling profile: the --throttle-sweep parameter, --throttle, the throttle marker, or the configured default (none)"""
+    if hasattr(request, 'param'):
+        return request.param
+    option = request.config.getoption("--throttle")
+    if option:
+        return option
+    marker = request.node.get_closest_marker('throttle')
+    if marker is not None:
+        # A bare marker selects the device's own profile from devices.json
+        return marker.args[0] if marker.args else DriverFactory.DEVICE_PROFILE
+    return config.get('throttling', {}).get('profile', DriverFactory.NO_THROTTLING)
+
+@pytest.fixture
+def blocked_resources(config, request):
+    """Blocklists for this test: the block_resources marker, --block, or the configured default"""
+    marker = request.node.get_closest_marker('block_resources')
+    blocking_config = config.get('resource_blocking', {})
+    if marker is not None:
+        # A bare marker (or the @block_resources feature tag) selects the functional-run lists
+        return list(marker.args) or list(blocking_config.get('functional', []))
+    option = request.config.getoption("--block")
+    if option is not None:
+        return [name.strip() for name in option.split(',') if name.strip() and name.strip() != 'none']
+    return list(blocking_config.get('default', []))
+
+@pytest.fixture
+def traffic(config, request):
+    """Traffic mode ('live', 'record' or 'replay') and the scenario archive for record/replay runs"""
+    traffic_config = config.get('traffic', {})
+    mode = request.config.getoption("--traffic") or traffic_config.get('mode', 'live')
+    if mode == 'live':
+        return mode, None
+    
+    # Throttling does not change what is served, so all profiles share one recording
+    callspec = getattr(request.node, 'callspec', None)
+    params = {name: value for name, value in callspec.params.items() if name != 'throttling'} if callspec else {}
+    module = request.node.module.__name__.rsplit('.', 1)[-1]
+    archive = TrafficArchive(
+        os.path.join(PROJECT_ROOT, traffic_config.get('archive_dir', 'data/traffic')),
+        archive_name(f"{module}.{request.node.originalname}", params),
+        ignore_params=traffic_config.get('ignore_params', [])
+    )
+    if mode == 'replay':
+        if not archive.exists():
+            pytest.skip(f"No recorded traffic for '{archive.name}', run once with --traffic=record")
+        archive.load()
+    return mode, archive
+
+@pytest.fixture(scope='session')
+def recorder(request):
+    """Command recorder when --instrument-commands is given, otherwise None"""
+    return command_recorder if request.config.getoption("--instrument-commands") else None
+
+@pytest.fixture(scope='session')
+def driver_pool(config, recorder, request):
+    """Session-wide pool of warm drivers, or None when pooling is disabled"""
+    pool_config = config.get('driver_pool', {})
+    size = request.config.getoption("--pool-size")
+    if size is None:
+        size = pool_config.get('size', 0)
+    
+    if not size:
+        yield None
+        return
+    
+    max_uses = request.config.getoption("--pool-max-uses") or pool_config.get('max_uses', 20)
+    pool = DriverPool(size=size, max_uses=max_uses,
+                      creator=partial(DriverFactory.create_driver, recorder=recorder))
+    yield pool
+    pool.shutdown()
+
 @pytest.fixture(scope='function')
-def driver(config, device, browser, headless, request):
-    """Set up WebDriver with mobile emulation using DriverFactory"""
-    driver = DriverFactory.create_driver(
-        device_name=device, 
-        browser_type=browser,
-        headless=headless
+def driver(config, device, browser, headless, throttling, blocked_resources, traffic, driver_pool, recorder, request):
+    """Set up WebDriver with mobile emulation using DriverFactory (pooled when enabled)"""
+    if recorder is not None:
+        recorder.start_test(request.node.nodeid)
+    
+    # The network log also feeds the resource size estimates, which only unblocked loads can measure
+    network_log = bool(blocked_resources) or bool(config.get('resource_blocking', {}).get('learn_sizes', False))
+    
+    if driver_pool is not None:
+        driver = driver_pool.acquire(device_name=device, browser_type=browser, headless=headless,
+                                     throttling=throttling, network_log=network_log)
+    else:
+        driver = DriverFactory.create_driver(
+            device_name=device, 
+            browser_type=browser,
+            headless=headless,
+            recorder=recorder,
+            throttling=throttling,
+            network_log=network_log
+        )
+    
+    # No global implicit wait: every find_elements miss would stall for it.
+    # Reset on pooled drivers too; BasePage.scoped_implicit_wait() applies one where needed
+    WaitUtils.set_implicit_wait(driver, 0)
+    # Always applied so a pooled driver never keeps the previous test's blocklists
+    resource_blocker.apply(driver, blocked_resources)
+    
+    traffic_mode, archive = traffic
+    latency = request.config.getoption("--traffic-latency") or config.get('traffic', {}).get('latency', 0)
+    interceptor = DriverFactory.start_traffic(
+        driver, archive, traffic_mode,
+        latency=latency if latency == 'recorded' else float(latency),
+        on_miss=config.get('traffic', {}).get('on_miss', 'fail')
     )
     
-    driver.implicitly_wait(config['waits']['implicit'])
+    # A screencast replaces the per-step screenshots of tests that check for it
+    screencast_settings = config.get('screencast', {})
+    screencast_mode = request.config.getoption("--screencast") or screencast_settings.get('mode', 'off')
+    screencast = None
+    if screencast_mode != 'off':
+        screencast = DriverFactory.start_screencast(driver, screencast_settings)
+    driver._aqa_screencast = screencast
+    
+    # Tag web vitals samples so the time series can be split per test and device profile
+    web_vitals_collector.enabled = config.get('web_vitals', {}).get('enabled', True)
+    web_vitals_collector.context = {'test': request.node.nodeid, 'device': device, 'browser': browser,
+                                    'throttling': throttling}
     
-    # Create screenshots directory if it doesn't exist
-    os.makedirs(config['screenshots']['path'], exist_ok=True)
+    # Create screenshots directory if it doesn't exist (one per parallel worker)
+    screenshots_path = worker_path(config['screenshots']['path'])
+    os.makedirs(screenshots_path, exist_ok=True)
     
     yield driver
     
+    failed = hasattr(request.node, 'rep_call') and request.node.rep_call.failed
+    
     # Take screenshot on test failure
-    if hasattr(request.node, 'rep_call') and request.node.rep_call.failed:
+    if failed:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        screenshot_path = f"{config['screenshots']['path']}/failure_{request.node.name}_{timestamp}.png"
-        driver.save_screenshot(screenshot_path)
-        logging.info(f'Failure screenshot saved to {screenshot_path}')
+        screenshot_path = f"{screenshots_path}/failure_{request.node.name}_{timestamp}.png"
+        artifact_pipeline.capture(driver, screenshot_path, attach_name=f"failure_{request.node.name}")
+        logging.info(f'Failure screenshot queued for {screenshot_path}')
+    if screencast is not None:
+        screencast.stop()
+        driver._aqa_screencast = None
+        if failed or screencast_mode == 'always':
+            artifact_pipeline.submit(screencast.save, GifGenerator(), f"screencast_{request.node.name}",
+                                     screencast_settings.get('format', 'gif'))
+        else:
+            screencast.discard()
+    
+    # Allure attaches to the test on this thread, so queued attachments are registered here
+    artifact_pipeline.attach_pending()
+    
+    web_vitals_collector.context = {}
+    
+    if interceptor is not None:
+        traffic_stats = interceptor.stop()
+        request.node.user_properties.append(('traffic', traffic_stats))
+        for key, count in traffic_stats.items():
+            _traffic_totals[key] += count
+    
+    blocking = resource_blocker.collect(driver)
+    if blocking['blocked_requests']:
+        request.node.user_properties.append(('resource_blocking', blocking))
+        logging.info(f"Blocked {blocking['blocked_requests']} requests, "
+                     f"~{blocking['estimated_bytes_saved'] / 1024:.0f} KiB saved")
     
-    driver.quit()
+    if recorder is not None:
+        recorder.stop_test()
+    
+    if driver_pool is not None:
+        driver_pool.release(driver)
+    else:
+        driver.quit()
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
-    """Hook to store test result for screenshot capture"""
+    """Hook to store test result for screenshot capture and enforce step budgets"""
     outcome = yield
     rep = outcome.get_result()
+    if rep.when == 'call':
+        _check_step_budgets(item, rep)
     setattr(item, f"rep_{rep.when}", rep)
 
+def _check_step_budgets(item, rep):
+    """Compare the test's step durations with budgets and baselines, warning or failing as configured"""
+    steps = step_timer.collect()
+    # Only browser tests go into the duration history; browser-free unit tests would skew LPT estimates
+    if steps or 'driver' in getattr(item, 'fixturenames', ()):
+        _step_durations[item.nodeid] = steps
+    if not steps:
+        return
+    
+    budget_config = get_config().get('step_budgets', {})
+    marker = item.get_closest_marker('step_budget')
+    marker_budgets = dict(marker.args[0]) if marker and marker.args else {}
+    mode = (marker.kwargs.get('mode') if marker else None) or budget_config.get('mode', 'warn')
+    
+    results = evaluate_steps(
+        steps,
+        resolve_budgets(getattr(item, 'originalname', item.name), budget_config, marker_budgets),
+        {step: _baseline_history.step_samples(item.nodeid, step) for step in steps},
+        regression_factor=budget_config.get('regression_factor', 1.5),
+        min_samples=budget_config.get('baseline_samples', 3)
+    )
+    item.user_properties.append(("step_durations", json.dumps(results)))
+    _step_reports.append({"test": item.nodeid, "mode": mode, "steps": results})
+    
+    failures = []
+    for result in results:
+        if result['status'] == 'ok':
+            continue
+        message = describe(result)
+        if result['status'] == 'over_budget' and mode == 'fail':
+            failures.append(message)
+        else:
+            logging.warning(f"{item.nodeid}: {message}")
+            warnings.warn(StepBudgetWarning(f"{item.nodeid}: {message}"))
+    
+    if failures and rep.passed:
+        rep.outcome = 'failed'
+        rep.longrepr = "Step budget exceeded:\n" + "\n".join(failures)
+
+def pytest_configure(config):
+    """Open the duration history for this process (workers start from an empty file)"""
+    global _duration_history, _baseline_history
+    if config.getoption("--artifacts"):
+        # Seen by get_config() everywhere, e.g. the BDD step logger created when step modules are imported
+        os.environ[f"{ENV_PREFIX}RETENTION__MODE"] = config.getoption("--artifacts")
+    _duration_history = DurationHistory(path=history_path_for_worker(), load=not get_worker_id())
+    # Step baselines always come from the merged history of previous runs
+    _baseline_history = DurationHistory()
+
+def pytest_runtest_logreport(report):
+    """Record total test duration and step timings into the duration history"""
+    _phase_durations[report.nodeid] = _phase_durations.get(report.nodeid, 0.0) + report.duration
+    if report.when == 'teardown':
+        total = _phase_durations.pop(report.nodeid)
+        if report.nodeid in _step_durations:
+            _duration_history.record(report.nodeid, total, _step_durations.pop(report.nodeid))
+
+def pytest_sessionfinish(session):
+    """Persist collected durations, step budget results, locator and retry statistics; flush artifacts"""
+    if _duration_history is not None and _duration_history.dirty:
+        _duration_history.save()
+    if _step_reports:
+        suffix = f"_{get_worker_id()}" if get_worker_id() else ""
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        with open(os.path.join(HISTORY_DIR, f"step_report{suffix}.json"), 'w') as f:
+            json.dump(_step_reports, f, indent=2)
+    artifact_pipeline.shutdown()
+    locator_registry.save()
+    resource_blocker.save()
+    if retry_metrics.operations:
+        suffix = f"_{get_worker_id()}" if get_worker_id() else ""
+        retry_metrics.save(os.path.join(METRICS_DIR, f"retries{suffix}.json"))
+
+def pytest_bdd_before_step(request, feature, scenario, step, step_func):
+    """Time each BDD step like log_step does for plain tests"""
+    step_timer.start(step.name)
+
+def pytest_bdd_after_step(request, feature, scenario, step, step_func, step_func_args):
+    """Stop timing the finished BDD step"""
+    step_timer.finish()
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report driver resolution, artifacts, traffic replay, resource blocking, retries, web vitals and command latency"""
+    summary = DriverFactory.resolver.summary()
+    if summary:
+        terminalreporter.write_sep("-", "driver binary resolution")
+        for browser, stats in summary.items():
+            terminalreporter.write_line(
+                f"{browser}: {stats['calls']} call(s), {stats['total_seconds']:.3f}s total, "
+                f"first from {stats['first_source']} in {stats['first_seconds']:.3f}s"
+            )
+    
+    artifacts = artifact_pipeline.stats
+    if artifacts['jobs'] or artifacts['tests_discarded']:
+        terminalreporter.write_sep("-", "artifacts")
+        terminalreporter.write_line(
+            f"{artifacts['captures']} screenshots captured in {artifacts['capture_seconds']:.2f}s on test threads "
+            f"(+{artifacts['blocked_seconds']:.2f}s backpressure), {artifacts['jobs']} jobs took "
+            f"{artifacts['background_seconds']:.2f}s in the background, {artifacts['failed']} failed"
+        )
+        if artifacts['tests_kept'] or artifacts['tests_discarded']:
+            terminalreporter.write_line(
+                f"Failure-only retention: artifacts of {artifacts['tests_kept']} test(s) written, "
+                f"{artifacts['tests_discarded']} discarded (~{artifacts['bytes_discarded'] / 1024 / 1024:.1f} MiB not written)"
+            )
+    
+    if any(_traffic_totals.values()):
+        terminalreporter.write_sep("-", "traffic record/replay")
+        terminalreporter.write_line(
+            f"{_traffic_totals['recorded']} responses recorded, {_traffic_totals['served']} served from archive, "
+            f"{_traffic_totals['missed']} missing from archive"
+        )
+    
+    if resource_blocker.totals['requests']:
+        terminalreporter.write_sep("-", "resource blocking")
+        terminalreporter.write_line(
+            f"{resource_blocker.totals['requests']} requests blocked, "
+            f"~{resource_blocker.totals['bytes'] / 1024 / 1024:.1f} MiB saved (estimated)"
+        )
+        if resource_blocker.unlearned_types:
+            terminalreporter.write_line(
+                f"No measured size for {', '.join(sorted(resource_blocker.unlearned_types))} yet, typical sizes "
+                f"from config/blocklists.json used; run once with resource_blocking.learn_sizes enabled to measure them"
+            )
+    
+    retried = {name: stats for name, stats in retry_metrics.summary().items() if stats['retries']}
+    if retried:
+        terminalreporter.write_sep("-", "retries")
+        for name, stats in retried.items():
+            outcomes = ", ".join(f"{outcome} {count}" for outcome, count in stats['outcomes'].items())
+            terminalreporter.write_line(
+                f"{name}: {stats['retries']} retries over {stats['retried_calls']} call(s), "
+                f"{stats['retried_seconds']:.1f}s in retried calls ({outcomes})"
+            )
+    
+    if os.path.exists(web_vitals_collector.output_path):
+        terminalreporter.write_line(f"Web vitals time series: {web_vitals_collector.output_path}")
+    
+    if config.getoption("--instrument-commands") and command_recorder.records:
+        top = config.getoption("--slowest-commands")
+        suffix = f"_{get_worker_id()}" if get_worker_id() else ""
+        report_path = command_recorder.write_json(
+            os.path.join(PROJECT_ROOT, "reports", f"command_metrics{suffix}.json"), slowest=top
+        )
+        terminalreporter.write_sep("-", "webdriver command latency")
+        for test_id, stats in command_recorder.test_summary().items():
+            terminalreporter.write_line(
+                f"{test_id}: {stats['commands']} commands, {stats['total_seconds']:.2f}s total, "
+                f"p50 {stats['p50_seconds'] * 1000:.0f}ms, p95 {stats['p95_seconds'] * 1000:.0f}ms"
+            )
+        terminalreporter.write_line(f"Slowest {top} commands:")
+        for record in command_recorder.slowest(top):
+            terminalreporter.write_line(
+                f"  {record['seconds'] * 1000:8.0f}ms  {record['command']:<22} {record['caller']}  ({record['test']})"
+            )
+        terminalreporter.write_line(f"Full report: {report_path}")
+
+def pytest_generate_tests(metafunc):
+    """Parametrize driver tests over throttling profiles when --throttle-sweep is given"""
+    sweep = metafunc.config.getoption("--throttle-sweep")
+    if not sweep or 'throttling' not in metafunc.fixturenames:
+        return
+    if sweep == 'all':
+        with open(DriverFactory.THROTTLING_PROFILES_PATH, 'r') as f:
+            profiles = list(json.load(f)) + [DriverFactory.NO_THROTTLING]
+    else:
+        profiles = [profile.strip() for profile in sweep.split(',') if profile.strip()]
+    metafunc.parametrize('throttling', profiles, indirect=True, ids=[f"throttle-{p}" for p in profiles])
+
 def pytest_addoption(parser):
     """Add command line options for device, browser, and headless mode"""
     parser.addoption("--device", action="store", default="pixel_2", 
@@ -77,4 +473,28 @@ def pytest_addoption(parser):
     parser.addoption("--browser", action="store", default="chrome", 
                      help="Browser to use for tests")
     parser.addoption("--headless", action="store_true", default=False, 
-                     help="Run browser in headless mode")
\ No newline at end of file
+                     help="Run browser in headless mode")
+    parser.addoption("--throttle", action="store", default=None,
+                     help="Network/CPU throttling profile from throttling_profiles.json, 'device' or 'none'")
+    parser.addoption("--throttle-sweep", action="store", default=None,
+                     help="Comma-separated throttling profiles (or 'all') to run every driver test under")
+    parser.addoption("--block", action="store", default=None,
+                     help="Comma-separated blocklists from blocklists.json (media, images, fonts, analytics, third_party) or 'none'")
+    parser.addoption("--traffic", action="store", default=None, choices=["live", "record", "replay"],
+                     help="Run against the live site, record responses to the archive, or replay them offline")
+    parser.addoption("--traffic-latency", action="store", default=None,
+                     help="Replay delay per response in ms, or 'recorded' to reuse the recorded latency")
+    parser.addoption("--screencast", action="store", default=None, choices=["off", "failures", "always"],
+                     help="Record tests with the DevTools screencast: keep recordings of failed tests or of all tests")
+    parser.addoption("--artifacts", action="store", default=None, choices=["all", "failures"],
+                     help="Write step screenshots and logs for all tests, or only for failed and capture_artifacts tests")
+    parser.addoption("--standin", action="store_true", default=False,
+                     help="Run against the bundled local stand-in site instead of twitch.tv")
+    parser.addoption("--pool-size", action="store", type=int, default=None,
+                     help="Warm drivers to keep per device/browser (0 disables pooling)")
+    parser.addoption("--pool-max-uses", action="store", type=int, default=None,
+                     help="Number of tests a pooled driver serves before it is replaced")
+    parser.addoption("--instrument-commands", action="store_true", default=False,
+                     help="Record duration, payload size and caller of every WebDriver command")
+    parser.addoption("--slowest-commands", action="store", type=int, default=10,
+                     help="Number of slowest WebDriver commands to report when instrumented")
\ No newline at end of file
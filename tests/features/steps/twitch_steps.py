@@ -1,6 +1,5 @@
 import pytest
 from pytest_bdd import given, when, then, parsers
-import time
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
 from pages.streamer_page import StreamerPage
@@ -36,9 +35,8 @@ def scroll_down(driver, count):
     """Scroll down a number of times."""
     logger.info(f"Scrolling down {count} times")
     search_page = SearchPage(driver)
-    for _ in range(count):
-        search_page.scroll_down()
-        time.sleep(1)  # Small delay between scrolls
+    # Each scroll waits for scroll end and for new content to settle
+    search_page.scroll_page(count)
     return search_page
 
 @then("I should see search results")
@@ -104,5 +102,5 @@ def take_screenshot(driver):
     logger.info("Taking screenshot")
     streamer_page = StreamerPage(driver)
     screenshot_path = streamer_page.take_screenshot()
-    logger.info(f"Screenshot saved to: {screenshot_path}")
+    logger.info(f"Screenshot queued for: {screenshot_path}")
     return streamer_page 
\ No newline at end of file
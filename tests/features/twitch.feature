@@ -23,6 +23,7 @@ Feature: Twitch Mobile Search
     And the video should play
     And I take a screenshot
 
+  @block_resources
   Scenario Outline: Search for different games
     When I click on the search button
     And I search for "<game>"
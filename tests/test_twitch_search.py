@@ -1,7 +1,12 @@
 import pytest
 import allure
+from config import get_config
 from pages.twitch_page import TwitchPage
+from utils import worker_path
+from utils.artifacts import artifact_pipeline
 from utils.gif_generator import GifGenerator
+from utils.test_history import step_timer
+from utils.waits import WaitUtils
 import logging
 import time
 import os
@@ -15,8 +20,18 @@ DEVICES = ["Pixel 2"]  # Using valid Chrome device name
 BROWSERS = ["chrome"]  # Using only chrome for demo
 SEARCH_QUERIES = ["StarCraft II"]  # Using only one query for demo
 
+def screencast_active(driver):
+    """Whether the driver fixture is recording this test with the DevTools screencast"""
+    return getattr(driver, '_aqa_screencast', None) is not None
+
+def capture_step(driver, screenshots_dir, name):
+    """Queue a step screenshot, unless a screencast already records the test"""
+    if not screencast_active(driver):
+        artifact_pipeline.capture(driver, os.path.join(screenshots_dir, name))
+
 def log_step(logger, step_number, step_description):
-    """Log test step with timestamp and formatting"""
+    """Log test step with timestamp and formatting, and start timing it for the duration history"""
+    step_timer.start(step_number)
     timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
     logger.info(f"\n[{timestamp}] Step {step_number}: {step_description}")
     return time.time()
@@ -67,7 +82,7 @@ class TestTwitchSearch:
         
         # Create screenshots directory for this test run
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        screenshots_dir = f'./screenshots/test_run_{device}_{browser}_{timestamp}'
+        screenshots_dir = os.path.join(worker_path('./screenshots'), f'test_run_{device}_{browser}_{timestamp}')
         os.makedirs(screenshots_dir, exist_ok=True)
         
         try:
@@ -81,7 +96,7 @@ class TestTwitchSearch:
             WebDriverWait(driver, 3).until(
                 lambda d: d.find_element(By.CSS_SELECTOR, 'main').is_displayed()
             )
-            driver.save_screenshot(f'{screenshots_dir}/01_home_page.png')
+            capture_step(driver, screenshots_dir, '01_home_page.png')
             logger.info(f"✓ Navigation completed in {(time.time() - step_start):.2f} seconds")
             
             # Step 2: Click search
@@ -93,7 +108,7 @@ class TestTwitchSearch:
                     for selector in ['input[type="search"]', '[data-a-target="search-input"]']
                 )
             )
-            driver.save_screenshot(f'{screenshots_dir}/02_search_clicked.png')
+            capture_step(driver, screenshots_dir, '02_search_clicked.png')
             logger.info(f"✓ Search field clicked in {(time.time() - step_start):.2f} seconds")
             
             # Step 3: Enter search query
@@ -113,27 +128,24 @@ class TestTwitchSearch:
             ]
             
             # Take a screenshot even if we don't find anything yet
-            driver.save_screenshot(f'{screenshots_dir}/03_search_input.png')
+            capture_step(driver, screenshots_dir, '03_search_input.png')
             
-            # Wait for any kind of search results to appear
+            # Wait for any kind of search results to appear, racing all selectors at once
             search_results_found = False
-            for selector in search_result_selectors:
-                try:
-                    logger.info(f"Looking for search results with selector: {selector}")
-                    WebDriverWait(driver, 2).until(
-                        lambda d: d.find_elements(By.CSS_SELECTOR, selector)
-                    )
-                    logger.info(f"Found search results with selector: {selector}")
-                    search_results_found = True
-                    break
-                except Exception as e:
-                    logger.debug(f"No results found with selector '{selector}': {e}")
+            try:
+                _, (_, selector) = twitch_page.find_first_of(
+                    [(By.CSS_SELECTOR, selector) for selector in search_result_selectors], timeout=2
+                )
+                logger.info(f"Found search results with selector: {selector}")
+                search_results_found = True
+            except Exception as e:
+                logger.debug(f"No results found with any selector: {e}")
             
             if not search_results_found:
                 # If no results found, just continue anyway and take another screenshot
                 logger.warning("No search results found with any selector, continuing anyway")
-                time.sleep(1.5)
-                driver.save_screenshot(f'{screenshots_dir}/03_search_input_after_delay.png')
+                WaitUtils.wait_for_dom_idle(driver, timeout=1.5)
+                capture_step(driver, screenshots_dir, '03_search_input_after_delay.png')
             
             logger.info(f"✓ Search query entered in {(time.time() - step_start):.2f} seconds")
             
@@ -151,7 +163,7 @@ class TestTwitchSearch:
                 try:
                     # Convert query to URL-friendly format
                     url_query = query.replace(' ', '%20')
-                    driver.get(f"https://www.twitch.tv/search?term={url_query}")
+                    driver.get(f"{get_config()['base_url']}/search?term={url_query}")
                     logger.info(f"Direct navigation to search results for '{query}'")
                     
                     # Wait for page to load
@@ -184,22 +196,21 @@ class TestTwitchSearch:
             except Exception as e:
                 logger.warning(f"Couldn't detect search results after waiting: {str(e)}")
                 
-            driver.save_screenshot(f'{screenshots_dir}/04_suggestion_selected.png')
+            capture_step(driver, screenshots_dir, '04_suggestion_selected.png')
             logger.info(f"✓ First suggestion selection step completed in {(time.time() - step_start):.2f} seconds")
             
             # Step 5: Scroll and view results
             step_start = log_step(logger, 5, 'Scrolling through search results')
             
-            # Scroll more gently with pauses to allow content to load
+            # Scroll one step at a time; each scroll waits for new content to settle
             for _ in range(2):
                 try:
                     twitch_page.scroll_page(1)  # Scroll once
-                    time.sleep(0.5)  # Wait for content to load
                 except Exception as e:
                     logger.warning(f"Error during scrolling: {str(e)}")
             
             # Take a screenshot regardless of whether we find specific elements
-            driver.save_screenshot(f'{screenshots_dir}/05_scrolled_results.png')
+            capture_step(driver, screenshots_dir, '05_scrolled_results.png')
             
             # Try to verify we have multiple results, but don't fail the test if we don't
             try:
@@ -212,12 +223,12 @@ class TestTwitchSearch:
                     'a[href*="/channel/"]'
                 ]
                 
-                # Wait for any results
-                for selector in result_selectors:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if len(elements) > 0:
-                        logger.info(f"Found {len(elements)} results with selector: {selector}")
-                        break
+                # Read every matching result in a single round trip
+                results = twitch_page.query_elements(
+                    (By.CSS_SELECTOR, ', '.join(result_selectors)), ['href', 'visible']
+                )
+                visible_results = [result for result in results if result['visible']]
+                logger.info(f"Found {len(results)} results ({len(visible_results)} visible)")
                 
             except Exception as e:
                 logger.warning(f"Could not verify search results: {str(e)}")
@@ -260,7 +271,7 @@ class TestTwitchSearch:
                                     # Try different click methods
                                     try:
                                         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                                        time.sleep(0.5)
+                                        WaitUtils.wait_for_scroll_end(driver, timeout=2)
                                         element.click()
                                     except Exception:
                                         driver.execute_script("arguments[0].click();", element)
@@ -283,14 +294,14 @@ class TestTwitchSearch:
                         continue
             
             # Take a screenshot regardless of selection success
-            driver.save_screenshot(f'{screenshots_dir}/06_streamer_selected.png')
+            capture_step(driver, screenshots_dir, '06_streamer_selected.png')
             
             # If we still couldn't select a streamer, try a direct navigation to a known channel
             if not streamer_selected:
                 logger.warning("Could not select any streamer, using fallback navigation")
                 try:
                     # Navigate to a popular channel
-                    driver.get("https://www.twitch.tv/twitchrivals")
+                    driver.get(f"{get_config()['base_url']}/twitchrivals")
                     logger.info("Navigated directly to a known channel")
                     WebDriverWait(driver, 10).until(
                         lambda d: d.find_element(By.CSS_SELECTOR, 'main').is_displayed()
@@ -309,24 +320,25 @@ class TestTwitchSearch:
                     for selector in ['[data-a-target="video-player"]', '[data-test-selector="channel-root"]']
                 )
             )
-            driver.save_screenshot(f'{screenshots_dir}/07_after_mature_content.png')
+            capture_step(driver, screenshots_dir, '07_after_mature_content.png')
             logger.info(f"✓ Mature content handled in {(time.time() - step_start):.2f} seconds")
             
             # Verify we're on a streamer's page
             assert any(x in driver.current_url for x in ['/videos', '/channel']), 'Not on streamer page'
             
-            # Generate GIF from screenshots
+            # Generate GIF from screenshots once they are written (in the background)
             step_start = log_step(logger, 'Cleanup', 'Generating test execution GIF')
-            gif_generator = GifGenerator()
-            gif_path = gif_generator.create_gif_from_screenshots(
-                screenshots_dir,
-                f'twitch_search_{device}_{browser}_{query.replace(" ", "_")}',
-                duration=2000
-            )
-            logger.info(f"✓ GIF generated in {(time.time() - step_start):.2f} seconds")
+            if screencast_active(driver):
+                gif_path = 'the screencast recording (saved by the driver fixture)'
+            else:
+                gif_generator = GifGenerator()
+                gif_name = f'twitch_search_{device}_{browser}_{query.replace(" ", "_")}'
+                artifact_pipeline.create_gif(gif_generator, screenshots_dir, gif_name, duration=2000)
+                gif_path = os.path.join(gif_generator.output_dir, f'{gif_name}.gif')
+            logger.info(f"✓ GIF queued in {(time.time() - step_start):.2f} seconds")
             
             total_time = time.time() - test_start_time
-            logger.info(f"\n{'='*80}\nTest completed successfully in {total_time:.2f} seconds\nGIF created at: {gif_path}\n{'='*80}")
+            logger.info(f"\n{'='*80}\nTest completed successfully in {total_time:.2f} seconds\nGIF will be written to: {gif_path}\n{'='*80}")
             
         except Exception as e:
             total_time = time.time() - test_start_time
@@ -334,6 +346,6 @@ class TestTwitchSearch:
             logger.error(f"Error on {device} device using {browser} browser: {str(e)}\n{'='*80}")
             if driver:
                 failure_screenshot = f'{screenshots_dir}/failure_{datetime.now().strftime("%H%M%S")}.png'
-                driver.save_screenshot(failure_screenshot)
-                logger.error(f"Failure screenshot saved to: {failure_screenshot}")
+                artifact_pipeline.capture(driver, failure_screenshot)
+                logger.error(f"Failure screenshot queued for: {failure_screenshot}")
             raise
\ No newline at end of file
@@ -0,0 +1 @@
+"""Unit tests for framework utilities that need no browser"""
@@ -0,0 +1,39 @@
+import pytest
+from config import ENV_PREFIX, _apply_overrides, _validate, get_config
+from utils.exceptions import ConfigurationError
+
+VALID = {"base_url": "https://m.twitch.tv", "waits": {"implicit": 0, "explicit": 10},
+         "screenshots": {"path": "screenshots"}}
+
+
+def test_overrides_keep_yaml_types():
+    data = {"waits": {"explicit": 10}}
+    _apply_overrides(data, [(f"{ENV_PREFIX}WAITS__EXPLICIT", "5"), (f"{ENV_PREFIX}GIFS__DITHER", "true")])
+    assert data == {"waits": {"explicit": 5}, "gifs": {"dither": True}}
+
+
+def test_override_cannot_replace_a_value_with_a_section():
+    with pytest.raises(ConfigurationError):
+        _apply_overrides({"base_url": "x"}, [(f"{ENV_PREFIX}BASE_URL__HOST", "y")])
+
+
+@pytest.mark.parametrize("broken, message", [
+    ({"base_url": None}, "base_url"),
+    ({"waits": {"implicit": 0}}, "waits.explicit"),
+    ({"waits": {"implicit": True, "explicit": 10}}, "waits.implicit"),
+    ({"screenshots": "screenshots"}, "screenshots"),
+])
+def test_validation_names_the_broken_key(broken, message):
+    with pytest.raises(ConfigurationError, match=message):
+        _validate(dict(VALID, **broken))
+
+
+def test_config_is_cached_read_only_and_follows_env_overrides(monkeypatch):
+    monkeypatch.delenv(f"{ENV_PREFIX}WAITS__EXPLICIT", raising=False)
+    config = get_config()
+    assert get_config() is config
+    with pytest.raises(TypeError):
+        config["base_url"] = "https://example.com"
+
+    monkeypatch.setenv(f"{ENV_PREFIX}WAITS__EXPLICIT", "3")
+    assert get_config()["waits"]["explicit"] == 3
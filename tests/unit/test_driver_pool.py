@@ -0,0 +1,103 @@
+from utils.driver_factory import DriverPool
+
+
+class FakeSwitchTo:
+    def window(self, handle):
+        pass
+
+
+class FakeDriver:
+    """Records the commands a pool sends to a driver"""
+
+    def __init__(self, origin="https://m.twitch.tv", history=(), frames=()):
+        self.origin = origin
+        self.history = list(history) or [origin + "/"]
+        self.frames = list(frames)
+        self.window_handles = ["main"]
+        self.switch_to = FakeSwitchTo()
+        self.cdp_commands = []
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Storage.clearDataForOrigin" and params["origin"] == "*":
+            raise RuntimeError("Invalid origin")
+        self.cdp_commands.append((command, params))
+        if command == "Page.getNavigationHistory":
+            return {"currentIndex": len(self.history) - 1, "entries": [{"url": url} for url in self.history]}
+        if command == "Page.getFrameTree":
+            children = [{"frame": {"url": url}} for url in self.frames]
+            return {"frameTree": {"frame": {"url": self.history[-1]}, "childFrames": children}}
+        if command == "Page.resetNavigationHistory":
+            self.history = ["about:blank"]
+        return {}
+
+    def execute_script(self, script):
+        return self.origin
+
+    def get(self, url):
+        self.origin = "null"
+
+    def get_window_size(self):
+        return {"width": 411, "height": 731}
+
+    def set_window_size(self, width, height):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(drivers):
+    return DriverPool(size=1, max_uses=5, creator=lambda **kwargs: drivers.append(FakeDriver()) or drivers[-1])
+
+
+def test_released_driver_is_handed_out_again():
+    drivers = []
+    pool = make_pool(drivers)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(drivers) == 1
+    assert not first.quit_called
+
+
+def cleared_origins(driver):
+    return [params["origin"] for command, params in driver.cdp_commands if command == "Storage.clearDataForOrigin"]
+
+
+def test_reset_clears_cookies_and_storage_of_the_current_origin():
+    pool = make_pool([])
+    driver = pool.acquire()
+    pool.release(driver)
+    assert ("Network.clearBrowserCookies", {}) in driver.cdp_commands
+    assert cleared_origins(driver) == ["https://m.twitch.tv"]
+    assert ("Storage.clearDataForOrigin", {"origin": "https://m.twitch.tv", "storageTypes": "all"}) in driver.cdp_commands
+
+
+def test_reset_clears_storage_of_every_visited_origin():
+    driver = FakeDriver(
+        history=["https://www.twitch.tv/", "https://m.twitch.tv/directory"],
+        frames=["https://player.twitch.tv/?channel=x", "about:srcdoc"]
+    )
+    pool = DriverPool(size=1, max_uses=5, creator=lambda **kwargs: driver)
+    pool.release(pool.acquire())
+    assert cleared_origins(driver) == ["https://m.twitch.tv", "https://player.twitch.tv", "https://www.twitch.tv"]
+
+
+def test_reset_forgets_origins_of_the_previous_test():
+    driver = FakeDriver(history=["https://www.twitch.tv/", "https://m.twitch.tv/"])
+    pool = DriverPool(size=1, max_uses=5, creator=lambda **kwargs: driver)
+    pool.release(pool.acquire())
+    driver.cdp_commands.clear()
+    driver.history.append("https://m.twitch.tv/search")
+    pool.release(pool.acquire())
+    assert cleared_origins(driver) == ["https://m.twitch.tv"]
+
+
+def test_driver_is_retired_after_max_uses():
+    drivers = []
+    pool = DriverPool(size=1, max_uses=1, creator=lambda **kwargs: drivers.append(FakeDriver()) or drivers[-1])
+    first = pool.acquire()
+    pool.release(first)
+    assert first.quit_called
+    assert pool.acquire() is not first
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from utils.driver_resolver import DriverBinaryResolver
+from utils.exceptions import DriverResolutionError
+
+
+def make_binary(tmp_path, name):
+    path = tmp_path / name
+    path.write_text("")
+    return str(path)
+
+
+def make_resolver(tmp_path, monkeypatch, version="120.0.1", offline=False, manifest=None, downloaded=None):
+    monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+    manifest_path = tmp_path / "cache" / "drivers.json"
+    if manifest is not None:
+        manifest_path.parent.mkdir()
+        manifest_path.write_text(json.dumps(manifest))
+    resolver = DriverBinaryResolver(manifest_path=str(manifest_path), offline=offline)
+    resolver.downloads = []
+    monkeypatch.setattr(resolver, "detect_browser_version", lambda browser_type: version)
+    monkeypatch.setattr(
+        resolver, "_download", lambda browser_type: resolver.downloads.append(browser_type) or downloaded
+    )
+    monkeypatch.setattr("shutil.which", lambda name: None)
+    return resolver
+
+
+def read_manifest(resolver):
+    with open(resolver.manifest_path) as f:
+        return json.load(f)
+
+
+def test_manifest_hit_skips_the_download(tmp_path, monkeypatch):
+    cached = make_binary(tmp_path, "chromedriver-120")
+    resolver = make_resolver(tmp_path, monkeypatch, manifest={"chrome-120.0.1": {"path": cached}})
+    assert resolver.resolve("chrome") == cached
+    assert resolver.downloads == []
+    assert resolver.timings["chrome"][0]["source"] == "manifest"
+
+
+def test_manifest_miss_downloads_and_records_the_version(tmp_path, monkeypatch):
+    stale = make_binary(tmp_path, "chromedriver-119")
+    fresh = make_binary(tmp_path, "chromedriver-120")
+    resolver = make_resolver(
+        tmp_path, monkeypatch, manifest={"chrome-119.0.0": {"path": stale}}, downloaded=fresh
+    )
+    assert resolver.resolve("chrome") == fresh
+    assert resolver.downloads == ["chrome"]
+    assert read_manifest(resolver)["chrome-120.0.1"]["path"] == fresh
+    assert resolver.resolve("chrome") == fresh
+    assert resolver.timings["chrome"][1]["source"] == "memory"
+
+
+def test_offline_falls_back_to_the_newest_cached_driver(tmp_path, monkeypatch):
+    older = make_binary(tmp_path, "chromedriver-118")
+    newer = make_binary(tmp_path, "chromedriver-119")
+    resolver = make_resolver(tmp_path, monkeypatch, offline=True, manifest={
+        "chrome-118.0.0": {"path": older, "browser_version": "118.0.0", "resolved_at": 1},
+        "chrome-119.0.0": {"path": newer, "browser_version": "119.0.0", "resolved_at": 2}
+    })
+    assert resolver.resolve("chrome") == newer
+    assert resolver.downloads == []
+    assert resolver.timings["chrome"][0]["source"] == "manifest (offline fallback)"
+
+
+def test_offline_without_any_cached_driver_fails(tmp_path, monkeypatch):
+    resolver = make_resolver(tmp_path, monkeypatch, offline=True)
+    with pytest.raises(DriverResolutionError):
+        resolver.resolve("chrome")
+    assert resolver.downloads == []
+
+
+def test_environment_path_overrides_the_manifest(tmp_path, monkeypatch):
+    cached = make_binary(tmp_path, "chromedriver-120")
+    pinned = make_binary(tmp_path, "chromedriver-pinned")
+    resolver = make_resolver(tmp_path, monkeypatch, manifest={"chrome-120.0.1": {"path": cached}})
+    monkeypatch.setenv("CHROMEDRIVER_PATH", pinned)
+    assert resolver.resolve("chrome") == pinned
+    assert resolver.timings["chrome"][0]["source"] == "environment"
+
+
+def test_environment_path_to_a_missing_file_fails(tmp_path, monkeypatch):
+    resolver = make_resolver(tmp_path, monkeypatch)
+    monkeypatch.setenv("CHROMEDRIVER_PATH", str(tmp_path / "missing"))
+    with pytest.raises(DriverResolutionError):
+        resolver.resolve("chrome")
+
+
+def test_unknown_browser_version_is_re_resolved_and_never_recorded(tmp_path, monkeypatch):
+    legacy = make_binary(tmp_path, "chromedriver-legacy")
+    fresh = make_binary(tmp_path, "chromedriver-fresh")
+    resolver = make_resolver(
+        tmp_path, monkeypatch, version=None, manifest={"chrome-unknown": {"path": legacy}}, downloaded=fresh
+    )
+    assert resolver.resolve("chrome") == fresh
+    assert resolver.downloads == ["chrome"]
+    assert read_manifest(resolver) == {"chrome-unknown": {"path": legacy}}
@@ -0,0 +1,72 @@
+import io
+from PIL import Image, ImageDraw, ImageSequence
+from utils.gif_generator import StreamingGifWriter, perceptual_hash
+
+
+def search_frame(text):
+    """A 400x300 page with a search box showing the typed text"""
+    image = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 20, 380, 60), outline="black", fill=(240, 240, 240))
+    draw.text((30, 32), text, fill="black")
+    draw.rectangle((20, 100, 380, 280), fill=(145, 70, 255))
+    return image
+
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def read_gif(path):
+    with Image.open(path) as gif:
+        return [(frame.info["duration"], frame.convert("RGB").copy()) for frame in ImageSequence.Iterator(gif)]
+
+
+def write(path, frames, **kwargs):
+    with StreamingGifWriter(str(path), max_width=None, duration=500, **kwargs) as writer:
+        for frame in frames:
+            writer.add_frame(frame)
+    return writer.close()
+
+
+def test_round_trip_keeps_frames_and_durations(tmp_path):
+    path = tmp_path / "search.gif"
+    stats = write(path, [png_bytes(search_frame("")), png_bytes(search_frame("StarCraft II"))])
+    frames = read_gif(path)
+    assert [duration for duration, _ in frames] == [500, 500]
+    assert frames[0][1].size == (400, 300)
+    assert stats["frames"] == 2 and stats["input_frames"] == 2
+    assert stats["source_bytes"] > 0 and stats["compression_ratio"] > 0
+    assert not (tmp_path / "search.gif.part").exists()
+
+
+def test_typed_text_is_not_merged_by_default(tmp_path):
+    texts = ["", "a", "ab", "ab"]
+    assert len({perceptual_hash(search_frame(text)) for text in texts}) == 1
+    stats = write(tmp_path / "typing.gif", [search_frame(text) for text in texts])
+    assert stats["frames"] == 3
+    assert stats["merged"] == 1
+    assert [duration for duration, _ in read_gif(tmp_path / "typing.gif")] == [500, 500, 1000]
+
+
+def test_perceptual_merging_is_opt_in(tmp_path):
+    stats = write(tmp_path / "typing.gif", [search_frame(text) for text in ["", "a", "ab"]], dedup_distance=0)
+    assert stats["frames"] == 1 and stats["merged"] == 2
+
+
+def test_delta_frames_encode_only_the_changed_region(tmp_path):
+    path = tmp_path / "delta.gif"
+    stats = write(path, [search_frame(""), search_frame("a")])
+    assert stats["encoded_pixels"] < stats["frame_pixels"]
+    full = write(tmp_path / "full.gif", [search_frame(""), search_frame("a")], delta=False)
+    assert full["encoded_pixels"] == full["frame_pixels"]
+    # Drawn over the previous frame, the cropped delta renders the same picture
+    assert list(read_gif(path)[1][1].getdata()) == list(read_gif(tmp_path / "full.gif")[1][1].getdata())
+
+
+def test_frames_over_the_memory_cap_are_skipped(tmp_path):
+    with StreamingGifWriter(str(tmp_path / "big.gif"), max_width=None, max_memory_mb=0.1) as writer:
+        assert not writer.add_frame(search_frame("a"))
+    assert writer.stats["skipped"] == 1
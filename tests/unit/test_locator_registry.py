@@ -0,0 +1,98 @@
+from selenium.webdriver.common.by import By
+from pages.base_page import BasePage
+from utils.locator_registry import LocatorRegistry, locator_key
+
+SPECIFIC = (By.CSS_SELECTOR, '[data-a-target="search-result-channel"]')
+BROAD = (By.CSS_SELECTOR, 'a[href*="/videos"]')
+DEAD = (By.XPATH, '//div[@class="legacy-result"]')
+
+
+def make_registry(tmp_path):
+    return LocatorRegistry(path=str(tmp_path / "locator_stats.json"))
+
+
+def test_broad_fallbacks_never_outrank_declared_priority(tmp_path):
+    registry = make_registry(tmp_path)
+    for _ in range(10):
+        registry.record("suggestion", [SPECIFIC, BROAD], matched=[1], winner=1, seconds=0.1)
+    registry.record("suggestion", [SPECIFIC, BROAD], matched=[0, 1], winner=0, seconds=0.1)
+    assert registry.rank("suggestion", [SPECIFIC, BROAD]) == [SPECIFIC, BROAD]
+
+
+def test_dead_locators_are_left_out_and_re_probed_last(tmp_path):
+    registry = make_registry(tmp_path)
+    for _ in range(5):
+        registry.record("suggestion", [DEAD, SPECIFIC, BROAD], matched=[1, 2], winner=1)
+    plans = [registry.rank("suggestion", [DEAD, SPECIFIC, BROAD], reprobe_every=3) for _ in range(6)]
+    assert plans[0] == plans[1] == plans[3] == plans[4] == [SPECIFIC, BROAD]
+    assert plans[2] == plans[5] == [SPECIFIC, BROAD, DEAD]
+
+
+def test_locators_need_min_lookups_before_counting_as_dead(tmp_path):
+    registry = make_registry(tmp_path)
+    for _ in range(4):
+        registry.record("suggestion", [DEAD, SPECIFIC], matched=[1], winner=1)
+    assert registry.rank("suggestion", [DEAD, SPECIFIC]) == [DEAD, SPECIFIC]
+    assert registry.rank("suggestion", [DEAD, SPECIFIC], min_lookups=3) == [SPECIFIC]
+
+
+def test_all_dead_locators_are_still_raced(tmp_path):
+    registry = make_registry(tmp_path)
+    for _ in range(5):
+        registry.record("suggestion", [DEAD, SPECIFIC], matched=[])
+    assert registry.rank("suggestion", [DEAD, SPECIFIC]) == [DEAD, SPECIFIC]
+
+
+def test_interchangeable_locators_are_ordered_by_query_cost_per_hit(tmp_path):
+    registry = make_registry(tmp_path)
+    slow, fast, flaky = SPECIFIC, (By.CSS_SELECTOR, 'input[type="search"]'), (By.NAME, "q")
+    for _ in range(4):
+        registry.record("search_input", [slow, fast, flaky], matched=[0, 1], query_seconds=[0.004, 0.001, 0.0005])
+    fresh = (By.ID, "search")
+    assert registry.rank("search_input", [slow, fast, flaky, fresh]) == [slow, fast, flaky, fresh]
+    assert registry.rank("search_input", [slow, fast, flaky, fresh], by_latency=True) == [fresh, fast, slow, flaky]
+
+
+def test_save_merges_pending_increments(tmp_path):
+    first, second = make_registry(tmp_path), make_registry(tmp_path)
+    first.record("button", [SPECIFIC], matched=[0], winner=0, seconds=0.2)
+    second.record("button", [SPECIFIC], matched=[], seconds=0.5)
+    first.save()
+    second.save()
+    entry = make_registry(tmp_path).stats["button"][locator_key(SPECIFIC)]
+    assert entry == {
+        "lookups": 2, "hits": 1, "wins": 1, "win_seconds": 0.2, "queries": 0, "query_seconds": 0.0, "skips": 0
+    }
+
+
+class RaceDriver:
+    """Answers the locator race like the browser does and counts the queries it issues"""
+
+    def __init__(self, present):
+        self.present = present
+        self.queries = []
+
+    def execute_script(self, script, candidates, visible):
+        query_seconds = []
+        for index, (by, value) in enumerate(candidates):
+            self.queries.append((by, value))
+            query_seconds.append(0.001)
+            if (by, value) in self.present:
+                return {"index": index, "element": f"<{value}>", "query_seconds": query_seconds}
+        return None
+
+
+def test_lookup_after_ranking_issues_fewer_queries(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path)
+    monkeypatch.setattr("pages.base_page.locator_registry", registry)
+    driver = RaceDriver(present=[SPECIFIC, BROAD])
+    page = BasePage(driver)
+    locators = [DEAD, (By.CSS_SELECTOR, ".legacy-button"), SPECIFIC, BROAD]
+
+    for _ in range(5):
+        assert page.find_first_of(locators, timeout=1, name="suggestion") == ("<" + SPECIFIC[1] + ">", SPECIFIC)
+    assert len(driver.queries) == 5 * 3
+
+    driver.queries.clear()
+    assert page.find_first_of(locators, timeout=1, name="suggestion")[1] == SPECIFIC
+    assert driver.queries == [SPECIFIC]
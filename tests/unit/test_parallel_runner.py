@@ -0,0 +1,47 @@
+from utils.parallel_runner import schedule_tests, split_selection
+from utils.test_history import DurationHistory
+
+
+def make_history(durations):
+    history = DurationHistory(path="unused.json", load=False)
+    for test_id, duration in durations.items():
+        history.record(test_id, duration)
+    return history
+
+
+def test_option_values_are_not_treated_as_selection():
+    selection, options = split_selection(["tests/", "-k", "search", "--html", "reports/report.html", "--headless"])
+    assert selection == ["tests/"]
+    assert options == ["-k", "search", "--html", "reports/report.html", "--headless"]
+
+
+def test_only_positional_arguments_select_tests():
+    assert split_selection(["tests/test_a.py", "tests/test_b.py"]) == (["tests/test_a.py", "tests/test_b.py"], [])
+    assert split_selection(["--headless"]) == ([], ["--headless"])
+
+
+def test_longest_tests_are_scheduled_first_on_the_lightest_worker():
+    history = make_history({"t::a": 10.0, "t::b": 8.0, "t::c": 5.0, "t::d": 3.0})
+    shards, predicted = schedule_tests(["t::d", "t::c", "t::b", "t::a"], 2, history, devices=set())
+    assert shards == [["t::a", "t::d"], ["t::b", "t::c"]]
+    assert predicted == [13.0, 13.0]
+
+
+def test_unknown_tests_are_estimated_at_the_median():
+    history = make_history({"t::a": 10.0, "t::b": 2.0, "t::c": 4.0})
+    shards, predicted = schedule_tests(["t::a", "t::b", "t::c", "t::new"], 2, history, devices=set())
+    assert sum(predicted) == 20.0
+    assert sorted(test_id for shard in shards for test_id in shard) == ["t::a", "t::b", "t::c", "t::new"]
+
+
+def test_ties_prefer_a_worker_already_running_the_device():
+    history = make_history({"t::x[Pixel 2]": 5.0, "t::y[iPhone X]": 5.0, "t::z[Pixel 2]": 5.0, "t::w[iPhone X]": 5.0})
+    shards, _ = schedule_tests(list(history.tests), 2, history, devices={"Pixel 2", "iPhone X"})
+    for shard in shards:
+        assert len({test_id.split("[")[1] for test_id in shard}) == 1
+
+
+def test_empty_workers_are_dropped():
+    shards, predicted = schedule_tests(["t::a"], 3, make_history({"t::a": 1.0}), devices=set())
+    assert shards == [["t::a"]]
+    assert predicted == [1.0]
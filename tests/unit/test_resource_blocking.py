@@ -0,0 +1,49 @@
+import json
+
+from utils.resource_blocking import BLOCKLISTS_PATH, ResourceBlocker
+
+
+class LoggingDriver:
+    """Serves canned Chrome performance log messages"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def get_log(self, log_type):
+        entries = [{"message": json.dumps({"message": message})} for message in self.messages]
+        self.messages = []
+        return entries
+
+
+def loaded(request_id, resource_type, size):
+    return [
+        {"method": "Network.responseReceived", "params": {"requestId": request_id, "type": resource_type}},
+        {"method": "Network.loadingFinished", "params": {"requestId": request_id, "encodedDataLength": size}}
+    ]
+
+
+def blocked(request_id, resource_type):
+    return {"method": "Network.loadingFailed",
+            "params": {"requestId": request_id, "type": resource_type, "blockedReason": "inspector"}}
+
+
+def make_blocker(tmp_path):
+    return ResourceBlocker(blocklists_path=BLOCKLISTS_PATH, sizes_path=str(tmp_path / "resource_sizes.json"))
+
+
+def test_blocked_types_fall_back_to_typical_sizes_until_learned(tmp_path):
+    blocker = make_blocker(tmp_path)
+    result = blocker.collect(LoggingDriver([blocked("1", "Font")]))
+    assert result["estimated_bytes_saved"] == blocker.typical_bytes.get("Font", blocker.typical_bytes.get("Other", 0))
+    assert blocker.unlearned_types == {"Font"}
+
+
+def test_unblocked_run_teaches_the_size_used_by_later_blocking_runs(tmp_path):
+    learning = make_blocker(tmp_path)
+    learning.collect(LoggingDriver(loaded("1", "Font", 30000) + loaded("2", "Font", 10000)))
+    learning.save()
+
+    blocker = make_blocker(tmp_path)
+    result = blocker.collect(LoggingDriver([blocked("3", "Font"), blocked("4", "Font")]))
+    assert result == {"blocked_requests": 2, "estimated_bytes_saved": 40000, "by_type": {"Font": 2}}
+    assert blocker.unlearned_types == set()
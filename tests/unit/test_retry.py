@@ -0,0 +1,139 @@
+import time
+import pytest
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
+from selenium.webdriver.remote.webelement import WebElement
+from utils import retry
+from utils.exceptions import ElementNotFoundError
+from utils.retry import FAIL, RELOCATE, RETRY, RetryMetrics, RetryPolicy, deadline, remaining_timeout, time_left
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch):
+    """Fresh metrics per test, and no real sleeping between attempts"""
+    metrics = RetryMetrics()
+    monkeypatch.setattr(retry, "retry_metrics", metrics)
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+    return metrics
+
+
+def flaky(*errors, result="ok"):
+    """Return a callable that raises the given errors in turn, then returns result"""
+    errors = list(errors)
+
+    def call(*args, **kwargs):
+        if errors:
+            raise errors.pop(0)
+        return result
+    return call
+
+
+def test_most_specific_strategy_in_the_mro_wins():
+    policy = RetryPolicy({WebDriverException: RETRY, TimeoutException: FAIL})
+    assert policy.strategy_for(TimeoutException()) == FAIL
+    assert policy.strategy_for(ElementClickInterceptedException()) == RETRY
+    assert policy.strategy_for(ValueError()) == FAIL
+
+
+def test_default_strategies():
+    policy = RetryPolicy()
+    assert policy.strategy_for(StaleElementReferenceException()) == RELOCATE
+    assert policy.strategy_for(TimeoutException()) == RETRY
+    assert policy.strategy_for(ElementNotFoundError("missing")) == FAIL
+
+
+def test_callable_strategies_receive_the_exception():
+    policy = RetryPolicy({WebDriverException: lambda e: RETRY if "transient" in str(e) else FAIL})
+    assert policy.strategy_for(WebDriverException("transient")) == RETRY
+    assert policy.strategy_for(WebDriverException("fatal")) == FAIL
+
+
+def test_relocate_fails_for_calls_given_a_web_element():
+    policy = RetryPolicy()
+    element = WebElement(None, "element-1")
+    stale = StaleElementReferenceException()
+    assert policy.strategy_for(stale, args=(element,)) == FAIL
+    assert policy.strategy_for(stale, kwargs={"element": element}) == FAIL
+    assert policy.strategy_for(stale, args=(("css selector", "a"),)) == RELOCATE
+
+
+def test_stale_element_handle_is_not_retried(metrics):
+    calls = []
+
+    def click(element):
+        calls.append(element)
+        raise StaleElementReferenceException()
+
+    with pytest.raises(StaleElementReferenceException):
+        RetryPolicy(name="click").call(click, WebElement(None, "element-1"))
+    assert len(calls) == 1
+    assert metrics.summary()["click"]["outcomes"] == {"failed": 1}
+
+
+def test_relocate_retries_at_once_and_retry_backs_off(metrics):
+    func = flaky(StaleElementReferenceException(), TimeoutException())
+    assert RetryPolicy(max_attempts=3, jitter=0, name="find").call(func, ("css selector", "a")) == "ok"
+    stats = metrics.summary()["find"]
+    assert stats["attempts"] == 3 and stats["retries"] == 2
+    assert stats["backoff_seconds"] == pytest.approx(0.5)
+    assert stats["errors"] == {"StaleElementReferenceException": 1, "TimeoutException": 1}
+    assert stats["outcomes"] == {"ok": 1}
+
+
+def test_attempts_are_exhausted(metrics):
+    func = flaky(*[TimeoutException()] * 5)
+    with pytest.raises(TimeoutException):
+        RetryPolicy(max_attempts=3, name="find").call(func)
+    assert metrics.summary()["find"]["outcomes"] == {"exhausted": 1}
+
+
+def test_backoff_grows_up_to_max_delay_with_jitter():
+    policy = RetryPolicy(base_delay=0.25, max_delay=1.0, multiplier=2.0, jitter=0)
+    assert [policy.backoff(retry) for retry in (1, 2, 3, 4)] == [0.25, 0.5, 1.0, 1.0]
+    jittered = RetryPolicy(base_delay=1.0, max_delay=1.0, jitter=0.5)
+    assert all(0.5 <= jittered.backoff(1) <= 1.0 for _ in range(50))
+
+
+def test_retry_stops_when_backoff_would_pass_the_deadline(metrics):
+    func = flaky(*[TimeoutException()] * 5)
+    with pytest.raises(TimeoutException):
+        RetryPolicy(max_attempts=10, deadline=0.1, base_delay=1.0, jitter=0, name="find").call(func)
+    assert metrics.summary()["find"]["outcomes"] == {"deadline": 1}
+
+
+def test_nested_deadlines_only_shorten():
+    assert time_left() is None
+    assert remaining_timeout(10) == 10
+    with deadline(5):
+        with deadline(60):
+            assert time_left() <= 5
+        with deadline(1):
+            assert remaining_timeout(10) <= 1
+        with deadline(None):
+            assert time_left() <= 5
+    assert time_left() is None
+
+
+def test_waits_inside_a_policy_are_capped_by_its_deadline():
+    seen = []
+    RetryPolicy(deadline=2).call(lambda: seen.append(remaining_timeout(10)))
+    assert 0 < seen[0] <= 2
+
+
+def test_retry_on_exception_applies_configured_defaults(metrics):
+    attempts = []
+
+    @retry.retry_on_exception(NoSuchElementException, max_attempts=2, delay=0)
+    def lookup():
+        attempts.append(time.monotonic())
+        raise NoSuchElementException()
+
+    with pytest.raises(NoSuchElementException):
+        lookup()
+    assert len(attempts) == 2
+    assert list(metrics.summary().values())[0]["outcomes"] == {"exhausted": 1}
@@ -0,0 +1,41 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import pytest
+from utils.standin import StandinServer
+
+
+@pytest.fixture
+def server():
+    with StandinServer(fail_paths=[r"^/api/categories$"], results_per_page=5, pages=2) as server:
+        yield server
+
+
+def get_json(url):
+    with urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_search_pages_and_no_results(server):
+    first = get_json(f"{server.url}/api/search?term=StarCraft%20II")
+    last = get_json(f"{server.url}/api/search?term=StarCraft%20II&page=2")
+    assert len(first["results"]) == 5 and first["has_more"]
+    assert not last["has_more"]
+    assert get_json(f"{server.url}/api/search?term=invalid_query")["results"] == []
+
+
+def test_channel_pages_agree_with_search_results(server):
+    result = get_json(f"{server.url}/api/search?term=Chess")["results"][0]
+    assert get_json(f"{server.url}/api/channel/{result['id']}")["title"] == result["title"]
+
+
+def test_fail_paths_answer_with_server_errors(server):
+    with pytest.raises(HTTPError) as error:
+        urlopen(f"{server.url}/api/categories", timeout=5)
+    assert error.value.code == 500
+    assert server.stats["failures"] == 1
+
+
+def test_html_routes_serve_the_single_page_app(server):
+    with urlopen(f"{server.url}/directory", timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/html")
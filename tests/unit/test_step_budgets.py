@@ -0,0 +1,32 @@
+from utils.step_budgets import describe, evaluate_steps, resolve_budgets
+
+
+def test_marker_budgets_override_configured_budgets():
+    config = {"tests": {"test_search": {1: 5, "2": 10}}}
+    assert resolve_budgets("test_search", config, {"2": 4, "3": 1}) == {"1": 5.0, "2": 4.0, "3": 1.0}
+    assert resolve_budgets("test_other", config) == {}
+
+
+def test_step_over_budget():
+    [result] = evaluate_steps({"1": 6.0}, {"1": 5.0}, {})
+    assert result["status"] == "over_budget"
+    assert describe(result) == "Step '1' took 6.00s, budget is 5.00s"
+
+
+def test_regression_needs_enough_baseline_samples():
+    steps = {"1": 4.0}
+    [untrusted] = evaluate_steps(steps, {}, {"1": [1.0, 1.0]}, min_samples=3)
+    [regressed] = evaluate_steps(steps, {}, {"1": [1.0, 2.0, 2.0]}, regression_factor=1.5, min_samples=3)
+    assert untrusted["status"] == "ok" and untrusted["baseline"] is None
+    assert regressed["status"] == "regression" and regressed["baseline"] == 2.0
+    assert describe(regressed) == "Step '1' took 4.00s, regressed from a baseline of 2.00s"
+
+
+def test_over_budget_takes_precedence_over_regression():
+    [result] = evaluate_steps({"1": 10.0}, {"1": 5.0}, {"1": [1.0, 1.0, 1.0]})
+    assert result["status"] == "over_budget"
+
+
+def test_steps_within_budget_and_baseline_are_ok():
+    results = evaluate_steps({"1": 1.2, "2": 0.5}, {"1": 2.0}, {"1": [1.0, 1.0, 1.0]})
+    assert [result["status"] for result in results] == ["ok", "ok"]
@@ -0,0 +1,59 @@
+from utils.test_history import DurationHistory, StepTimer
+
+
+def make_history(tmp_path, name="durations.json"):
+    return DurationHistory(path=str(tmp_path / name), max_samples=3, load=False)
+
+
+def test_record_keeps_the_most_recent_samples(tmp_path):
+    history = make_history(tmp_path)
+    for duration in (1, 2, 3, 4):
+        history.record("t::a", duration, {"1": duration / 2})
+    assert history.tests["t::a"]["durations"] == [2, 3, 4]
+    assert history.step_samples("t::a", 1) == [1.0, 1.5, 2.0]
+    assert history.estimate("t::a") == 3
+    assert history.estimate("t::missing", default=7.0) == 7.0
+
+
+def test_merge_keys_step_samples_by_step_name(tmp_path):
+    worker = make_history(tmp_path, "worker.json")
+    worker.record("t::a", 10.0, {"1": 1.0, "2": 2.0, "3": 3.0})
+    # The second run skipped step 2
+    worker.record("t::a", 11.0, {"1": 1.1, "3": 3.1})
+
+    history = make_history(tmp_path)
+    history.record("t::a", 9.0, {"2": 2.2})
+    history.merge(worker)
+
+    assert history.tests["t::a"]["durations"] == [9.0, 10.0, 11.0]
+    assert history.step_samples("t::a", "1") == [1.0, 1.1]
+    assert history.step_samples("t::a", "2") == [2.2, 2.0]
+    assert history.step_samples("t::a", "3") == [3.0, 3.1]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    history = make_history(tmp_path)
+    history.record("t::a", 1.23456, {"setup": 0.5})
+    history.save()
+    loaded = DurationHistory(path=history.path)
+    assert loaded.tests == {"t::a": {"durations": [1.235], "steps": {"setup": [0.5]}}}
+
+
+def test_step_timer_accumulates_repeated_steps():
+    timer = StepTimer()
+    timer.start("1")
+    timer.start("2")
+    timer.start("1")
+    steps = timer.collect()
+    assert set(steps) == {"1", "2"}
+    assert timer.collect() == {}
+
+
+def test_only_histories_with_new_samples_are_dirty(tmp_path):
+    history = make_history(tmp_path)
+    assert not history.dirty
+    history.record("t::a", 1.0)
+    assert history.dirty
+    merged = make_history(tmp_path, "merged.json")
+    merged.merge(make_history(tmp_path, "empty.json"))
+    assert not merged.dirty
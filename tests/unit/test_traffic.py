@@ -0,0 +1,45 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from utils.traffic import TrafficArchive, TrafficInterceptor
+
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, method, params=None, wait=True):
+        self.sent.append((method, params))
+        return {}
+
+
+def make_archive(tmp_path):
+    archive = TrafficArchive(str(tmp_path), "scenario", ignore_params=["_"])
+    archive.add("GET", "https://m.twitch.tv/api?_=1", "", 200, [{"name": "Content-Type", "value": "text/plain"}],
+                b"hello", 12.0)
+    return archive
+
+
+def paused(url, request_id):
+    return {"requestId": request_id, "request": {"method": "GET", "url": url}}
+
+
+def test_replay_matches_requests_ignoring_cache_busters(tmp_path):
+    make_archive(tmp_path).save()
+    interceptor = TrafficInterceptor(None, TrafficArchive(str(tmp_path), "scenario", ["_"]).load(), "replay")
+    interceptor.session = FakeSession()
+    interceptor._on_replay(paused("https://m.twitch.tv/api?_=2", "1"))
+
+    method, params = interceptor.session.sent[0]
+    assert method == "Fetch.fulfillRequest"
+    assert base64.b64decode(params["body"]) == b"hello"
+
+
+def test_replay_stats_are_not_lost_across_handler_threads(tmp_path):
+    interceptor = TrafficInterceptor(None, make_archive(tmp_path), "replay")
+    interceptor.session = FakeSession()
+    urls = ["https://m.twitch.tv/api", "https://m.twitch.tv/unknown"] * 500
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda item: interceptor._on_replay(paused(item[1], str(item[0]))), enumerate(urls)))
+
+    assert interceptor.stats == {"recorded": 0, "served": 500, "missed": 500}
+    assert len(interceptor.missed_urls) == 50
@@ -11,4 +11,15 @@ CONFIG_DIR = os.path.join(PROJECT_ROOT, "config")
 
 # Create directories if they don't exist
 for directory in [SCREENSHOTS_DIR, LOGS_DIR, DATA_DIR, CONFIG_DIR]:
-    os.makedirs(directory, exist_ok=True) 
\ No newline at end of file
+    os.makedirs(directory, exist_ok=True) 
+
+
+def get_worker_id():
+    """Return the parallel worker id (e.g. 'w0'), or '' when running serially"""
+    return os.environ.get("AQA_WORKER_ID", "")
+
+
+def worker_path(base):
+    """Return a per-worker subdirectory of base so parallel workers never share artifact paths"""
+    worker_id = get_worker_id()
+    return os.path.join(base, worker_id) if worker_id else base
@@ -0,0 +1,319 @@
+"""Background pipeline for screenshots, GIFs and other test artifacts.
+
+The test thread only captures the raw screenshot bytes; writing them to disk,
+assembling GIFs and other slow work runs on worker threads. When too much work is
+queued, new captures wait (backpressure) instead of growing memory without bound.
+Everything still pending is flushed at session end.
+
+With failure-only retention, captures and log lines of the running test are kept
+in a bounded in-memory ring buffer and only written when the test fails or is
+marked for capture.
+"""
+
+import collections
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import allure
+
+RETENTION_MODES = ("all", "failures")
+
+
+class RetentionBuffer:
+    """Ring buffer of the last step frames and log lines of one test"""
+
+    def __init__(self, max_frames=20, max_log_lines=1000):
+        """
+        Args:
+            max_frames: Screenshots kept; older ones are dropped first
+            max_log_lines: Log lines kept; older ones are dropped first
+        """
+        self.frames = collections.deque(maxlen=max_frames)
+        self.log_lines = collections.deque(maxlen=max_log_lines)
+        self.deferred = []
+        self.dropped_frames = 0
+        self.handler = _RingLogHandler(self.log_lines)
+
+    def add_frame(self, path, data, attach_name=None):
+        if len(self.frames) == self.frames.maxlen:
+            self.dropped_frames += 1
+        self.frames.append((path, data, attach_name))
+
+
+class _RingLogHandler(logging.Handler):
+    def __init__(self, lines):
+        super().__init__()
+        self.lines = lines
+        self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class ArtifactPipeline:
+    """Writes and assembles test artifacts on background threads"""
+
+    def __init__(self, workers=2, max_pending=16, max_pending_mb=128):
+        """
+        Args:
+            workers: Threads that write artifacts
+            max_pending: Queued jobs before captures wait for the backlog to drain
+            max_pending_mb: Queued artifact bytes before captures wait
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_pending_bytes = int(max_pending_mb * 1024 * 1024)
+        self.stats = {"captures": 0, "capture_seconds": 0.0, "blocked_seconds": 0.0, "jobs": 0,
+                      "failed": 0, "background_seconds": 0.0, "bytes_written": 0,
+                      "tests_kept": 0, "tests_discarded": 0, "bytes_discarded": 0}
+        self.retention = None
+        self._executor = None
+        self._assembler = None
+        self._condition = threading.Condition()
+        self._pending_jobs = 0
+        self._pending_bytes = 0
+        self._futures = set()
+        self._dir_futures = {}
+        self._attachments = []
+        self.logger = logging.getLogger(__name__)
+
+    def configure(self, section):
+        """Apply the 'artifacts' section of config.yaml (worker count takes effect on next start)"""
+        section = section or {}
+        self.workers = section.get('workers', self.workers)
+        self.max_pending = section.get('max_pending', self.max_pending)
+        if 'max_pending_mb' in section:
+            self.max_pending_bytes = int(section['max_pending_mb'] * 1024 * 1024)
+
+    def capture(self, driver, path, attach_name=None):
+        """
+        Take a screenshot and write it to path in the background
+
+        Only the screenshot command itself (and any backpressure wait) runs on the
+        calling thread. While retention is active the bytes stay in memory instead.
+
+        Args:
+            driver: WebDriver instance
+            path: Destination PNG path
+            attach_name: Attach the screenshot to the Allure report under this name
+
+        Returns:
+            str: path (the file exists once the pipeline has written it)
+        """
+        started = time.perf_counter()
+        data = driver.get_screenshot_as_png()
+        with self._condition:
+            self.stats["captures"] += 1
+            self.stats["capture_seconds"] += time.perf_counter() - started
+        if self.retention is not None:
+            self.retention.add_frame(path, data, attach_name)
+        else:
+            self.write(path, data, attach_name)
+        return path
+
+    def write(self, path, data, attach_name=None, attachment_type=allure.attachment_type.PNG):
+        """Write bytes to path in the background; returns the job's Future"""
+        future = self.submit(self._write_file, path, data, size=len(data))
+        directory = os.path.dirname(os.path.abspath(path))
+        with self._condition:
+            queued = [f for f in self._dir_futures.get(directory, []) if not f.done()]
+            self._dir_futures[directory] = queued + [future]
+            if attach_name:
+                self._attachments.append((future, path, attach_name, attachment_type))
+        return future
+
+    def submit(self, func, *args, size=0, **kwargs):
+        """
+        Run func(*args, **kwargs) on a pipeline thread
+
+        Args:
+            size: Bytes the job holds in memory until it finishes, counted for backpressure
+
+        Returns:
+            Future: Resolves to the function's result
+        """
+        self._acquire(size)
+        try:
+            future = self._pool().submit(self._run, func, size, *args, **kwargs)
+        except Exception:
+            self._release(size)
+            raise
+        with self._condition:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def create_gif(self, gif_generator, screenshots_dir, output_name, duration=500):
+        """
+        Assemble a GIF once every screenshot queued for screenshots_dir is written
+
+        Args:
+            gif_generator: GifGenerator that writes the GIF
+            screenshots_dir: Directory containing screenshots
+            output_name: Name for the output GIF file
+            duration: Duration for each frame in milliseconds
+
+        Returns:
+            Future: Resolves to the GIF path (None while retention defers the GIF)
+        """
+        if self.retention is not None:
+            # Built only if the test's frames are kept
+            self.retention.deferred.append((self.create_gif, (gif_generator, screenshots_dir, output_name, duration)))
+            return None
+        with self._condition:
+            writes = list(self._dir_futures.pop(os.path.abspath(screenshots_dir), []))
+
+        def assemble():
+            wait(writes)
+            return gif_generator.create_gif_from_screenshots(screenshots_dir, output_name, duration=duration)
+
+        # Assembly waits on write jobs, so it runs on its own thread to never starve the writers
+        self._acquire(0)
+        if self._assembler is None:
+            self._assembler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-gif")
+        future = self._assembler.submit(self._run, assemble, 0)
+        with self._condition:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def attach_pending(self):
+        """
+        Register queued Allure attachments, waiting for their files to be written
+
+        Allure attaches to the test running on the calling thread, so this runs in the
+        test's teardown rather than on a pipeline thread.
+        """
+        with self._condition:
+            attachments, self._attachments = self._attachments, []
+        for future, path, name, attachment_type in attachments:
+            if future.exception() is None:
+                allure.attach.file(path, name=name, attachment_type=attachment_type)
+
+    def start_retention(self, max_frames=20, max_log_lines=1000):
+        """
+        Keep the current test's captures and log lines in memory instead of writing them
+
+        Returns:
+            RetentionBuffer: The buffer, passed to finish_retention() when the test ends
+        """
+        self.retention = RetentionBuffer(max_frames, max_log_lines)
+        logging.getLogger().addHandler(self.retention.handler)
+        return self.retention
+
+    def finish_retention(self, keep, log_path=None):
+        """
+        End retention for the current test; write its buffer only when it is kept
+
+        Args:
+            keep: True for failed or capture-marked tests
+            log_path: Where to write the buffered log lines of a kept test
+
+        Returns:
+            int: Number of frames written
+        """
+        buffer, self.retention = self.retention, None
+        if buffer is None:
+            return 0
+        logging.getLogger().removeHandler(buffer.handler)
+        if not keep:
+            with self._condition:
+                self.stats["tests_discarded"] += 1
+                self.stats["bytes_discarded"] += sum(len(data) for _, data, _ in buffer.frames)
+            return 0
+
+        with self._condition:
+            self.stats["tests_kept"] += 1
+        for path, data, attach_name in buffer.frames:
+            self.write(path, data, attach_name or os.path.basename(path))
+        for func, args in buffer.deferred:
+            func(*args)
+        if log_path and buffer.log_lines:
+            text = "\n".join(buffer.log_lines) + "\n"
+            if buffer.dropped_frames:
+                text = f"[{buffer.dropped_frames} older screenshots were dropped from the ring buffer]\n" + text
+            self.write(log_path, text.encode("utf-8"), os.path.basename(log_path), allure.attachment_type.TEXT)
+        return len(buffer.frames)
+
+    def flush(self, timeout=None):
+        """
+        Wait for every queued job
+
+        Returns:
+            dict: Pipeline statistics, including jobs still pending after the timeout
+        """
+        with self._condition:
+            futures = list(self._futures)
+        done, not_done = wait(futures, timeout=timeout)
+        with self._condition:
+            self._dir_futures.clear()
+            stats = dict(self.stats, pending=len(not_done))
+        if futures:
+            self.logger.info(f"Flushed {len(done)} artifact jobs ({self.stats['failed']} failed), "
+                             f"capture {self.stats['capture_seconds']:.2f}s on test threads, "
+                             f"{self.stats['background_seconds']:.2f}s in the background")
+        return stats
+
+    def shutdown(self):
+        """Flush and stop the worker threads (they are recreated on next use)"""
+        self.flush()
+        for executor in (self._executor, self._assembler):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._executor = self._assembler = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="artifacts")
+        return self._executor
+
+    def _acquire(self, size):
+        with self._condition:
+            started = time.perf_counter()
+            while self._pending_jobs and (self._pending_jobs >= self.max_pending
+                                          or self._pending_bytes + size > self.max_pending_bytes):
+                self._condition.wait()
+            self.stats["blocked_seconds"] += time.perf_counter() - started
+            self._pending_jobs += 1
+            self._pending_bytes += size
+            self.stats["jobs"] += 1
+
+    def _release(self, size, seconds=0.0, failed=False):
+        with self._condition:
+            self._pending_jobs -= 1
+            self._pending_bytes -= size
+            self.stats["background_seconds"] += seconds
+            self.stats["failed"] += int(failed)
+            self._condition.notify_all()
+
+    def _run(self, func, size, *args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            failed = True
+            self.logger.error(f"Artifact job {getattr(func, '__name__', func)} failed: {str(e)}")
+            raise
+        finally:
+            self._release(size, time.perf_counter() - started, failed)
+
+    def _write_file(self, path, data):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        with self._condition:
+            self.stats["bytes_written"] += len(data)
+        return path
+
+    def _forget(self, future):
+        with self._condition:
+            self._futures.discard(future)
+
+
+artifact_pipeline = ArtifactPipeline()
@@ -0,0 +1,134 @@
+import itertools
+import json
+import logging
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import websocket
+
+
+class CdpSession:
+    """Direct DevTools Protocol connection to the page target of a Chrome driver
+
+    ``driver.execute_cdp_cmd`` can send commands but never receives events. This
+    session connects to the same page over Chrome's debugger websocket, so callers
+    can subscribe to events such as Fetch.requestPaused or Page.screencastFrame.
+    Event handlers run on a small worker pool and may send commands themselves.
+    """
+
+    def __init__(self, driver, workers=4, timeout=10):
+        """
+        Args:
+            driver: Chrome WebDriver (its debuggerAddress capability is used)
+            workers: Threads that run event handlers
+            timeout: Seconds to wait for a command response
+        """
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._handlers = {}
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cdp-events")
+        self._socket = websocket.create_connection(
+            self._page_websocket_url(driver), timeout=timeout, suppress_origin=True
+        )
+        # Block in recv() indefinitely; close() unblocks the reader
+        self._socket.settimeout(None)
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    @staticmethod
+    def _page_websocket_url(driver):
+        address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            raise RuntimeError("Driver exposes no DevTools debugger address (Chrome only)")
+        with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+            targets = json.load(response)
+        pages = [target for target in targets if target.get("type") == "page"]
+        # Chromedriver window handles are DevTools target ids
+        handle = driver.current_window_handle
+        for target in pages:
+            if target.get("id") == handle:
+                return target["webSocketDebuggerUrl"]
+        if not pages:
+            raise RuntimeError(f"No page target found at {address}")
+        return pages[0]["webSocketDebuggerUrl"]
+
+    def on(self, method, handler):
+        """Call handler(params) for every event with the given method name"""
+        self._handlers.setdefault(method, []).append(handler)
+
+    def send(self, method, params=None, wait=True):
+        """
+        Send a DevTools command
+
+        Args:
+            method: Command name, e.g. 'Fetch.enable'
+            params: Command parameters
+            wait: False to return without waiting for the response
+
+        Returns:
+            dict: The command result (None when wait is False)
+
+        Raises:
+            RuntimeError: If the browser reports an error or the response times out
+        """
+        message_id = next(self._ids)
+        waiter = {"event": threading.Event(), "message": None}
+        if wait:
+            with self._lock:
+                self._pending[message_id] = waiter
+        with self._send_lock:
+            self._socket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        if not wait:
+            return None
+
+        if not waiter["event"].wait(self.timeout):
+            with self._lock:
+                self._pending.pop(message_id, None)
+            raise RuntimeError(f"No response to {method} within {self.timeout}s")
+        message = waiter["message"]
+        if "error" in message:
+            raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    def close(self):
+        """Stop dispatching events and close the websocket"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._socket.close()
+        except Exception:
+            pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _read_loop(self):
+        while not self._closed:
+            try:
+                message = json.loads(self._socket.recv())
+            except Exception:
+                break
+            if "id" in message:
+                with self._lock:
+                    waiter = self._pending.pop(message["id"], None)
+                if waiter:
+                    waiter["message"] = message
+                    waiter["event"].set()
+            else:
+                for handler in self._handlers.get(message.get("method"), []):
+                    try:
+                        self._executor.submit(self._dispatch, handler, message.get("params", {}))
+                    except RuntimeError:
+                        # Executor already shut down by close()
+                        return
+
+    def _dispatch(self, handler, params):
+        try:
+            handler(params)
+        except Exception as e:
+            if not self._closed:
+                self.logger.warning(f"CDP event handler failed: {str(e)}")
@@ -0,0 +1,155 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from utils import PROJECT_ROOT
+
+PAGES_DIR = os.path.join(PROJECT_ROOT, "pages")
+TESTS_DIR = os.path.join(PROJECT_ROOT, "tests")
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of numbers (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _payload_size(value):
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _issuing_caller():
+    """Return 'Class.method' of the page-object (or test) frame that issued the command"""
+    frame = sys._getframe(2)
+    test_caller = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PAGES_DIR):
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        if test_caller is None and filename.startswith(TESTS_DIR):
+            test_caller = f"{os.path.basename(filename)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return test_caller or "framework"
+
+
+class CommandRecorder:
+    """Records every WebDriver command issued through instrumented drivers"""
+
+    def __init__(self):
+        self.records = []
+        self.current_test = None
+        self._lock = threading.Lock()
+
+    def instrument(self, driver):
+        """
+        Wrap a driver so each command's duration, payload size and issuing caller is recorded
+
+        WebElement methods go through the parent driver's execute(), so element
+        commands (find, click, text, ...) are captured as well.
+
+        Args:
+            driver: WebDriver instance (instrumenting twice is a no-op)
+
+        Returns:
+            WebDriver: The same driver
+        """
+        if getattr(driver, "_aqa_recorder", None) is self:
+            return driver
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = original_execute(driver_command, params)
+                return response
+            finally:
+                self._record(driver_command, time.perf_counter() - started, params, response)
+
+        driver.execute = execute
+        driver._aqa_recorder = self
+        return driver
+
+    def start_test(self, test_id):
+        """Attribute subsequent commands to a test"""
+        self.current_test = test_id
+
+    def stop_test(self):
+        """Stop attributing commands to the current test"""
+        self.current_test = None
+
+    def _record(self, command, seconds, params, response):
+        record = {
+            "test": self.current_test,
+            "command": command,
+            "seconds": seconds,
+            "request_bytes": _payload_size(params),
+            "response_bytes": _payload_size(response.get("value")) if isinstance(response, dict) else 0,
+            "caller": _issuing_caller()
+        }
+        with self._lock:
+            self.records.append(record)
+
+    def test_summary(self):
+        """
+        Summarise commands per test
+
+        Returns:
+            dict: test id -> counts, total seconds, percentiles, histogram and per-command totals
+        """
+        by_test = {}
+        for record in self.records:
+            by_test.setdefault(record["test"] or "<outside tests>", []).append(record)
+
+        summary = {}
+        for test_id, records in by_test.items():
+            durations = [record["seconds"] for record in records]
+            histogram = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+            histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+            for seconds in durations:
+                bound = next((b for b in HISTOGRAM_BUCKETS_MS if seconds * 1000 <= b), None)
+                histogram[f"<={bound}ms" if bound else f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+
+            by_command = {}
+            for record in records:
+                entry = by_command.setdefault(record["command"], {"count": 0, "seconds": 0.0, "bytes": 0})
+                entry["count"] += 1
+                entry["seconds"] += record["seconds"]
+                entry["bytes"] += record["request_bytes"] + record["response_bytes"]
+
+            summary[test_id] = {
+                "commands": len(records),
+                "total_seconds": sum(durations),
+                "p50_seconds": percentile(durations, 0.50),
+                "p95_seconds": percentile(durations, 0.95),
+                "max_seconds": max(durations),
+                "histogram": histogram,
+                "by_command": by_command
+            }
+        return summary
+
+    def slowest(self, count=10):
+        """Return the slowest recorded commands, slowest first"""
+        return sorted(self.records, key=lambda record: record["seconds"], reverse=True)[:count]
+
+    def write_json(self, path, slowest=10):
+        """Write per-test summaries and the slowest commands to a JSON report"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"tests": self.test_summary(), "slowest": self.slowest(slowest)}, f, indent=2)
+        return path
+
+
+# Shared recorder; drivers are only instrumented when --instrument-commands is given
+command_recorder = CommandRecorder()
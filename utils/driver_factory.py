@@ -1,67 +1,200 @@
 import json
 import os
 import logging
+import threading
+import time
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+from utils import CONFIG_DIR
+from utils.driver_resolver import DriverBinaryResolver
+from utils.resource_blocking import resource_blocker
+from utils.screencast import ScreencastRecorder
+from utils.traffic import TrafficInterceptor
+from utils.waits import IDLE_MONITOR_SCRIPT
+from utils.web_vitals import VITALS_OBSERVER_SCRIPT
 
 
 class DriverFactory:
     """Factory class to create WebDriver instances with mobile emulation"""
     
-    CHROME_DEVICES = {
-        "Pixel 2": {
-            "width": 411,
-            "height": 731,
-            "userAgent": "Mozilla/5.0 (Linux; Android 8.0; Pixel 2 Build/OPD3.170816.012) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Mobile Safari/537.36"
-        }
-    }
+    resolver = DriverBinaryResolver()
+    
+    DEVICES_PATH = os.path.join(CONFIG_DIR, "devices.json")
+    THROTTLING_PROFILES_PATH = os.path.join(CONFIG_DIR, "throttling_profiles.json")
+    
+    # Throttling values that select the device's own profile or disable throttling
+    DEVICE_PROFILE = "device"
+    NO_THROTTLING = "none"
+    
+    @staticmethod
+    def _load_json(path):
+        with open(path, 'r') as f:
+            return json.load(f)
     
     @staticmethod
     def get_device_config(device_name="Pixel 2"):
-        """Load device configuration"""
-        if device_name not in DriverFactory.CHROME_DEVICES:
-            available_devices = ", ".join(DriverFactory.CHROME_DEVICES.keys())
-            logging.error(f"Device '{device_name}' not found. Available devices: {available_devices}")
-            raise ValueError(f"Device '{device_name}' not found in configuration")
+        """Load device configuration from devices.json by key (pixel_2) or device name (Pixel 2)"""
+        devices = DriverFactory._load_json(DriverFactory.DEVICES_PATH)
+        for key, device in devices.items():
+            if device_name in (key, device["deviceName"]):
+                logging.info(f"Using device configuration: {device['deviceName']}")
+                return device
+        
+        available_devices = ", ".join(devices.keys())
+        logging.error(f"Device '{device_name}' not found. Available devices: {available_devices}")
+        raise ValueError(f"Device '{device_name}' not found in configuration")
+    
+    @staticmethod
+    def get_throttling_profile(device_config, throttling=NO_THROTTLING):
+        """Resolve the network/CPU throttling profile to apply
+        
+        Args:
+            device_config (dict): Entry from devices.json
+            throttling (str): Profile name from throttling_profiles.json, 'device' for the
+                device's own profile or 'none' to disable throttling
+            
+        Returns:
+            dict: Profile with latency_ms, download_kbps, upload_kbps and cpu_slowdown, or None
+        """
+        if throttling == DriverFactory.DEVICE_PROFILE:
+            throttling = device_config.get("throttling", DriverFactory.NO_THROTTLING)
+        if not throttling or throttling == DriverFactory.NO_THROTTLING:
+            return None
+        if isinstance(throttling, dict):
+            return throttling
+        
+        profiles = DriverFactory._load_json(DriverFactory.THROTTLING_PROFILES_PATH)
+        if throttling not in profiles:
+            available_profiles = ", ".join(profiles.keys())
+            logging.error(f"Throttling profile '{throttling}' not found. Available profiles: {available_profiles}")
+            raise ValueError(f"Throttling profile '{throttling}' not found in configuration")
+        return dict(profiles[throttling], name=throttling)
+    
+    @staticmethod
+    def apply_throttling(driver, profile):
+        """Apply network and CPU throttling to a Chrome driver through the DevTools Protocol
+        
+        Args:
+            driver: Chrome WebDriver
+            profile (dict): Profile from get_throttling_profile(), None leaves the driver unthrottled
+        """
+        if profile is None:
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": profile["latency_ms"],
+            # DevTools expects bytes per second
+            "downloadThroughput": profile["download_kbps"] * 1000 / 8,
+            "uploadThroughput": profile["upload_kbps"] * 1000 / 8
+        })
+        driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile.get("cpu_slowdown", 1)})
+        logging.info(f"Applied throttling profile {profile.get('name', profile)}")
+    
+    @staticmethod
+    def start_traffic(driver, archive, mode="live", latency=0, on_miss="fail"):
+        """Start recording traffic into, or replaying it from, an archive
+        
+        Args:
+            driver: Chrome WebDriver
+            archive (TrafficArchive): Scenario archive, loaded when replaying
+            mode (str): 'live' (no interception), 'record' or 'replay'
+            latency: Replay delay in ms, or 'recorded' to reuse the observed latency
+            on_miss (str): 'fail' or 'live' for requests missing from the archive
             
-        logging.info(f"Using device configuration: {device_name}")
-        return DriverFactory.CHROME_DEVICES[device_name]
+        Returns:
+            TrafficInterceptor: Started interceptor to stop() after the test, or None in live mode
+        """
+        if mode == "live":
+            return None
+        if not hasattr(driver, "execute_cdp_cmd"):
+            logging.warning(f"Traffic {mode} needs the DevTools Protocol, running live")
+            return None
+        return TrafficInterceptor(driver, archive, mode, latency=latency, on_miss=on_miss).start()
     
     @staticmethod
-    def create_driver(device_name="Pixel 2", browser_type="chrome", headless=False):
+    def start_screencast(driver, settings=None):
+        """Start recording the page with the DevTools screencast instead of per-step screenshots
+        
+        Args:
+            driver: Chrome WebDriver
+            settings (dict): The 'screencast' section of config.yaml (fps, quality, max_width,
+                max_frames, max_buffer_mb)
+            
+        Returns:
+            ScreencastRecorder: Started recorder to stop() after the test, or None when unsupported
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            logging.warning("Screencast recording needs the DevTools Protocol, falling back to screenshots")
+            return None
+        settings = settings or {}
+        return ScreencastRecorder(
+            driver,
+            fps=settings.get('fps', 5),
+            quality=settings.get('quality', 60),
+            max_width=settings.get('max_width', 480),
+            max_frames=settings.get('max_frames', 300),
+            max_buffer_mb=settings.get('max_buffer_mb', 64)
+        ).start()
+    
+    @staticmethod
+    def create_driver(device_name="Pixel 2", browser_type="chrome", headless=False, recorder=None,
+                      throttling=NO_THROTTLING, blocked_resources=None, network_log=None):
         """Create and configure a WebDriver instance based on device and browser type
         
         Args:
-            device_name (str): Name of the device to emulate (must exist in CHROME_DEVICES)
+            device_name (str): Key or name of the device to emulate (must exist in devices.json)
             browser_type (str): Type of browser to use ('chrome' or 'firefox')
             headless (bool): Whether to run the browser in headless mode
+            recorder (CommandRecorder): Opt-in recorder that times every WebDriver command
+            throttling (str): Throttling profile name, 'device' or 'none' (default)
+            blocked_resources (list): Blocklist names from blocklists.json, e.g. ['media', 'fonts']
+            network_log (bool): Record network events in Chrome's performance log so blocked
+                requests can be counted and resource sizes learned; defaults to whether any
+                blocklist is given
             
         Returns:
             WebDriver: Configured WebDriver instance
         """
+        if network_log is None:
+            network_log = bool(blocked_resources)
         browser_type = browser_type.lower()
-        logging.info(f"Creating driver for {device_name} using {browser_type} browser (headless: {headless})")
+        logging.info(f"Creating driver for {device_name} using {browser_type} browser "
+                     f"(headless: {headless}, throttling: {throttling})")
         
         if browser_type == "chrome":
-            return DriverFactory._create_chrome_driver(device_name, headless)
+            driver = DriverFactory._create_chrome_driver(device_name, headless, throttling, network_log)
         elif browser_type == "firefox":
-            return DriverFactory._create_firefox_driver(device_name, headless)
+            driver = DriverFactory._create_firefox_driver(device_name, headless, throttling)
         else:
             logging.error(f"Browser type '{browser_type}' not supported")
             raise ValueError(f"Browser type '{browser_type}' not supported")
+        
+        if blocked_resources:
+            resource_blocker.apply(driver, blocked_resources)
+        if recorder is not None:
+            recorder.instrument(driver)
+        return driver
     
     @staticmethod
-    def _create_chrome_driver(device_name, headless):
-        """Create a Chrome WebDriver with mobile emulation settings"""
+    def _create_chrome_driver(device_name, headless, throttling=NO_THROTTLING, network_log=False):
+        """Create a Chrome WebDriver with mobile emulation and throttling settings"""
         device_config = DriverFactory.get_device_config(device_name)
+        profile = DriverFactory.get_throttling_profile(device_config, throttling)
         
         chrome_options = webdriver.ChromeOptions()
         
-        # Set mobile emulation using device name
-        chrome_options.add_experimental_option("mobileEmulation", {"deviceName": device_name})
+        # Set mobile emulation from the devices.json metrics
+        chrome_options.add_experimental_option("mobileEmulation", {
+            "deviceMetrics": {
+                "width": device_config["width"],
+                "height": device_config["height"],
+                "pixelRatio": device_config.get("deviceScaleFactor", 1)
+            },
+            "userAgent": device_config["userAgent"]
+        })
         
         if headless:
             chrome_options.add_argument("--headless=new")
@@ -72,10 +205,23 @@ class DriverFactory:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--disable-extensions")
         
+        # Network events in the performance log let ResourceBlocker count blocked requests and learn
+        # resource sizes. Only enabled with blocking or size learning, since event logging slows every page down
+        if network_log:
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        
         try:
-            service = ChromeService(ChromeDriverManager().install())
+            service = ChromeService(DriverFactory.resolver.resolve("chrome"))
             driver = webdriver.Chrome(service=service, options=chrome_options)
             
+            # Track DOM mutations and in-flight requests from the very start of every page
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": IDLE_MONITOR_SCRIPT})
+            # Observe LCP, layout shifts, interactions and long tasks for web vitals collection
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": VITALS_OBSERVER_SCRIPT})
+            
+            DriverFactory.apply_throttling(driver, profile)
+            
             # Set window size slightly larger than the device dimensions to account for browser UI
             driver.set_window_size(
                 device_config["width"] + 50, 
@@ -88,9 +234,11 @@ class DriverFactory:
             raise
     
     @staticmethod
-    def _create_firefox_driver(device_name, headless):
+    def _create_firefox_driver(device_name, headless, throttling=NO_THROTTLING):
         """Create a Firefox WebDriver with mobile emulation settings"""
         device_config = DriverFactory.get_device_config(device_name)
+        if DriverFactory.get_throttling_profile(device_config, throttling) is not None:
+            logging.warning("Network and CPU throttling need the DevTools Protocol, Firefox runs unthrottled")
         
         firefox_options = webdriver.FirefoxOptions()
         
@@ -101,7 +249,7 @@ class DriverFactory:
             firefox_options.add_argument("--headless")
         
         try:
-            service = FirefoxService(GeckoDriverManager().install())
+            service = FirefoxService(DriverFactory.resolver.resolve("firefox"))
             driver = webdriver.Firefox(service=service, options=firefox_options)
             
             # Set window size slightly larger than the device dimensions
@@ -113,4 +261,221 @@ class DriverFactory:
             return driver
         except Exception as e:
             logging.error(f"Failed to create Firefox driver: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+class DriverPool:
+    """Pool of warm, device-configured WebDriver instances reused across tests
+
+    Drivers are keyed by (device, browser, headless, throttling, network log). A released driver is reset
+    (cookies, storage, extra tabs, window size) and handed to the next test that
+    asks for the same key, so only the first test per key pays browser start-up.
+    Drivers are retired after ``max_uses`` hand-outs or when they stop responding.
+    """
+    
+    def __init__(self, size=1, max_uses=20, creator=None):
+        """
+        Args:
+            size (int): Number of warm drivers to keep per device/browser combination
+            max_uses (int): Number of tests a driver may serve before it is replaced
+            creator (callable): Driver constructor, defaults to DriverFactory.create_driver
+        """
+        self.size = max(1, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self._creator = creator or DriverFactory.create_driver
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._keys = {}
+        self._uses = {}
+        self._window_sizes = {}
+        self._warming = {}
+        self._closed = False
+    
+    @staticmethod
+    def _make_key(device_name, browser_type, headless, throttling, network_log=False):
+        return (device_name, browser_type.lower(), bool(headless), throttling, bool(network_log))
+    
+    def acquire(self, device_name="Pixel 2", browser_type="chrome", headless=False,
+                throttling=DriverFactory.NO_THROTTLING, network_log=False):
+        """Hand out a warm driver for the given device/browser/throttling, launching one if needed
+        
+        Args:
+            network_log (bool): Whether the driver needs the network performance log (resource blocking)
+        
+        Returns:
+            WebDriver: Driver reserved for the caller until release() is called
+        """
+        key = self._make_key(device_name, browser_type, headless, throttling, network_log)
+        
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                break
+            if self._is_healthy(driver):
+                self._uses[id(driver)] += 1
+                logging.info(f"Reusing pooled driver for {key} (use {self._uses[id(driver)]}/{self.max_uses})")
+                return driver
+            self._retire(driver, "unhealthy")
+        
+        driver = self._launch(key)
+        self._uses[id(driver)] += 1
+        self.warm(*key)
+        return driver
+    
+    def release(self, driver, healthy=True):
+        """Return a driver to the pool, resetting or retiring it as appropriate
+        
+        Args:
+            driver: Driver previously obtained from acquire()
+            healthy (bool): False to retire the driver regardless of its use count
+        """
+        key = self._keys.get(id(driver))
+        if key is None:
+            logging.warning("Released driver does not belong to this pool, quitting it")
+            self._quit(driver)
+            return
+        
+        if not healthy:
+            self._retire(driver, "marked unhealthy by caller")
+            return
+        if self._uses.get(id(driver), 0) >= self.max_uses:
+            self._retire(driver, f"reached {self.max_uses} uses")
+            return
+        
+        try:
+            self._reset(driver)
+        except Exception as e:
+            self._retire(driver, f"reset failed: {str(e)}")
+            return
+        
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if not self._closed and len(idle) < self.size:
+                idle.append(driver)
+                return
+        self._retire(driver, "pool is full")
+    
+    def warm(self, device_name="Pixel 2", browser_type="chrome", headless=False,
+             throttling=DriverFactory.NO_THROTTLING, network_log=False):
+        """Launch drivers in the background until the idle pool for the key is full"""
+        key = self._make_key(device_name, browser_type, headless, throttling, network_log)
+        with self._lock:
+            live = sum(1 for driver_key in self._keys.values() if driver_key == key)
+            missing = self.size - live - self._warming.get(key, 0)
+            if self._closed or missing <= 0:
+                return
+            self._warming[key] = self._warming.get(key, 0) + missing
+        
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, args=(key,), daemon=True).start()
+    
+    def _warm_one(self, key):
+        try:
+            driver = self._launch(key)
+        except Exception as e:
+            logging.warning(f"Failed to warm driver for {key}: {str(e)}")
+            with self._lock:
+                self._warming[key] -= 1
+            return
+        
+        with self._lock:
+            self._warming[key] -= 1
+            if not self._closed and len(self._idle.setdefault(key, [])) < self.size:
+                self._idle[key].append(driver)
+                return
+        self._retire(driver, "pool is full")
+    
+    def shutdown(self):
+        """Quit every idle driver and stop accepting released ones"""
+        with self._lock:
+            self._closed = True
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+        
+        for driver in drivers:
+            self._retire(driver, "pool shutdown")
+    
+    def _launch(self, key):
+        device_name, browser_type, headless, throttling, network_log = key
+        started = time.time()
+        driver = self._creator(device_name=device_name, browser_type=browser_type, headless=headless,
+                               throttling=throttling, network_log=network_log)
+        window_size = driver.get_window_size()
+        with self._lock:
+            self._keys[id(driver)] = key
+            self._uses[id(driver)] = 0
+            self._window_sizes[id(driver)] = window_size
+        logging.info(f"Launched pooled driver for {key} in {(time.time() - started):.2f} seconds")
+        return driver
+    
+    def _reset(self, driver):
+        """Bring a used driver back to a clean, single-tab, correctly sized state"""
+        cdp = hasattr(driver, "execute_cdp_cmd")
+        handles = driver.window_handles
+        origins = set()
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            if cdp:
+                origins.update(self._visited_origins(driver))
+            if handle != handles[0]:
+                driver.close()
+        
+        if cdp:
+            # Cookies go for every origin; other storage for every origin the test visited
+            # (redirects, iframes, other tabs). The HTTP cache is kept on purpose
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        else:
+            driver.delete_all_cookies()
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+        
+        driver.get("about:blank")
+        if cdp:
+            # The next reset then only sees origins of the next test
+            driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+        size = self._window_sizes[id(driver)]
+        driver.set_window_size(size["width"], size["height"])
+    
+    @staticmethod
+    def _visited_origins(driver):
+        """Origins of the current tab's navigation history and of the frames on its page"""
+        urls = [entry["url"] for entry in driver.execute_cdp_cmd("Page.getNavigationHistory", {}).get("entries", [])]
+        frames = [driver.execute_cdp_cmd("Page.getFrameTree", {}).get("frameTree", {})]
+        while frames:
+            node = frames.pop()
+            urls.append(node.get("frame", {}).get("url", ""))
+            frames.extend(node.get("childFrames", []))
+        origins = set()
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme in ("http", "https") and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+    
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+    
+    def _retire(self, driver, reason):
+        logging.info(f"Retiring pooled driver: {reason}")
+        with self._lock:
+            self._keys.pop(id(driver), None)
+            self._uses.pop(id(driver), None)
+            self._window_sizes.pop(id(driver), None)
+        self._quit(driver)
+    
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f"Error while quitting driver: {str(e)}")
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from utils.exceptions import DriverResolutionError
+
+
+class DriverBinaryResolver:
+    """Resolve browser driver binaries once per machine using an on-disk manifest
+    
+    Resolution order for a browser:
+        1. Explicit binary path from the environment (CHROMEDRIVER_PATH / GECKODRIVER_PATH)
+        2. Path already resolved in this process
+        3. Manifest entry keyed by the installed browser version
+        4. Offline mode: newest cached entry for the browser, then the driver on PATH
+        5. Online mode: webdriver-manager download, recorded in the manifest
+    
+    When the browser version cannot be detected there is nothing to key the manifest by,
+    so steps 3 and 5 neither read nor record an entry and the driver is re-resolved each run.
+    """
+    
+    BROWSERS = {
+        "chrome": {
+            "driver": "chromedriver",
+            "env": "CHROMEDRIVER_PATH",
+            "executables": [
+                "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+            ]
+        },
+        "firefox": {
+            "driver": "geckodriver",
+            "env": "GECKODRIVER_PATH",
+            "executables": [
+                "firefox",
+                "/Applications/Firefox.app/Contents/MacOS/firefox"
+            ]
+        }
+    }
+    
+    def __init__(self, manifest_path=None, offline=None):
+        """
+        Args:
+            manifest_path (str): Manifest location, defaults to the per-user cache directory
+            offline (bool): Never touch the network, defaults to the AQA_DRIVER_OFFLINE variable
+        """
+        if manifest_path is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+            manifest_path = os.path.join(cache_home, "aqa-wap-test", "drivers.json")
+        if offline is None:
+            offline = os.environ.get("AQA_DRIVER_OFFLINE", "").lower() in ("1", "true", "yes")
+        
+        self.manifest_path = manifest_path
+        self.offline = offline
+        self.timings = {}
+        self._resolved = {}
+    
+    def resolve(self, browser_type):
+        """Return the path to the driver binary for a browser
+        
+        Args:
+            browser_type (str): 'chrome' or 'firefox'
+            
+        Returns:
+            str: Absolute path to the driver executable
+            
+        Raises:
+            DriverResolutionError: If no usable binary can be found
+        """
+        browser_type = browser_type.lower()
+        if browser_type not in self.BROWSERS:
+            raise DriverResolutionError(f"No driver binary known for browser '{browser_type}'")
+        
+        started = time.perf_counter()
+        path, source = self._resolve(browser_type)
+        elapsed = time.perf_counter() - started
+        
+        self.timings.setdefault(browser_type, []).append({"seconds": elapsed, "source": source, "path": path})
+        logging.info(f"Resolved {self.BROWSERS[browser_type]['driver']} from {source} in {elapsed:.3f} seconds: {path}")
+        return path
+    
+    def _resolve(self, browser_type):
+        spec = self.BROWSERS[browser_type]
+        
+        env_path = os.environ.get(spec["env"])
+        if env_path:
+            if not os.path.isfile(env_path):
+                raise DriverResolutionError(f"{spec['env']} points to missing file '{env_path}'")
+            return env_path, "environment"
+        
+        if browser_type in self._resolved:
+            return self._resolved[browser_type], "memory"
+        
+        version = self.detect_browser_version(browser_type)
+        key = f"{browser_type}-{version}" if version else None
+        manifest = self._load_manifest()
+        
+        entry = manifest.get(key) if key else None
+        if entry and os.path.isfile(entry["path"]):
+            return self._remember(browser_type, entry["path"]), "manifest"
+        
+        if self.offline:
+            cached = sorted(
+                (
+                    e for k, e in manifest.items()
+                    if k.startswith(f"{browser_type}-") and e.get("browser_version") and os.path.isfile(e["path"])
+                ),
+                key=lambda e: e.get("resolved_at", 0),
+                reverse=True
+            )
+            if cached:
+                logging.warning(
+                    f"No manifest entry for {key or browser_type}, using cached driver {cached[0]['path']} offline"
+                )
+                return self._remember(browser_type, cached[0]["path"]), "manifest (offline fallback)"
+            
+            on_path = shutil.which(spec["driver"])
+            if on_path:
+                return self._remember(browser_type, on_path), "PATH"
+            raise DriverResolutionError(
+                f"Offline mode: no cached {spec['driver']} for {key or browser_type}; "
+                f"set {spec['env']} or resolve once online"
+            )
+        
+        path = self._download(browser_type)
+        if key:
+            manifest[key] = {"path": path, "browser_version": version, "resolved_at": time.time()}
+            self._save_manifest(manifest)
+        else:
+            logging.info(f"{browser_type} version unknown, not recording {path} in the driver manifest")
+        return self._remember(browser_type, path), "webdriver-manager"
+    
+    def summary(self):
+        """Return per-browser resolution totals for reporting
+        
+        Returns:
+            dict: browser -> {'calls', 'total_seconds', 'first_source', 'first_seconds'}
+        """
+        return {
+            browser: {
+                "calls": len(entries),
+                "total_seconds": sum(e["seconds"] for e in entries),
+                "first_source": entries[0]["source"],
+                "first_seconds": entries[0]["seconds"]
+            }
+            for browser, entries in self.timings.items()
+        }
+    
+    def detect_browser_version(self, browser_type):
+        """Return the installed browser version string, or None if it cannot be detected"""
+        for executable in self.BROWSERS[browser_type]["executables"]:
+            binary = executable if os.path.isabs(executable) else shutil.which(executable)
+            if not binary or not os.path.exists(binary):
+                continue
+            try:
+                output = subprocess.run(
+                    [binary, "--version"], capture_output=True, text=True, timeout=10
+                ).stdout
+            except (OSError, subprocess.SubprocessError) as e:
+                logging.debug(f"Could not query version of {binary}: {str(e)}")
+                continue
+            match = re.search(r"\d+(\.\d+)+", output)
+            if match:
+                return match.group(0)
+        return None
+    
+    def _download(self, browser_type):
+        # Imported lazily so that offline and cached resolution never load the manager
+        if browser_type == "chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager().install()
+    
+    def _remember(self, browser_type, path):
+        self._resolved[browser_type] = path
+        return path
+    
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable driver manifest {self.manifest_path}: {str(e)}")
+            return {}
+    
+    def _save_manifest(self, manifest):
+        directory = os.path.dirname(self.manifest_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write atomically so concurrent test processes never read a partial manifest
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -20,4 +20,13 @@ class SearchError(TwitchTestError):
 
 class StreamerSelectionError(TwitchTestError):
     """Raised when streamer selection fails"""
-    pass 
\ No newline at end of file
+    pass 
+
+class DriverResolutionError(TwitchTestError):
+    """Raised when a browser driver binary cannot be resolved"""
+    pass
+
+
+class ConfigurationError(TwitchTestError):
+    """Raised when the framework configuration is invalid"""
+    pass
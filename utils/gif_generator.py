@@ -1,23 +1,336 @@
+import io
 import os
-from PIL import Image
+import struct
+import time
+from PIL import Image, ImageChops, GifImagePlugin
 import logging
+from config import get_config
+
+# Longest delay a GIF frame can store (16-bit count of 10 ms units)
+MAX_FRAME_MS = 655350
+
+# Largest per-channel difference of 8x8 average colors between frames merged as duplicates
+COLOR_TOLERANCE = 12
+
+
+def perceptual_hash(image, hash_size=16):
+    """
+    Return a difference hash (dHash) of an image as an int of hash_size * hash_size bits
+
+    Each bit tells whether a cell of the grayscale thumbnail is brighter than its right
+    neighbour, so the hash survives scaling and palette noise but not layout changes.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class StreamingGifWriter:
+    """Writes an animated GIF frame by frame with a single shared palette
+
+    Frames are decoded, downscaled, quantized and written as they are added, so at
+    most the frame being processed, the one waiting for its duration and the previous
+    full frame are held in memory. The palette is built once from the first frame and
+    reused for all frames.
+
+    Consecutive frames that are identical once quantized are merged into one longer
+    frame. Perceptual merging of near-identical frames is opt-in (dedup_distance),
+    because a small change such as one typed character does not move the hash. Other
+    frames are encoded as the rectangle that changed since the previous frame,
+    drawn over it.
+    """
+
+    def __init__(self, path, max_width=480, duration=500, loop=0, colors=256, dither=False, max_memory_mb=64,
+                 dedup_distance=None, delta=True):
+        """
+        Args:
+            path: Output GIF path
+            max_width: Frames wider than this are downscaled to it (None keeps the source size)
+            duration: Default frame duration in milliseconds
+            loop: Number of loops, 0 loops forever
+            colors: Size of the shared palette (216 of them are a fixed color cube)
+            dither: Dither frames against the shared palette (slower, larger files)
+            max_memory_mb: Cap on decoded frame memory; frames that would exceed it are skipped
+            dedup_distance: Maximum perceptual hash distance (of 256 bits) for a frame to be
+                merged into the previous one; None (default) merges only frames that are
+                pixel-identical after quantization
+            delta: Encode only the region that changed since the previous frame
+        """
+        self.path = path
+        self.max_width = max_width
+        self.duration = duration
+        self.loop = loop
+        self.colors = colors
+        self.dither = Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
+        self.dedup_distance = dedup_distance
+        self.delta = delta
+        self.stats = {"input_frames": 0, "frames": 0, "merged": 0, "skipped": 0, "source_bytes": 0,
+                      "bytes": 0, "compression_ratio": 0.0, "encoded_pixels": 0, "frame_pixels": 0,
+                      "peak_memory_bytes": 0, "seconds": 0.0}
+        self.size = None
+        self._palette = None
+        self._pending = None
+        self._previous = None
+        self._previous_signature = None
+        self._file = None
+        self._part_path = f"{path}.part"
+        self.logger = logging.getLogger(__name__)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_frame(self, source, duration=None):
+        """
+        Decode, scale, quantize and queue one frame
+
+        Args:
+            source: File path, PNG/JPEG bytes or a PIL image
+            duration: Frame duration in milliseconds, defaults to the writer's duration
+
+        Returns:
+            bool: False if the frame was skipped to stay within the memory cap
+        """
+        started = time.perf_counter()
+        duration = duration or self.duration
+        image = self._open(source)
+        try:
+            decoded = image.width * image.height * len(image.getbands())
+            if self.max_memory_bytes and self._held_bytes() + decoded > self.max_memory_bytes:
+                self.stats["skipped"] += 1
+                self.logger.warning(f"Skipping {image.width}x{image.height} frame: decoding it would exceed "
+                                    f"the {self.max_memory_bytes // (1024 * 1024)}MB GIF memory cap")
+                return False
+            self.stats["input_frames"] += 1
+            self.stats["source_bytes"] += self._source_size(source, decoded)
+            rgb = self._scale(image, decoded)
+        finally:
+            image.close()
+
+        try:
+            signature = (perceptual_hash(rgb), rgb.resize((8, 8), Image.Resampling.BOX))
+            if self._is_duplicate(signature):
+                # Near-identical to the previous frame: skip quantizing and show that one longer
+                self._merge(duration)
+            else:
+                self._queue(self._quantize(rgb), signature, duration)
+        finally:
+            rgb.close()
+        self.stats["seconds"] += time.perf_counter() - started
+        return True
+
+    def extend_last(self, duration):
+        """Add duration milliseconds to the most recent frame (it has not been written yet)"""
+        if self._pending is not None:
+            frame, box, current = self._pending
+            self._pending = (frame, box, current + duration)
+
+    def close(self):
+        """
+        Write the last frame and the trailer and move the GIF into place
+
+        Returns:
+            dict: Frame counts, merged duplicates, source and output bytes, compression
+                ratio, encoded pixels, peak_memory_bytes and seconds spent encoding
+        """
+        started = time.perf_counter()
+        self._flush_pending()
+        if self._file is not None:
+            self._write(b";")
+            self._file.close()
+            self._file = None
+            os.replace(self._part_path, self.path)
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+        if self.stats["bytes"]:
+            self.stats["compression_ratio"] = round(self.stats["source_bytes"] / self.stats["bytes"], 2)
+        self.stats["seconds"] += time.perf_counter() - started
+        return dict(self.stats)
+
+    def abort(self):
+        """Discard the partially written GIF"""
+        self._pending = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._part_path)
+
+    def _open(self, source):
+        if isinstance(source, Image.Image):
+            return source.copy()
+        image = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+        if self.max_width and image.width > self.max_width:
+            # JPEG frames decode straight at a reduced scale
+            image.draft("RGB", (self.max_width, image.height * self.max_width // image.width))
+        return image
+
+    @staticmethod
+    def _source_size(source, decoded):
+        if isinstance(source, (bytes, bytearray)):
+            return len(source)
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        return decoded
+
+    def _scale(self, image, decoded):
+        rgb = image.convert("RGB")
+        if self.max_width and rgb.width > self.max_width:
+            scaled = rgb.resize((self.max_width, max(1, round(rgb.height * self.max_width / rgb.width))),
+                                Image.Resampling.LANCZOS, reducing_gap=2.0)
+            rgb.close()
+            rgb = scaled
+        if self.size is None:
+            self.size = rgb.size
+        elif rgb.size != self.size:
+            resized = rgb.resize(self.size, Image.Resampling.BILINEAR)
+            rgb.close()
+            rgb = resized
+        self._track(decoded + rgb.width * rgb.height * 3)
+        return rgb
+
+    def _quantize(self, rgb):
+        if self._palette is None:
+            self._palette = self._build_palette(rgb)
+            self._write_header()
+        return rgb.quantize(palette=self._palette, dither=self.dither)
+
+    def _build_palette(self, first_frame):
+        """The first frame's own colors plus a 6x6x6 color cube that keeps later frames close"""
+        cube = [value for r in range(0, 256, 51) for g in range(0, 256, 51) for b in range(0, 256, 51)
+                for value in (r, g, b)]
+        adaptive_colors = max(0, self.colors - len(cube) // 3)
+        adaptive = []
+        if adaptive_colors:
+            quantized = first_frame.quantize(colors=adaptive_colors, method=Image.Quantize.MEDIANCUT)
+            adaptive = quantized.getpalette()[:adaptive_colors * 3]
+            quantized.close()
+        palette = Image.new("P", (1, 1))
+        palette.putpalette((adaptive + cube)[:self.colors * 3])
+        return palette
+
+    def _is_duplicate(self, signature):
+        if self._previous_signature is None or self.dedup_distance is None:
+            return False
+        frame_hash, colors = signature
+        previous_hash, previous_colors = self._previous_signature
+        if bin(frame_hash ^ previous_hash).count("1") > self.dedup_distance:
+            return False
+        # The hash only sees brightness gradients, so also compare the average colors of an 8x8 grid
+        return max(high for _, high in ImageChops.difference(colors, previous_colors).getextrema()) <= COLOR_TOLERANCE
+
+    def _merge(self, duration):
+        self.stats["merged"] += 1
+        self.extend_last(duration)
+
+    def _queue(self, frame, signature, duration):
+        box = (0, 0) + frame.size
+        if self._previous is not None:
+            changed = ImageChops.difference(frame, self._previous).getbbox()
+            if changed is None:
+                # Identical once quantized
+                frame.close()
+                self._merge(duration)
+                return
+            if self.delta:
+                box = changed
+        self._flush_pending()
+        region = frame.crop(box) if box != (0, 0) + frame.size else frame.copy()
+        self._pending = (region, box, duration)
+        if self._previous is not None:
+            self._previous.close()
+        self._previous = frame
+        self._previous_signature = signature
+
+    def _write_header(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self._part_path, "wb")
+        palette = bytes(self._palette.getpalette()[:768]).ljust(768, b"\0")
+        width, height = self.size
+        self._write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0) + palette)
+        # NETSCAPE2.0 application extension: loop count
+        self._write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\0")
+
+    def _flush_pending(self):
+        if self._pending is None:
+            return
+        region, box, duration = self._pending
+        self._pending = None
+        duration = min(max(20, duration), MAX_FRAME_MS)
+        # Disposal 1 keeps the previous frame on screen under the changed region
+        for chunk in GifImagePlugin.getdata(region, offset=box[:2], duration=duration, disposal=1):
+            self._write(chunk)
+        self.stats["frames"] += 1
+        self.stats["encoded_pixels"] += region.width * region.height
+        self.stats["frame_pixels"] += self.size[0] * self.size[1]
+        region.close()
+
+    def _held_bytes(self):
+        held = self._previous.width * self._previous.height if self._previous is not None else 0
+        if self._pending is not None:
+            held += self._pending[0].width * self._pending[0].height
+        return held
+
+    def _track(self, working_bytes):
+        self.stats["peak_memory_bytes"] = max(self.stats["peak_memory_bytes"], working_bytes + self._held_bytes())
+
+    def _write(self, data):
+        self._file.write(data)
+        self.stats["bytes"] += len(data)
+
 
 class GifGenerator:
     """Utility class for generating GIFs from test screenshots"""
     
     def __init__(self, output_dir='reports/gifs'):
         self.output_dir = output_dir
+        self.settings = get_config().get('gifs', {})
+        self.last_stats = None
         self.logger = logging.getLogger(__name__)
         os.makedirs(output_dir, exist_ok=True)
     
-    def create_gif_from_screenshots(self, screenshots_dir, output_name, duration=500):
+    def create_writer(self, output_name, duration=500, max_width=None):
+        """
+        Create a streaming writer for a GIF in the output directory
+        
+        Args:
+            output_name: Name for the output GIF file
+            duration: Default duration for each frame in milliseconds
+            max_width: Maximum frame width, defaults to gifs.max_width from config
+        """
+        return StreamingGifWriter(
+            os.path.join(self.output_dir, f"{output_name}.gif"),
+            max_width=max_width or self.settings.get('max_width', 480),
+            duration=duration,
+            dither=self.settings.get('dither', False),
+            max_memory_mb=self.settings.get('max_memory_mb', 64),
+            dedup_distance=self.settings.get('dedup_distance'),
+            delta=self.settings.get('delta', True)
+        )
+    
+    def create_gif_from_screenshots(self, screenshots_dir, output_name, duration=500, max_width=None):
         """
         Create a GIF from a directory of screenshots
         
+        Screenshots are streamed through the encoder one at a time instead of being
+        loaded up front.
+        
         Args:
             screenshots_dir: Directory containing screenshots
             output_name: Name for the output GIF file
             duration: Duration for each frame in milliseconds
+            max_width: Maximum frame width, defaults to gifs.max_width from config
         """
         try:
             # Get all PNG files in the directory
@@ -27,27 +340,21 @@ class GifGenerator:
                 self.logger.warning(f"No screenshots found in {screenshots_dir}")
                 return
             
-            # Open all images
-            images = []
-            for screenshot in screenshots:
-                img_path = os.path.join(screenshots_dir, screenshot)
-                images.append(Image.open(img_path))
-            
-            # Create output path
-            output_path = os.path.join(self.output_dir, f"{output_name}.gif")
+            writer = self.create_writer(output_name, duration, max_width)
+            with writer:
+                for screenshot in screenshots:
+                    writer.add_frame(os.path.join(screenshots_dir, screenshot))
+            self.last_stats = writer.stats
             
-            # Save as GIF
-            images[0].save(
-                output_path,
-                save_all=True,
-                append_images=images[1:],
-                duration=duration,
-                loop=0
+            stats = writer.stats
+            self.logger.info(
+                f"GIF created successfully at {writer.path} ({stats['frames']} frames from "
+                f"{stats['input_frames']} screenshots, {stats['merged']} duplicates merged, "
+                f"{stats['bytes'] / 1024:.0f}KB, compression {stats['compression_ratio']:.1f}x, "
+                f"peak frame memory {stats['peak_memory_bytes'] / 1024 / 1024:.1f}MB)"
             )
-            
-            self.logger.info(f"GIF created successfully at {output_path}")
-            return output_path
-            
+            return writer.path
+        
         except Exception as e:
             self.logger.error(f"Failed to create GIF: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
@@ -0,0 +1,206 @@
+"""Self-tuning registry of fallback locators.
+
+Every named multi-locator lookup records which candidates matched, what each browser-side
+query cost and how long the winning lookup took. Later lookups leave locators that never
+match out of the race and only re-probe them every few lookups. The others keep their
+declared priority, since broad catch-all fallbacks match more often than the specific
+locators declared before them. Lookups whose locators are interchangeable can instead
+try the cheapest working locator first.
+
+Usage:
+    python -m utils.locator_registry [--min-lookups 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from utils.test_history import HISTORY_DIR
+
+DEFAULT_STATS_PATH = os.path.join(HISTORY_DIR, "locator_stats.json")
+STAT_FIELDS = {"lookups": 0, "hits": 0, "wins": 0, "win_seconds": 0.0, "queries": 0, "query_seconds": 0.0, "skips": 0}
+
+
+def locator_key(locator):
+    """Return the stable string key for a (By.*, value) locator"""
+    by, value = locator
+    return f"{by}={value}"
+
+
+class LocatorRegistry:
+    """Per-locator hit/miss counts and lookup latency, persisted across runs"""
+
+    def __init__(self, path=DEFAULT_STATS_PATH):
+        self.path = path
+        self.stats = self._read()
+        # Only this process's increments, merged into the file on save
+        self._pending = {}
+
+    def rank(self, name, locators, min_lookups=5, reprobe_every=20, by_latency=False):
+        """
+        Choose and order the candidate locators to race for a logical element
+
+        Locators that never matched in min_lookups or more lookups are dead and are
+        left out, so the race no longer queries them. Every reprobe_every-th lookup
+        races them again (after the live ones) in case the page changed. Each call
+        counts as one lookup for that schedule.
+
+        Hit rate is not a measure of priority: a broad fallback such as
+        a[href*="/videos"] matches on almost every page. So live locators keep their
+        declared order, unless by_latency is set for locators that are alternative
+        spellings of the same element. Those are ordered by browser-side query time
+        spent per hit, with locators that were never queried tried first.
+
+        Args:
+            name: Logical element name, e.g. 'browse_button'
+            locators: Candidate locators in declared priority order
+            min_lookups: Lookups needed before a never-matching locator counts as dead
+            reprobe_every: Race dead locators again on every n-th lookup
+            by_latency: Order live locators by query cost instead of declared priority
+
+        Returns:
+            list: The locators to race, in race order (all of them if every one is dead)
+        """
+        element_stats = self.stats.get(name, {})
+        live, dead = [], []
+        for locator in locators:
+            entry = element_stats.get(locator_key(locator))
+            is_dead = bool(entry) and entry["hits"] == 0 and entry["lookups"] >= min_lookups
+            (dead if is_dead else live).append(locator)
+        if not live:
+            return list(locators)
+
+        if by_latency:
+            def cost(locator):
+                entry = element_stats.get(locator_key(locator), {})
+                if not entry.get("queries"):
+                    return 0.0
+                return entry["query_seconds"] / entry["hits"] if entry["hits"] else float("inf")
+
+            live.sort(key=cost)
+
+        reprobe = []
+        for locator in dead:
+            skips = self._count(name, locator, "skips")
+            if skips % reprobe_every == 0:
+                reprobe.append(locator)
+        return live + reprobe
+
+    def record(self, name, locators, matched, winner=None, seconds=0.0, query_seconds=None):
+        """
+        Record the outcome of one lookup
+
+        Args:
+            name: Logical element name
+            locators: Every candidate the browser evaluated in the lookup
+            matched: Indices (into locators) of candidates that found an element
+            winner: Index of the candidate that was used, or None on a miss
+            seconds: Duration of the lookup
+            query_seconds: Browser-side cost of each candidate's query, if measured
+        """
+        for target in (self.stats, self._pending):
+            element_stats = target.setdefault(name, {})
+            for index, locator in enumerate(locators):
+                entry = element_stats.setdefault(locator_key(locator), dict(STAT_FIELDS))
+                entry["lookups"] += 1
+                if index in matched:
+                    entry["hits"] += 1
+                if index == winner:
+                    entry["wins"] += 1
+                    entry["win_seconds"] += seconds
+                if query_seconds is not None:
+                    entry["queries"] = entry.get("queries", 0) + 1
+                    entry["query_seconds"] = entry.get("query_seconds", 0.0) + query_seconds[index]
+
+    def _count(self, name, locator, field):
+        """Increment one counter of a locator and return its new total"""
+        for target in (self.stats, self._pending):
+            entry = target.setdefault(name, {}).setdefault(locator_key(locator), dict(STAT_FIELDS))
+            entry[field] = entry.get(field, 0) + 1
+        return self.stats[name][locator_key(locator)][field]
+
+    def save(self):
+        """Merge this process's increments into the stats file (safe for parallel workers)"""
+        if not self._pending:
+            return
+        merged = self._read()
+        for name, element_stats in self._pending.items():
+            for key, delta in element_stats.items():
+                entry = merged.setdefault(name, {}).setdefault(key, dict(STAT_FIELDS))
+                for field, value in delta.items():
+                    entry[field] = entry.get(field, 0) + value
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(merged, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.stats = merged
+        self._pending = {}
+
+    def report(self, min_lookups=5):
+        """
+        Summarise locator performance
+
+        Args:
+            min_lookups: Lookups needed before a never-matching locator counts as dead
+
+        Returns:
+            list: One dict per locator with hit rate, win and query latency and a dead flag
+        """
+        rows = []
+        for name, element_stats in sorted(self.stats.items()):
+            for key, entry in element_stats.items():
+                rows.append({
+                    "element": name,
+                    "locator": key,
+                    "lookups": entry["lookups"],
+                    "hit_rate": entry["hits"] / entry["lookups"] if entry["lookups"] else 0.0,
+                    "wins": entry["wins"],
+                    "avg_win_seconds": entry["win_seconds"] / entry["wins"] if entry["wins"] else None,
+                    "avg_query_seconds": entry["query_seconds"] / entry["queries"] if entry.get("queries") else None,
+                    "dead": entry["hits"] == 0 and entry["lookups"] >= min_lookups
+                })
+        return rows
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+# Shared by all page objects in the process; saved by conftest at session end
+locator_registry = LocatorRegistry()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report fallback locator performance")
+    parser.add_argument("--min-lookups", type=int, default=5,
+                        help="Lookups before a never-matching locator is reported as dead")
+    parser.add_argument("--path", default=DEFAULT_STATS_PATH, help="Locator stats file")
+    args = parser.parse_args(argv)
+
+    rows = LocatorRegistry(args.path).report(args.min_lookups)
+    if not rows:
+        print(f"No locator statistics recorded in {args.path}")
+        return 0
+
+    print(f"{'element':<20} {'hit rate':>8} {'lookups':>8} {'wins':>6} {'avg win':>9} {'avg query':>10}  locator")
+    for row in rows:
+        latency = f"{row['avg_win_seconds']:.3f}s" if row["avg_win_seconds"] is not None else "-"
+        query = f"{row['avg_query_seconds'] * 1000:.2f}ms" if row["avg_query_seconds"] is not None else "-"
+        flag = "  DEAD" if row["dead"] else ""
+        print(f"{row['element']:<20} {row['hit_rate']:>8.0%} {row['lookups']:>8} {row['wins']:>6} {latency:>9} "
+              f"{query:>10}  {row['locator']}{flag}")
+
+    dead = [row for row in rows if row["dead"]]
+    print(f"\n{len(dead)} of {len(rows)} locators never matched in {args.min_lookups}+ lookups")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
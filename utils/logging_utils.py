@@ -1,6 +1,8 @@
 import logging
 import os
 import datetime
+from config import get_config
+from utils import get_worker_id
 
 
 class Logger:
@@ -26,27 +28,29 @@ class Logger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         
+        # Create formatter
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        console_handler.setFormatter(formatter)
+        self._logger.addHandler(console_handler)
+        
+        # With failure-only retention there is no run log file: lines propagate to the
+        # root logger, where the per-test ring buffer keeps them for failed tests
+        if get_config().get('retention', {}).get('mode', 'all') == 'failures':
+            return
+        
         # Create file handler
         log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "logs")
         os.makedirs(log_dir, exist_ok=True)
         
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = os.path.join(log_dir, f"test_run_{timestamp}.log")
+        worker_suffix = f"_{get_worker_id()}" if get_worker_id() else ""
+        log_file = os.path.join(log_dir, f"test_run_{timestamp}{worker_suffix}.log")
         
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # Add formatter to handlers
-        console_handler.setFormatter(formatter)
         file_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        self._logger.addHandler(console_handler)
         self._logger.addHandler(file_handler)
     
     def info(self, message):
@@ -0,0 +1,251 @@
+"""Parallel test runner: shards collected tests across worker processes.
+
+Each worker is a separate pytest process with its own AQA_WORKER_ID, so it owns
+its own browser (kept warm for the whole shard by the driver pool) and writes
+screenshots and logs into per-worker directories. Tests are scheduled longest
+first using durations recorded by previous runs in reports/history.
+
+Usage:
+    python -m utils.parallel_runner -n 4 tests/ --headless
+
+Test paths and node ids go before the first option; everything from the first
+option on is forwarded to every worker unchanged.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils import CONFIG_DIR, LOGS_DIR, PROJECT_ROOT
+from utils.test_history import DurationHistory, HISTORY_DIR, history_path_for_worker
+
+# Assumed duration for tests that have never run, when no history exists at all
+DEFAULT_ESTIMATE = 30.0
+
+
+def collect_test_ids(pytest_args):
+    """
+    Collect test node ids without running them
+
+    Args:
+        pytest_args: Arguments forwarded to pytest (paths, -k, -m, options)
+
+    Returns:
+        list: Node ids in collection order
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", *pytest_args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    test_ids = [line.strip() for line in result.stdout.splitlines() if "::" in line]
+    if not test_ids and result.returncode not in (0, 5):
+        raise RuntimeError(f"Test collection failed:\n{result.stdout}\n{result.stderr}")
+    return test_ids
+
+
+def split_selection(pytest_args):
+    """
+    Split pytest arguments into the leading test selection and the options
+
+    Only positional arguments before the first option select tests, so option
+    values such as the path in '--html reports/report.html' are never mistaken
+    for a selection.
+
+    Returns:
+        tuple: (selection, options) - lists of arguments
+    """
+    for index, arg in enumerate(pytest_args):
+        if arg.startswith("-"):
+            return list(pytest_args[:index]), list(pytest_args[index:])
+    return list(pytest_args), []
+
+
+def known_devices():
+    """Return every device key and device name defined in devices.json"""
+    with open(os.path.join(CONFIG_DIR, "devices.json"), 'r') as f:
+        devices = json.load(f)
+    names = set(devices)
+    names.update(device["deviceName"] for device in devices.values())
+    return names
+
+
+def device_of(test_id, devices):
+    """Return the emulated device named in a test's parameters, or '' if there is none"""
+    params = test_id.rsplit("[", 1)[1] if test_id.endswith("]") else ""
+    for device in sorted(devices, key=len, reverse=True):
+        if device in params:
+            return device
+    return ""
+
+
+def schedule_tests(test_ids, workers, history, devices=None):
+    """
+    Assign tests to workers longest-processing-time first (LPT)
+
+    Each test, in order of decreasing estimated duration, goes to the worker with
+    the smallest predicted load. Ties prefer a worker already running the same
+    device so its warm browser can be reused. Tests without history are assumed
+    to take the median of the known estimates.
+
+    Args:
+        test_ids: Node ids to distribute
+        workers: Number of workers
+        history: DurationHistory with previous durations
+        devices: Known device names, defaults to devices.json
+
+    Returns:
+        tuple: (shards, predicted) - node ids and predicted seconds per worker,
+            with empty workers dropped
+    """
+    devices = known_devices() if devices is None else devices
+    known = [history.estimate(test_id) for test_id in test_ids if history.estimate(test_id) is not None]
+    fallback = sorted(known)[len(known) // 2] if known else DEFAULT_ESTIMATE
+    estimates = {test_id: history.estimate(test_id, default=fallback) for test_id in test_ids}
+
+    shards = [[] for _ in range(workers)]
+    shard_devices = [set() for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    heapq.heapify(loads)
+
+    for test_id in sorted(test_ids, key=lambda test_id: estimates[test_id], reverse=True):
+        device = device_of(test_id, devices)
+        lightest = heapq.heappop(loads)
+        tied = [lightest]
+        while loads and loads[0][0] == lightest[0]:
+            tied.append(heapq.heappop(loads))
+        chosen = next((entry for entry in tied if device in shard_devices[entry[1]]), lightest)
+        for entry in tied:
+            if entry is not chosen:
+                heapq.heappush(loads, entry)
+
+        load, index = chosen
+        shards[index].append(test_id)
+        shard_devices[index].add(device)
+        heapq.heappush(loads, (load + estimates[test_id], index))
+
+    predicted = {index: load for load, index in loads}
+    scheduled = [(shards[index], predicted[index]) for index in range(workers) if shards[index]]
+    return [shard for shard, _ in scheduled], [load for _, load in scheduled]
+
+
+def run_worker(worker_id, test_ids, pytest_args):
+    """
+    Run one shard in its own pytest process
+
+    Returns:
+        dict: Worker id, exit code, wall-clock seconds and output file
+    """
+    env = dict(os.environ, AQA_WORKER_ID=worker_id)
+    output_dir = os.path.join(LOGS_DIR, worker_id)
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, "pytest_output.txt")
+
+    command = [sys.executable, "-m", "pytest", *pytest_args, *test_ids]
+    # One warm browser per worker unless the caller chose a pool size
+    if not any(arg.startswith("--pool-size") for arg in pytest_args):
+        command.insert(3, "--pool-size=1")
+
+    started = time.time()
+    with open(output_path, 'w') as output:
+        returncode = subprocess.call(command, cwd=PROJECT_ROOT, env=env, stdout=output, stderr=subprocess.STDOUT)
+
+    return {
+        "worker": worker_id,
+        "tests": len(test_ids),
+        "returncode": returncode,
+        "seconds": time.time() - started,
+        "output": output_path
+    }
+
+
+def run_parallel(pytest_args, workers):
+    """
+    Collect, schedule and run tests across worker processes
+
+    Returns:
+        int: Highest pytest exit code reported by any worker
+    """
+    test_ids = collect_test_ids(pytest_args)
+    # Paths only select what to collect; workers receive explicit node ids instead
+    _, options = split_selection(pytest_args)
+    if not test_ids:
+        logging.warning("No tests collected")
+        return 5
+
+    history = DurationHistory()
+    shards, predicted = schedule_tests(test_ids, workers, history)
+    logging.info(f"Running {len(test_ids)} tests on {len(shards)} workers")
+
+    # Workers record fresh samples into their own files; merged into the history below
+    for index in range(len(shards)):
+        worker_history = history_path_for_worker(f"w{index}")
+        if os.path.exists(worker_history):
+            os.remove(worker_history)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(run_worker, f"w{index}", shard, options)
+            for index, shard in enumerate(shards)
+        ]
+        results = [future.result() for future in futures]
+
+    for index, result in enumerate(results):
+        history.merge(DurationHistory(path=history_path_for_worker(result["worker"])))
+        result["predicted_seconds"] = predicted[index]
+    history.save()
+
+    write_schedule_report(results, time.time() - started)
+    return max(result["returncode"] for result in results)
+
+
+def write_schedule_report(results, wall_seconds):
+    """
+    Log and save predicted vs. actual makespan per worker
+
+    Args:
+        results: Worker results from run_worker, with predicted_seconds added
+        wall_seconds: Wall-clock duration of the whole parallel run
+    """
+    predicted_makespan = max(result["predicted_seconds"] for result in results)
+    actual_makespan = max(result["seconds"] for result in results)
+
+    for result in results:
+        logging.info(
+            f"[{result['worker']}] {result['tests']} tests, exit code {result['returncode']}, "
+            f"predicted {result['predicted_seconds']:.1f}s, actual {result['seconds']:.1f}s "
+            f"(output: {result['output']})"
+        )
+    logging.info(
+        f"Makespan predicted {predicted_makespan:.1f}s, actual {actual_makespan:.1f}s; "
+        f"parallel run finished in {wall_seconds:.1f} seconds"
+    )
+
+    report = {
+        "predicted_makespan": predicted_makespan,
+        "actual_makespan": actual_makespan,
+        "wall_seconds": wall_seconds,
+        "workers": results
+    }
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    with open(os.path.join(HISTORY_DIR, "schedule_report.json"), 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the test suite across parallel worker processes")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    args, pytest_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    return run_parallel(pytest_args, max(1, args.workers))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import tempfile
+from utils import CONFIG_DIR
+from utils.test_history import HISTORY_DIR
+
+BLOCKLISTS_PATH = os.path.join(CONFIG_DIR, "blocklists.json")
+DEFAULT_SIZES_PATH = os.path.join(HISTORY_DIR, "resource_sizes.json")
+
+
+class ResourceBlocker:
+    """Blocks requests matching named URL blocklists and reports what blocking saved
+
+    Chrome drivers that block resources are created with network performance logging
+    enabled. Blocked requests show up there as failed loads with a blockedReason. Bytes saved are
+    estimated from the average transfer size per resource type measured in
+    unblocked loads, falling back to the typical sizes in blocklists.json. A blocked type is
+    only ever loaded, and so measured, in runs that log the network without blocking it,
+    which is what the resource_blocking.learn_sizes setting enables.
+    """
+
+    def __init__(self, blocklists_path=BLOCKLISTS_PATH, sizes_path=DEFAULT_SIZES_PATH):
+        """
+        Args:
+            blocklists_path: JSON file with named URL pattern lists and typical sizes
+            sizes_path: Learned transfer sizes per resource type, persisted across runs
+        """
+        with open(blocklists_path, 'r') as f:
+            config = json.load(f)
+        self.lists = config["lists"]
+        self.typical_bytes = config.get("typical_bytes", {})
+        self.sizes_path = sizes_path
+        self.sizes = self._read()
+        self._pending = {}
+        self.totals = {"requests": 0, "bytes": 0}
+        # Blocked resource types whose savings were estimated from typical sizes
+        self.unlearned_types = set()
+        self.logger = logging.getLogger(__name__)
+
+    def patterns(self, names):
+        """
+        Return the URL patterns of the given blocklists
+
+        Raises:
+            ValueError: If a blocklist name is unknown
+        """
+        patterns = []
+        for name in names:
+            if name not in self.lists:
+                raise ValueError(f"Blocklist '{name}' not found. Available blocklists: {', '.join(self.lists)}")
+            patterns.extend(pattern for pattern in self.lists[name] if pattern not in patterns)
+        return patterns
+
+    def apply(self, driver, names):
+        """
+        Block every request matching the named blocklists; an empty list unblocks everything
+
+        Args:
+            driver: Chrome WebDriver (other browsers are left untouched)
+            names: Blocklist names, e.g. ['media', 'analytics']
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            if names:
+                self.logger.warning("Resource blocking needs the DevTools Protocol, requests are not blocked")
+            return
+        if not names and not getattr(driver, '_aqa_blocking', False):
+            # Nothing to block or to unblock: keep the Network domain (and its events) off
+            return
+        # Drop log entries from before this test so collect() only counts its own requests
+        self._read_log(driver)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns(names)})
+        driver._aqa_blocking = bool(names)
+        if names:
+            self.logger.info(f"Blocking resources: {', '.join(names)}")
+
+    def collect(self, driver):
+        """
+        Drain the driver's network log, learn transfer sizes and count blocked requests
+
+        Args:
+            driver: WebDriver used by the test
+
+        Returns:
+            dict: blocked request count, estimated bytes saved and counts per resource type
+        """
+        types = {}
+        blocked = {}
+        for message in self._read_log(driver):
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.responseReceived":
+                types[params["requestId"]] = params.get("type", "Other")
+            elif method == "Network.loadingFinished" and params["requestId"] in types:
+                self._learn(types[params["requestId"]], params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                resource_type = params.get("type", "Other")
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+
+        saved = sum(count * self.estimate(resource_type) for resource_type, count in blocked.items())
+        self.unlearned_types.update(resource_type for resource_type in blocked if not self.learned(resource_type))
+        self.totals["requests"] += sum(blocked.values())
+        self.totals["bytes"] += saved
+        return {"blocked_requests": sum(blocked.values()), "estimated_bytes_saved": saved, "by_type": blocked}
+
+    def learned(self, resource_type):
+        """Return whether a transfer size was measured for the resource type"""
+        entry = self.sizes.get(resource_type)
+        return bool(entry and entry["count"])
+
+    def estimate(self, resource_type):
+        """Return the expected transfer size in bytes of one resource of the given type"""
+        if self.learned(resource_type):
+            entry = self.sizes[resource_type]
+            return int(entry["bytes"] / entry["count"])
+        return self.typical_bytes.get(resource_type, self.typical_bytes.get("Other", 0))
+
+    def save(self):
+        """Merge the sizes learned in this process into the sizes file (safe for parallel workers)"""
+        if not self._pending:
+            return
+        merged = self._read()
+        for resource_type, delta in self._pending.items():
+            entry = merged.setdefault(resource_type, {"count": 0, "bytes": 0})
+            entry["count"] += delta["count"]
+            entry["bytes"] += delta["bytes"]
+
+        directory = os.path.dirname(self.sizes_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(merged, f, indent=2)
+        os.replace(tmp_path, self.sizes_path)
+        self.sizes = merged
+        self._pending = {}
+
+    def _learn(self, resource_type, size):
+        for target in (self.sizes, self._pending):
+            entry = target.setdefault(resource_type, {"count": 0, "bytes": 0})
+            entry["count"] += 1
+            entry["bytes"] += size
+
+    def _read_log(self, driver):
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return []
+        return [json.loads(entry["message"])["message"] for entry in entries]
+
+    def _read(self):
+        try:
+            with open(self.sizes_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+# Shared blocker; per-test blocklists are applied by the driver fixture in conftest
+resource_blocker = ResourceBlocker()
@@ -1,38 +1,297 @@
-import time
+"""Retry policies with an overall deadline, exponential backoff and per-exception strategies.
+
+A policy's deadline is published through a context variable, so waits nested in the
+retried call (see remaining_timeout()) shrink to the time that is left instead of
+each spending their full timeout on every attempt.
+
+RELOCATE only helps calls that look their element up from a locator: calling
+again repeats the lookup. A call that was handed a WebElement would retry the
+same stale handle, so for such calls RELOCATE falls back to FAIL and the caller
+re-locates the element.
+"""
+
+import contextvars
 import functools
-from typing import Type, Union, Tuple
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Type, Union, Tuple
 from selenium.common.exceptions import (
     TimeoutException,
     StaleElementReferenceException,
     NoSuchElementException
 )
+from selenium.webdriver.remote.webelement import WebElement
+from config import get_config
 from utils.exceptions import TwitchTestError
 
+# Strategies for an exception raised by a retried call
+RETRY = "retry"            # back off, then try again
+RELOCATE = "relocate"      # try again at once: a fresh lookup replaces the stale element (locator calls only)
+FAIL = "fail"              # re-raise without retrying
+
+DEFAULT_STRATEGIES = {
+    StaleElementReferenceException: RELOCATE,
+    TimeoutException: RETRY,
+    TwitchTestError: FAIL,
+}
+
+_deadline = contextvars.ContextVar("aqa_retry_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Bound everything inside the with-block by an overall time budget
+
+    Nested deadlines can only shorten the enclosing one.
+
+    Args:
+        seconds: Budget in seconds (None leaves the current deadline unchanged)
+    """
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left():
+    """Return the seconds left of the current deadline, or None when no deadline is active"""
+    expires = _deadline.get()
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
+
+def remaining_timeout(timeout):
+    """
+    Cap a wait timeout by the current deadline
+
+    Args:
+        timeout: Timeout the caller would use on its own, in seconds
+
+    Returns:
+        float: The smaller of timeout and the time left (0 means check once)
+    """
+    left = time_left()
+    return timeout if left is None else min(timeout, left)
+
+
+class RetryMetrics:
+    """Attempts, retries and time spent per retried operation"""
+
+    def __init__(self):
+        self.operations = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def record_retry(self, name, attempt, exception, delay):
+        """Record one failed attempt that is going to be retried after delay seconds"""
+        with self._lock:
+            stats = self._stats(name)
+            stats["retries"] += 1
+            stats["backoff_seconds"] += delay
+            error = type(exception).__name__
+            stats["errors"][error] = stats["errors"].get(error, 0) + 1
+        self.logger.debug(f"{name}: attempt {attempt} failed with {type(exception).__name__}, "
+                          f"retrying in {delay * 1000:.0f}ms")
+
+    def record_call(self, name, attempts, seconds, outcome):
+        """
+        Record a finished call
+
+        Args:
+            outcome: 'ok', 'failed' (fail-fast or unhandled exception), 'exhausted'
+                (out of attempts) or 'deadline' (out of time)
+        """
+        with self._lock:
+            stats = self._stats(name)
+            stats["calls"] += 1
+            stats["attempts"] += attempts
+            stats["seconds"] += seconds
+            if attempts > 1:
+                stats["retried_calls"] += 1
+                stats["retried_seconds"] += seconds
+            stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+
+    def summary(self):
+        """Return a copy of the per-operation statistics, most retried first"""
+        with self._lock:
+            ordered = sorted(self.operations.items(), key=lambda item: -item[1]["retries"])
+            return {name: json.loads(json.dumps(stats)) for name, stats in ordered}
+
+    def save(self, path):
+        """Write the statistics to a JSON file; returns the path"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+    def _stats(self, name):
+        return self.operations.setdefault(name, {
+            "calls": 0, "attempts": 0, "retries": 0, "retried_calls": 0, "seconds": 0.0,
+            "retried_seconds": 0.0, "backoff_seconds": 0.0, "errors": {}, "outcomes": {}
+        })
+
+
+retry_metrics = RetryMetrics()
+
+
+class RetryPolicy:
+    """Runs a call until it succeeds, its attempts run out or its deadline passes"""
+
+    def __init__(self, strategies: Dict[Type[Exception], Union[str, Callable]] = None, max_attempts: int = 3,
+                 deadline: float = None, base_delay: float = 0.25, max_delay: float = 2.0,
+                 multiplier: float = 2.0, jitter: float = 0.5, name: str = None):
+        """
+        Args:
+            strategies: Exception type -> RETRY, RELOCATE or FAIL. The most specific
+                class in the exception's MRO wins; exceptions not covered are re-raised.
+                A callable receives the exception and returns one of the strategies.
+            max_attempts: Maximum number of attempts, including the first
+            deadline: Overall budget in seconds for all attempts and backoff (None for no limit)
+            base_delay: Backoff before the first retry, in seconds
+            max_delay: Upper bound of a single backoff
+            multiplier: Backoff growth per retry
+            jitter: Fraction of each backoff that is randomised (0 disables jitter)
+            name: Operation name for metrics, defaults to the wrapped function's qualified name
+        """
+        self.strategies = dict(DEFAULT_STRATEGIES if strategies is None else strategies)
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+    def strategy_for(self, exception, args=(), kwargs=None):
+        """
+        Return the strategy for an exception, or FAIL when no strategy covers it
+
+        Args:
+            exception: Exception raised by the call
+            args: Positional arguments of the call
+            kwargs: Keyword arguments of the call
+
+        Returns:
+            str: RETRY, RELOCATE or FAIL; RELOCATE becomes FAIL when the call was
+                given a WebElement, since calling again would reuse the stale handle
+        """
+        strategy = FAIL
+        for cls in type(exception).__mro__:
+            if cls in self.strategies:
+                strategy = self.strategies[cls]
+                strategy = strategy(exception) if callable(strategy) else strategy
+                break
+        if strategy == RELOCATE and _holds_element(args, kwargs or {}):
+            return FAIL
+        return strategy
+
+    def backoff(self, retry):
+        """Return the delay in seconds before the given retry (1 for the first)"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def call(self, func, *args, **kwargs):
+        """Call func(*args, **kwargs) under this policy and return its result"""
+        name = self.name or getattr(func, "__qualname__", repr(func))
+        started = time.monotonic()
+        attempt = 0
+        with deadline(self.deadline):
+            while True:
+                attempt += 1
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    strategy = self.strategy_for(e, args, kwargs)
+                    if strategy == FAIL:
+                        outcome = "failed"
+                    elif attempt >= self.max_attempts:
+                        outcome = "exhausted"
+                    else:
+                        delay = 0.0 if strategy == RELOCATE else self.backoff(attempt)
+                        left = time_left()
+                        outcome = "deadline" if left is not None and left <= delay else None
+                    if outcome:
+                        retry_metrics.record_call(name, attempt, time.monotonic() - started, outcome)
+                        raise
+                    retry_metrics.record_retry(name, attempt, e, delay)
+                    if delay:
+                        time.sleep(delay)
+                    continue
+                retry_metrics.record_call(name, attempt, time.monotonic() - started, "ok")
+                return result
+
+    def __call__(self, func):
+        """Use the policy as a decorator"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return wrapper
+
+
+def _holds_element(args, kwargs):
+    return any(isinstance(value, WebElement) for value in list(args) + list(kwargs.values()))
+
+
 def retry_on_exception(
     exceptions: Union[Type[Exception], Tuple[Type[Exception], ...]] = (TimeoutException, StaleElementReferenceException),
     max_attempts: int = 3,
-    delay: float = 1.0
+    delay: float = None,
+    deadline: float = None,
+    strategies: Dict[Type[Exception], Union[str, Callable]] = None
 ):
     """
     Retry decorator for handling flaky elements
-    
+
+    Unset arguments come from the 'retry' section of config.yaml. Stale elements are
+    re-located at once, other listed exceptions are retried with exponential backoff,
+    and framework errors such as ElementNotFoundError fail fast. Re-locating means
+    calling again, so it only applies to methods that take a locator: a method
+    called with a WebElement fails on a stale element instead.
+
     Args:
         exceptions: Exception(s) to catch and retry on
         max_attempts: Maximum number of retry attempts
-        delay: Delay between retries in seconds
+        delay: Backoff before the first retry in seconds
+        deadline: Overall budget in seconds for all attempts, shared with nested waits
+        strategies: Explicit exception -> strategy mapping, overrides exceptions
     """
+    if not isinstance(exceptions, tuple):
+        exceptions = (exceptions,)
+    if strategies is None:
+        strategies = {cls: RELOCATE if issubclass(cls, StaleElementReferenceException) else RETRY
+                      for cls in exceptions}
+        strategies.setdefault(TwitchTestError, FAIL)
+
     def decorator(func):
+        policy = None
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(max_attempts):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    if attempt < max_attempts - 1:
-                        time.sleep(delay)
-                        continue
-            raise last_exception
+            nonlocal policy
+            if policy is None:
+                # Built on first use so config overrides set after import still apply
+                settings = get_config().get('retry', {})
+                policy = RetryPolicy(
+                    strategies=strategies,
+                    max_attempts=max_attempts,
+                    deadline=deadline if deadline is not None else settings.get('deadline'),
+                    base_delay=delay if delay is not None else settings.get('base_delay', 0.25),
+                    max_delay=settings.get('max_delay', 2.0),
+                    jitter=settings.get('jitter', 0.5),
+                    name=func.__qualname__
+                )
+            return policy.call(func, *args, **kwargs)
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
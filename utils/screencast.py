@@ -0,0 +1,177 @@
+"""Continuous test recordings from Chrome's DevTools screencast.
+
+Chrome pushes a compressed frame (JPEG or PNG) whenever the page repaints. Frames
+are kept in a bounded in-memory buffer at up to a configured rate and encoded into
+an animated GIF or WebP when the test ends, or dropped when the recording is not
+needed. No screenshot command runs on the test thread.
+"""
+
+import base64
+import collections
+import io
+import logging
+import os
+import threading
+import time
+from PIL import Image
+from utils.cdp_events import CdpSession
+
+FORMATS = ("gif", "webp")
+
+# Upper bound for how long the final frame is shown
+LAST_FRAME_SECONDS = 3.0
+
+
+class ScreencastRecorder:
+    """Buffers Page.screencastFrame events of a Chrome page"""
+
+    def __init__(self, driver, fps=5, quality=60, max_width=480, max_frames=300, max_buffer_mb=64,
+                 image_format="jpeg"):
+        """
+        Args:
+            driver: Chrome WebDriver
+            fps: Maximum frames kept per second; faster repaints are dropped
+            quality: JPEG quality of the streamed frames (0-100)
+            max_width: Width Chrome scales frames down to before sending them
+            max_frames: Frames kept in the buffer; the oldest are dropped first
+            max_buffer_mb: Compressed bytes kept in the buffer; the oldest are dropped first
+            image_format: 'jpeg' or 'png' frames from Chrome
+        """
+        self.driver = driver
+        self.fps = fps
+        self.quality = quality
+        self.max_width = max_width
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.image_format = image_format
+        self.frames = collections.deque(maxlen=max_frames)
+        self.stats = {"received": 0, "kept": 0, "dropped_rate": 0, "evicted": 0}
+        self.session = None
+        self._buffer_bytes = 0
+        self._held = None
+        self._last_kept = None
+        self._stopped_at = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def recording(self):
+        return self.session is not None
+
+    def start(self):
+        """Connect to the page and start streaming frames; returns self"""
+        self.session = CdpSession(self.driver)
+        self.session.on("Page.screencastFrame", self._on_frame)
+        params = {"format": self.image_format, "quality": self.quality, "everyNthFrame": 1}
+        if self.max_width:
+            width, height = self.driver.execute_script("return [window.innerWidth, window.innerHeight];")
+            params.update(maxWidth=self.max_width, maxHeight=int(height * self.max_width / width))
+        self.session.send("Page.startScreencast", params)
+        self.logger.debug(f"Screencast started at up to {self.fps} fps")
+        return self
+
+    def stop(self):
+        """
+        Stop streaming; the buffer is kept until save() or discard()
+
+        Returns:
+            dict: received, kept, dropped_rate (over the fps limit) and evicted (buffer full) counts
+        """
+        if self.session is None:
+            return dict(self.stats)
+        try:
+            self.session.send("Page.stopScreencast")
+        except Exception as e:
+            self.logger.debug(f"Failed to stop screencast: {str(e)}")
+        finally:
+            self.session.close()
+            self.session = None
+        with self._lock:
+            # The last repaint is what the page showed at the end, keep it even if it came too soon
+            if self._held is not None:
+                self._append(*self._held)
+                self._held = None
+        self._stopped_at = time.time()
+        return dict(self.stats)
+
+    def save(self, gif_generator, output_name, output_format="gif"):
+        """
+        Encode the buffered frames into an animated GIF or WebP
+
+        Frame durations follow the time between repaints.
+
+        Args:
+            gif_generator: GifGenerator providing the output directory and GIF settings
+            output_name: Output file name without extension
+            output_format: 'gif' or 'webp'
+
+        Returns:
+            str: Path of the recording, or None if no frames were captured
+        """
+        with self._lock:
+            frames = list(self.frames)
+            self.frames.clear()
+            self._buffer_bytes = 0
+        if not frames:
+            return None
+
+        durations = self._durations(frames)
+        if output_format == "webp":
+            path = os.path.join(gif_generator.output_dir, f"{output_name}.webp")
+            images = [Image.open(io.BytesIO(data)) for _, data in frames]
+            images[0].save(path, save_all=True, append_images=images[1:], duration=durations,
+                           loop=0, quality=self.quality, method=4)
+            for image in images:
+                image.close()
+        else:
+            writer = gif_generator.create_writer(output_name, max_width=self.max_width)
+            with writer:
+                for (_, data), duration in zip(frames, durations):
+                    writer.add_frame(data, duration=duration)
+            path = writer.path
+        self.logger.info(f"Screencast with {len(frames)} frames saved to {path}")
+        return path
+
+    def discard(self):
+        """Drop the buffered frames"""
+        with self._lock:
+            self.frames.clear()
+            self._buffer_bytes = 0
+            self._held = None
+
+    def _durations(self, frames):
+        timestamps = [timestamp for timestamp, _ in frames]
+        # The last frame stays up until the recording stopped, within reason
+        last = min(max(1.0 / self.fps, (self._stopped_at or timestamps[-1]) - timestamps[-1]), LAST_FRAME_SECONDS)
+        ends = timestamps[1:] + [timestamps[-1] + last]
+        return [max(20, int((end - start) * 1000)) for start, end in zip(timestamps, ends)]
+
+    def _on_frame(self, params):
+        session = self.session
+        if session is not None:
+            # Chrome sends the next frame only after the previous one is acknowledged
+            session.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}, wait=False)
+        timestamp = params.get("metadata", {}).get("timestamp") or time.time()
+        data = base64.b64decode(params["data"])
+        with self._lock:
+            self.stats["received"] += 1
+            if self._last_kept is not None and timestamp - self._last_kept < 1.0 / self.fps:
+                self.stats["dropped_rate"] += 1
+                self._held = (timestamp, data)
+                return
+            self._held = None
+            self._append(timestamp, data)
+
+    def _append(self, timestamp, data):
+        if len(self.frames) == self.frames.maxlen:
+            self._evict()
+        while self.frames and self._buffer_bytes + len(data) > self.max_buffer_bytes:
+            self._evict()
+        self.frames.append((timestamp, data))
+        self._buffer_bytes += len(data)
+        self._last_kept = timestamp
+        self.stats["kept"] += 1
+
+    def _evict(self):
+        _, data = self.frames.popleft()
+        self._buffer_bytes -= len(data)
+        self.stats["evicted"] += 1
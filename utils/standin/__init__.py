@@ -0,0 +1,5 @@
+"""Local stand-in for the Twitch mobile site, used for benchmarking and offline regression runs"""
+
+from utils.standin.server import StandinServer
+
+__all__ = ["StandinServer"]
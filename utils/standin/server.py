@@ -0,0 +1,258 @@
+"""Local stand-in for the Twitch mobile site.
+
+Reproduces the DOM contracts the page objects rely on (data-a-target /
+data-test-selector attributes, consent banner, app promo, search suggestions,
+TitleLink results, mature-content overlay and a playable video) with
+deterministic data, configurable latency and injected failures.
+
+Usage:
+    python -m utils.standin.server [--port 8000] [--api-delay 150] [--failure-rate 0.1]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SITE_DIR = os.path.join(os.path.dirname(__file__), "site")
+
+CATEGORIES = ["StarCraft II", "League of Legends", "Fortnite", "Dota 2", "Just Chatting",
+              "Counter-Strike", "Minecraft", "Valorant", "Grand Theft Auto V", "Apex Legends"]
+
+_CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".js": "application/javascript",
+                  ".css": "text/css", ".json": "application/json", ".wav": "audio/wav"}
+
+
+def _silent_wav(seconds=1, rate=8000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(rate)
+        f.writeframes(b"\x80" * rate * seconds)
+    return buffer.getvalue()
+
+
+def _digest(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class StandinServer:
+    """Threaded HTTP server for the stand-in site"""
+
+    def __init__(self, host="127.0.0.1", port=0, delays_ms=None, jitter_ms=0, failure_rate=0.0,
+                 fail_paths=(), mature_every=3, results_per_page=20, pages=3,
+                 no_results_pattern=r"(?i)invalid", seed=0):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free one
+            delays_ms: Added latency per request kind: html, static, api, media
+            jitter_ms: Random extra latency of up to this many ms
+            failure_rate: Fraction of API requests answered with HTTP 500
+            fail_paths: Regexes of paths that always answer with HTTP 500
+            mature_every: Every Nth channel shows the mature-content overlay (0 disables it)
+            results_per_page: Search results per page
+            pages: Pages of results before infinite scroll stops
+            no_results_pattern: Search terms matching this regex return no results
+            seed: Seed for jitter and failure injection, for reproducible runs
+        """
+        self.host = host
+        self.port = port
+        self.delays_ms = dict({"html": 0, "static": 0, "api": 0, "media": 0}, **(delays_ms or {}))
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.fail_paths = [re.compile(pattern) for pattern in fail_paths]
+        self.mature_every = mature_every
+        self.results_per_page = results_per_page
+        self.pages = pages
+        self.no_results_pattern = re.compile(no_results_pattern)
+        self.stats = {"requests": 0, "failures": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self._wav = _silent_wav()
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, section):
+        """Create a server from the 'standin' section of config.yaml"""
+        section = dict(section or {})
+        if "delays_ms" in section:
+            section["delays_ms"] = dict(section["delays_ms"])
+        if "fail_paths" in section:
+            section["fail_paths"] = list(section["fail_paths"])
+        return cls(**section)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread; returns self"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Stand-in site serving at {self.url}")
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def plan(self, kind, path):
+        """
+        Decide latency and injected failure for one request
+
+        Returns:
+            tuple: (delay in seconds, whether to fail)
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+            fail = any(pattern.search(path) for pattern in self.fail_paths) or (
+                kind == "api" and self.failure_rate and self._random.random() < self.failure_rate
+            )
+            if fail:
+                self.stats["failures"] += 1
+        return (self.delays_ms.get(kind, 0) + jitter) / 1000, fail
+
+    def search(self, term, page=1):
+        if not term.strip() or self.no_results_pattern.search(term):
+            return {"term": term, "results": [], "has_more": False}
+        start = (page - 1) * self.results_per_page
+        results = [self.channel(f"{term}-{index}", game=term) for index in range(start, start + self.results_per_page)]
+        return {"term": term, "results": results, "has_more": page < self.pages}
+
+    def suggest(self, term):
+        matches = [category for category in CATEGORIES if term.lower() in category.lower()]
+        return {"suggestions": [{"term": name} for name in ([term] + [m for m in matches if m != term])[:8]]}
+
+    def channel(self, channel_id, game=None):
+        # Keyed by slug so search results and channel pages agree on title and mature flag
+        slug = re.sub(r"[^a-z0-9]+", "_", channel_id.lower()).strip("_")
+        value = _digest(slug)
+        return {
+            "id": slug,
+            "channel": f"{slug}_tv",
+            "title": f"{slug}_tv live #{value % 1000}",
+            "game": game or CATEGORIES[value % len(CATEGORIES)],
+            "viewers": value % 50000,
+            "color": f"#{value % 0xFFFFFF:06x}",
+            "mature": bool(self.mature_every) and value % self.mature_every == 0
+        }
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            path = unquote(parts.path)
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+            if path.startswith("/api/"):
+                kind = "api"
+            elif path.startswith("/static/"):
+                kind = "static"
+            elif path.startswith("/media/"):
+                kind = "media"
+            else:
+                kind = "html"
+
+            delay, fail = server.plan(kind, path)
+            if delay:
+                time.sleep(delay)
+            if fail:
+                return self._send(500, b'{"error": "injected failure"}', ".json")
+
+            if kind == "api":
+                return self._api(path, query)
+            if kind == "static":
+                return self._static(os.path.basename(path))
+            if kind == "media":
+                return self._send(200, server._wav, ".wav")
+            if path == "/favicon.ico":
+                return self._send(204, b"", ".html")
+            return self._static("index.html")
+
+        def _api(self, path, query):
+            if path == "/api/search":
+                data = server.search(query.get("term", ""), int(query.get("page", 1)))
+            elif path == "/api/suggest":
+                data = server.suggest(query.get("term", ""))
+            elif path == "/api/featured":
+                data = {"results": [server.channel(f"featured-{index}") for index in range(8)]}
+            elif path == "/api/categories":
+                data = {"categories": CATEGORIES}
+            elif path.startswith("/api/channel/"):
+                data = server.channel(path[len("/api/channel/"):])
+            else:
+                return self._send(404, b'{"error": "not found"}', ".json")
+            return self._send(200, json.dumps(data).encode("utf-8"), ".json")
+
+        def _static(self, name):
+            file_path = os.path.join(SITE_DIR, name)
+            if not os.path.isfile(file_path):
+                return self._send(404, b"not found", ".html")
+            with open(file_path, "rb") as f:
+                return self._send(200, f.read(), os.path.splitext(name)[1])
+
+        def _send(self, status, body, extension):
+            self.send_response(status)
+            self.send_header("Content-Type", _CONTENT_TYPES.get(extension, "application/octet-stream"))
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            server.logger.debug(format % args)
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the local Twitch stand-in site")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--api-delay", type=int, default=0, help="Added latency for API requests in ms")
+    parser.add_argument("--html-delay", type=int, default=0, help="Added latency for page loads in ms")
+    parser.add_argument("--jitter", type=int, default=0, help="Random extra latency of up to this many ms")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of API requests that fail")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = StandinServer(host=args.host, port=args.port, jitter_ms=args.jitter, failure_rate=args.failure_rate,
+                           delays_ms={"api": args.api_delay, "html": args.html_delay}).start()
+    print(f"Serving the stand-in site at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+// Single-page stand-in for the parts of the Twitch mobile site the page objects use.
+// Routes: /  /directory  /search?term=  /videos/<id>  /<channel>
+(function () {
+    const root = document.getElementById('root');
+    const MAX_RETRIES = 2;
+    let renderId = 0;
+
+    function escapeHtml(value) {
+        return String(value).replace(/[&<>"']/g, (c) => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+    }
+
+    // Retries injected server failures the way the real client retries GQL errors
+    async function api(path, attempt) {
+        attempt = attempt || 0;
+        const response = await fetch(path);
+        if (!response.ok) {
+            if (attempt < MAX_RETRIES) return api(path, attempt + 1);
+            throw new Error(`${path} failed with ${response.status}`);
+        }
+        return response.json();
+    }
+
+    function navigate(url) {
+        history.pushState(null, '', url);
+        render();
+    }
+
+    function showConsentBanner() {
+        if (document.cookie.includes('consent-banner=') || document.querySelector('.consent-banner')) return;
+        const banner = document.createElement('div');
+        banner.className = 'consent-banner';
+        banner.id = 'consent-banner';
+        banner.innerHTML = '<p>We use cookies to improve your experience.</p>' +
+            '<button class="consent-accept" data-a-target="consent-banner-accept" data-consent-banner="accept">Accept</button>';
+        banner.querySelector('button').addEventListener('click', () => {
+            document.cookie = 'consent-banner=2; path=/';
+            banner.remove();
+        });
+        document.body.appendChild(banner);
+    }
+
+    function showAppPromo() {
+        if (sessionStorage.getItem('app-promo-dismissed') || document.querySelector('.app-promo-banner')) return;
+        const promo = document.createElement('div');
+        promo.className = 'app-promo-banner';
+        promo.innerHTML = '<p>Twitch is better in the app</p><button data-a-target="dismiss-button">Not now</button>';
+        promo.querySelector('button').addEventListener('click', () => {
+            sessionStorage.setItem('app-promo-dismissed', '1');
+            promo.remove();
+        });
+        document.body.appendChild(promo);
+    }
+
+    function channelLink(result, attributes) {
+        return `<a href="/videos/${result.id}" ${attributes}>` +
+            `<div class="search-result-card" data-a-target="search-result-card">` +
+            `<div class="thumbnail" style="background:${result.color}"></div>` +
+            `<div><p class="title">${escapeHtml(result.title)}</p>` +
+            `<p>${escapeHtml(result.channel)} &middot; ${escapeHtml(result.game)} &middot; ${result.viewers} viewers</p></div>` +
+            `</div></a>`;
+    }
+
+    function searchForm(term) {
+        return '<form class="search-form" role="search">' +
+            `<input type="search" data-a-target="tw-input" aria-label="Search Input" placeholder="Search" autocomplete="off" value="${escapeHtml(term || '')}">` +
+            '<button type="submit" data-a-target="search-submit-button">Search</button>' +
+            '</form><div class="search-suggestions"></div>';
+    }
+
+    function bindSearchForm() {
+        const form = root.querySelector('.search-form');
+        const input = form.querySelector('input');
+        const suggestions = root.querySelector('.search-suggestions');
+        let timer = null;
+
+        form.addEventListener('submit', (event) => {
+            event.preventDefault();
+            navigate('/search?term=' + encodeURIComponent(input.value));
+        });
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const term = input.value.trim();
+                if (!term) { suggestions.innerHTML = ''; return; }
+                const data = await api('/api/suggest?term=' + encodeURIComponent(term));
+                if (input.value.trim() !== term) return;
+                suggestions.innerHTML = data.suggestions.map((s) =>
+                    `<a href="/search?term=${encodeURIComponent(s.term)}" class="search-result__suggestion" ` +
+                    `data-test-selector="search-suggestion" data-a-target="search-result-item">${escapeHtml(s.term)}</a>`
+                ).join('');
+            }, 150);
+        });
+    }
+
+    async function renderHome(id) {
+        root.innerHTML = '<h2>Recommended channels</h2><div class="featured-list"></div>';
+        showAppPromo();
+        const data = await api('/api/featured');
+        if (id !== renderId) return;
+        root.querySelector('.featured-list').innerHTML = data.results.map((result) =>
+            `<div data-test-selector="recommended-channel">${channelLink(result, 'data-a-target="featured-channel-link"')}</div>`
+        ).join('');
+    }
+
+    async function renderDirectory(id) {
+        root.innerHTML = searchForm('') + '<h2>Categories</h2><div class="categories"></div>';
+        bindSearchForm();
+        const data = await api('/api/categories');
+        if (id !== renderId) return;
+        root.querySelector('.categories').innerHTML = data.categories.map((category) =>
+            `<a href="/directory/game/${encodeURIComponent(category)}" data-a-target="category-link">${escapeHtml(category)}</a>`
+        ).join('<br>');
+    }
+
+    async function renderSearch(id) {
+        const term = new URLSearchParams(location.search).get('term') || '';
+        root.innerHTML = searchForm(term) + '<div class="results"></div>';
+        bindSearchForm();
+        if (!term) return;
+
+        const container = root.querySelector('.results');
+        let page = 1, loading = false, hasMore = true;
+        const loadPage = async () => {
+            loading = true;
+            let data;
+            try {
+                data = await api(`/api/search?term=${encodeURIComponent(term)}&page=${page}`);
+            } catch (error) {
+                container.insertAdjacentHTML('beforeend', `<p class="error">${escapeHtml(error.message)}</p>`);
+                hasMore = false;
+                return;
+            } finally {
+                loading = false;
+            }
+            if (id !== renderId) return;
+            if (page === 1 && !data.results.length) {
+                container.innerHTML = '<div class="tw-align-items-center tw-flex tw-flex-col no-results">' +
+                    `<p>No results for "${escapeHtml(term)}"</p></div>`;
+                hasMore = false;
+                return;
+            }
+            let list = container.querySelector('.search-results-list');
+            if (!list) {
+                container.innerHTML = '<div class="search-results-list"></div>';
+                list = container.querySelector('.search-results-list');
+            }
+            // TitleLinks must stay direct siblings: select_streamer picks them with :nth-child
+            list.insertAdjacentHTML('beforeend', data.results.map((result) =>
+                channelLink(result, 'data-test-selector="TitleLink" data-a-target="search-result-card-link"')
+            ).join(''));
+            hasMore = data.has_more;
+            page += 1;
+        };
+
+        window.onscroll = () => {
+            if (hasMore && !loading && window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) loadPage();
+        };
+        await loadPage();
+    }
+
+    async function renderChannel(id, channelId) {
+        root.innerHTML = '<div data-test-selector="channel-root"><div class="video-player__container" data-a-target="video-player"></div></div>';
+        const data = await api('/api/channel/' + encodeURIComponent(channelId));
+        if (id !== renderId) return;
+
+        const channel = root.querySelector('[data-test-selector="channel-root"]');
+        const player = channel.querySelector('.video-player__container');
+        player.innerHTML = '<video muted playsinline loop src="/media/stream.wav"></video>';
+        channel.insertAdjacentHTML('beforeend',
+            `<h1 data-a-target="stream-title">${escapeHtml(data.title)}</h1>` +
+            `<p>${escapeHtml(data.channel)}</p>` +
+            `<div data-a-target="viewers-count">${data.viewers}</div>` +
+            '<button data-a-target="follow-button">Follow</button>' +
+            '<button data-a-target="subscribe-button">Subscribe</button>');
+
+        const video = player.querySelector('video');
+        if (data.mature) {
+            player.insertAdjacentHTML('beforeend', '<div class="player-overlay-mature">' +
+                '<p>The broadcaster indicated that the channel is intended for mature audiences.</p>' +
+                '<button data-a-target="player-overlay-mature-accept" data-test-selector="mature-accept-button">Start Watching</button></div>');
+            player.querySelector('.player-overlay-mature button').addEventListener('click', (event) => {
+                event.target.parentElement.remove();
+                video.play();
+            });
+        } else {
+            video.play().catch(() => {});
+        }
+    }
+
+    async function render() {
+        const id = ++renderId;
+        window.onscroll = null;
+        showConsentBanner();
+        const path = location.pathname;
+        try {
+            if (path === '/') await renderHome(id);
+            else if (path === '/directory' || path.startsWith('/directory/')) await renderDirectory(id);
+            else if (path === '/search') await renderSearch(id);
+            else if (path.startsWith('/videos/')) await renderChannel(id, path.slice('/videos/'.length));
+            else await renderChannel(id, path.slice(1));
+        } catch (error) {
+            if (id === renderId) root.insertAdjacentHTML('beforeend', `<p class="error">${escapeHtml(error.message)}</p>`);
+        }
+    }
+
+    // Same-origin links navigate inside the app like the real SPA
+    document.addEventListener('click', (event) => {
+        const link = event.target.closest('a');
+        if (!link || link.origin !== location.origin || event.defaultPrevented) return;
+        event.preventDefault();
+        navigate(link.pathname + link.search);
+    });
+    document.querySelector('[data-a-target="header-search-button"]').addEventListener('click', () => navigate('/search'));
+    window.addEventListener('popstate', render);
+    render();
+})();
@@ -0,0 +1,68 @@
+import statistics
+
+
+class StepBudgetWarning(UserWarning):
+    """Warning for a test step that exceeded its budget or regressed against its baseline"""
+    pass
+
+
+def resolve_budgets(test_name, budget_config, marker_budgets=None):
+    """
+    Merge configured and marker-declared budgets for a test
+
+    Args:
+        test_name: Test function name without parameters
+        budget_config: The 'step_budgets' section of config.yaml
+        marker_budgets: Budgets from @pytest.mark.step_budget, which take precedence
+
+    Returns:
+        dict: step name -> budget in seconds
+    """
+    budgets = {str(step): float(seconds) for step, seconds in budget_config.get('tests', {}).get(test_name, {}).items()}
+    budgets.update({str(step): float(seconds) for step, seconds in (marker_budgets or {}).items()})
+    return budgets
+
+
+def evaluate_steps(steps, budgets, baseline_samples, regression_factor=1.5, min_samples=3):
+    """
+    Check step durations against budgets and against their rolling baseline
+
+    Args:
+        steps: step name -> measured seconds
+        budgets: step name -> budget seconds
+        baseline_samples: step name -> recent durations from previous runs
+        regression_factor: A step slower than factor x its baseline median is a regression
+        min_samples: Samples required before a baseline is trusted
+
+    Returns:
+        list: One dict per step with duration, budget, baseline and status
+            ('ok', 'over_budget' or 'regression')
+    """
+    results = []
+    for step, duration in steps.items():
+        samples = baseline_samples.get(step, [])
+        baseline = statistics.median(samples) if len(samples) >= min_samples else None
+        budget = budgets.get(step)
+
+        status = "ok"
+        if budget is not None and duration > budget:
+            status = "over_budget"
+        elif baseline is not None and duration > baseline * regression_factor:
+            status = "regression"
+
+        results.append({
+            "step": step,
+            "seconds": round(duration, 3),
+            "budget": budget,
+            "baseline": baseline,
+            "status": status
+        })
+    return results
+
+
+def describe(result):
+    """Return a one-line description of a step that is over budget or regressed"""
+    if result["status"] == "over_budget":
+        return f"Step '{result['step']}' took {result['seconds']:.2f}s, budget is {result['budget']:.2f}s"
+    return (f"Step '{result['step']}' took {result['seconds']:.2f}s, "
+            f"regressed from a baseline of {result['baseline']:.2f}s")
@@ -0,0 +1,122 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+from utils import PROJECT_ROOT, get_worker_id
+
+HISTORY_DIR = os.path.join(PROJECT_ROOT, "reports", "history")
+DEFAULT_HISTORY_PATH = os.path.join(HISTORY_DIR, "durations.json")
+
+
+def history_path_for_worker(worker_id=None):
+    """Return the history file a process should write to (one per parallel worker)"""
+    worker_id = get_worker_id() if worker_id is None else worker_id
+    if not worker_id:
+        return DEFAULT_HISTORY_PATH
+    return os.path.join(HISTORY_DIR, f"durations_{worker_id}.json")
+
+
+class DurationHistory:
+    """Local store of per-test and per-step durations used for scheduling and budgets"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, max_samples=10, load=True):
+        """
+        Args:
+            path: JSON file backing the history
+            max_samples: Number of most recent samples kept per test and per step
+            load: Whether to read existing samples from path
+        """
+        self.path = path
+        self.max_samples = max_samples
+        self.tests = {}
+        # Whether samples were added since the history was created
+        self.dirty = False
+        if load:
+            self.load()
+
+    def load(self):
+        """Read samples from disk, ignoring a missing or unreadable file"""
+        try:
+            with open(self.path, 'r') as f:
+                self.tests = json.load(f).get("tests", {})
+        except (OSError, ValueError):
+            self.tests = {}
+        return self
+
+    def save(self):
+        """Write samples to disk atomically"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"updated_at": time.time(), "tests": self.tests}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record(self, test_id, duration, steps=None):
+        """
+        Append a duration sample for a test
+
+        Args:
+            test_id: pytest node id
+            duration: Total test duration in seconds (setup + call + teardown)
+            steps: Optional mapping of step name -> duration in seconds
+        """
+        self.dirty = True
+        entry = self.tests.setdefault(test_id, {"durations": [], "steps": {}})
+        entry["durations"] = (entry["durations"] + [round(duration, 3)])[-self.max_samples:]
+        for step, step_duration in (steps or {}).items():
+            samples = entry["steps"].get(step, [])
+            entry["steps"][step] = (samples + [round(step_duration, 3)])[-self.max_samples:]
+
+    def merge(self, other):
+        """Append all samples from another history (e.g. a parallel worker's file)
+
+        Step samples are merged per step name: a run that skipped a step has no
+        sample for it, so step lists are not aligned with the test durations.
+        """
+        for test_id, entry in other.tests.items():
+            self.dirty = True
+            merged = self.tests.setdefault(test_id, {"durations": [], "steps": {}})
+            merged["durations"] = (merged["durations"] + entry["durations"])[-self.max_samples:]
+            for step, samples in entry["steps"].items():
+                merged["steps"][step] = (merged["steps"].get(step, []) + samples)[-self.max_samples:]
+
+    def estimate(self, test_id, default=None):
+        """Return the median of recent durations for a test, or default when unknown"""
+        durations = self.tests.get(test_id, {}).get("durations")
+        return statistics.median(durations) if durations else default
+
+    def step_samples(self, test_id, step):
+        """Return recent duration samples for one step of a test"""
+        return list(self.tests.get(test_id, {}).get("steps", {}).get(str(step), []))
+
+
+class StepTimer:
+    """Collects named step durations for the test that is currently running"""
+
+    def __init__(self):
+        self.steps = {}
+        self._current = None
+
+    def start(self, step):
+        """Finish the running step (if any) and start timing a new one"""
+        self.finish()
+        self._current = (str(step), time.time())
+
+    def finish(self):
+        """Stop timing the running step"""
+        if self._current is not None:
+            step, started = self._current
+            self.steps[step] = self.steps.get(step, 0.0) + time.time() - started
+            self._current = None
+
+    def collect(self):
+        """Return and clear the durations gathered for the current test"""
+        self.finish()
+        steps, self.steps = self.steps, {}
+        return steps
+
+
+# Shared by log_step, the BDD step hooks and the reporting hooks in conftest
+step_timer = StepTimer()
@@ -0,0 +1,284 @@
+"""Record/replay of browser traffic through DevTools Fetch interception.
+
+In record mode every response a scenario receives is stored in a content-addressed
+archive: bodies are saved once per SHA-256 digest under ``blobs/`` and each scenario
+has an index mapping requests to status, headers, body digest and observed latency.
+In replay mode the same requests are fulfilled from the archive without touching
+the network, optionally with the recorded or a fixed latency.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from utils.cdp_events import CdpSession
+
+MODES = ("live", "record", "replay")
+
+# Headers describing the wire encoding; recorded bodies are stored decoded
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def archive_name(test_name, params=None):
+    """Return a filesystem-safe archive name for a test and its parameters"""
+    values = []
+    for value in (params or {}).values():
+        values.extend(value.values() if isinstance(value, dict) else [value])
+    name = "-".join([test_name] + [str(value) for value in values])
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+
+
+def _post_data(request):
+    if request.get("postData"):
+        return request["postData"]
+    entries = request.get("postDataEntries") or []
+    return "".join(base64.b64decode(entry.get("bytes", "")).decode("utf-8", "replace") for entry in entries)
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class TrafficArchive:
+    """Content-addressed store of recorded responses for one scenario"""
+
+    def __init__(self, root, name, ignore_params=()):
+        """
+        Args:
+            root: Archive directory shared by all scenarios
+            name: Scenario name, see archive_name()
+            ignore_params: Query parameters left out of request matching (cache busters)
+        """
+        self.root = root
+        self.name = name
+        self.ignore_params = set(ignore_params)
+        self.index_path = os.path.join(root, "scenarios", f"{name}.json")
+        self.entries = {}
+        self._loose = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def load(self):
+        """Load the scenario index; returns self for chaining"""
+        with open(self.index_path, 'r') as f:
+            self.entries = json.load(f)["entries"]
+        self._loose = {}
+        for key, entry in self.entries.items():
+            self._loose.setdefault(entry["loose"], []).append(key)
+        return self
+
+    def keys(self, method, url, post_data=""):
+        """
+        Return (exact, loose) match keys for a request
+
+        The exact key covers method, normalised URL and body; the loose key leaves the
+        body out so requests with volatile payloads can still be matched.
+        """
+        parts = urlsplit(url)
+        query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                           if k not in self.ignore_params])
+        loose = f"{method} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+        exact = hashlib.sha256(f"{loose}\n{post_data or ''}".encode("utf-8")).hexdigest()
+        return exact, loose
+
+    def add(self, method, url, post_data, status, headers, body, latency_ms):
+        """Store one response; repeated requests keep every response in order"""
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            _atomic_write(blob_path, body)
+
+        exact, loose = self.keys(method, url, post_data)
+        response = {
+            "status": status,
+            "headers": [h for h in headers if h["name"].lower() not in _DROPPED_HEADERS],
+            "body": digest,
+            "latency_ms": round(latency_ms, 1)
+        }
+        with self._lock:
+            entry = self.entries.setdefault(exact, {"method": method, "url": url, "loose": loose, "responses": []})
+            entry["responses"].append(response)
+            if exact not in self._loose.setdefault(loose, []):
+                self._loose[loose].append(exact)
+
+    def lookup(self, method, url, post_data=""):
+        """
+        Return the next recorded response for a request, or None if it was never recorded
+
+        Responses to a repeated request are served in recorded order; the last one
+        is repeated once they run out.
+        """
+        exact, loose = self.keys(method, url, post_data)
+        with self._lock:
+            if exact in self.entries:
+                responses, cursor_key = self.entries[exact]["responses"], exact
+            elif loose in self._loose:
+                responses = [r for key in self._loose[loose] for r in self.entries[key]["responses"]]
+                cursor_key = loose
+            else:
+                return None
+            index = self._cursors.get(cursor_key, 0)
+            self._cursors[cursor_key] = index + 1
+            return responses[min(index, len(responses) - 1)]
+
+    def body(self, digest):
+        with open(self._blob_path(digest), 'rb') as f:
+            return f.read()
+
+    def save(self):
+        """Write the scenario index (blobs are written as they are recorded)"""
+        with self._lock:
+            data = json.dumps({"version": 1, "name": self.name, "entries": self.entries}, indent=2)
+        _atomic_write(self.index_path, data.encode("utf-8"))
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+
+class TrafficInterceptor:
+    """Records page traffic into, or replays it from, a TrafficArchive"""
+
+    def __init__(self, driver, archive, mode, latency=0, on_miss="fail"):
+        """
+        Args:
+            driver: Chrome WebDriver
+            archive: TrafficArchive for the scenario (loaded for replay)
+            mode: 'record' or 'replay'
+            latency: Replay delay in ms, or 'recorded' to reuse the observed latency
+            on_miss: 'fail' to fail unrecorded requests as offline, 'live' to let them through
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Traffic mode '{mode}' cannot intercept, expected 'record' or 'replay'")
+        self.driver = driver
+        self.archive = archive
+        self.mode = mode
+        self.latency = latency
+        self.on_miss = on_miss
+        self.stats = {"recorded": 0, "served": 0, "missed": 0}
+        self.missed_urls = []
+        self.session = None
+        self._started = {}
+        # Events are handled on the session's thread pool
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        """Connect to the page and start intercepting every request"""
+        self.session = CdpSession(self.driver)
+        # Cached and service-worker responses never reach Fetch, so bypass both
+        self.session.send("Network.enable")
+        self.session.send("Network.setCacheDisabled", {"cacheDisabled": True})
+        self.session.send("Network.setBypassServiceWorker", {"bypass": True})
+
+        if self.mode == "record":
+            self.session.on("Fetch.requestPaused", self._on_record)
+            patterns = [{"urlPattern": "*", "requestStage": "Request"}, {"urlPattern": "*", "requestStage": "Response"}]
+        else:
+            self.session.on("Fetch.requestPaused", self._on_replay)
+            patterns = [{"urlPattern": "*", "requestStage": "Request"}]
+        self.session.send("Fetch.enable", {"patterns": patterns})
+        self.logger.info(f"Traffic {self.mode} started for archive '{self.archive.name}'")
+        return self
+
+    def stop(self):
+        """
+        Stop intercepting; in record mode the scenario index is saved
+
+        Returns:
+            dict: recorded, served and missed request counts
+        """
+        try:
+            self.session.send("Fetch.disable")
+            self.session.send("Network.setCacheDisabled", {"cacheDisabled": False})
+            self.session.send("Network.setBypassServiceWorker", {"bypass": False})
+        except Exception as e:
+            self.logger.debug(f"Failed to disable interception: {str(e)}")
+        finally:
+            self.session.close()
+        if self.mode == "record":
+            self.archive.save()
+        with self._lock:
+            stats, missed_urls = dict(self.stats), list(self.missed_urls)
+        if missed_urls:
+            self.logger.warning(f"{stats['missed']} requests missing from archive '{self.archive.name}', "
+                                f"e.g. {missed_urls[:5]}")
+        return stats
+
+    def _on_record(self, event):
+        request_id = event["requestId"]
+        request_key = event.get("networkId", request_id)
+        if "responseStatusCode" not in event and "responseErrorReason" not in event:
+            self._started[request_key] = time.perf_counter()
+            self.session.send("Fetch.continueRequest", {"requestId": request_id}, wait=False)
+            return
+
+        started = self._started.pop(request_key, None)
+        if "responseErrorReason" in event:
+            self.session.send("Fetch.continueRequest", {"requestId": request_id}, wait=False)
+            return
+
+        status = event["responseStatusCode"]
+        body = b""
+        if not 300 <= status < 400:
+            try:
+                result = self.session.send("Fetch.getResponseBody", {"requestId": request_id})
+                body = base64.b64decode(result["body"]) if result.get("base64Encoded") else result["body"].encode("utf-8")
+            except RuntimeError as e:
+                self.logger.debug(f"No body recorded for {event['request']['url']}: {str(e)}")
+
+        request = event["request"]
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        self.archive.add(request["method"], request["url"], _post_data(request), status,
+                         event.get("responseHeaders", []), body, latency_ms)
+        with self._lock:
+            self.stats["recorded"] += 1
+        self.session.send("Fetch.continueRequest", {"requestId": request_id}, wait=False)
+
+    def _on_replay(self, event):
+        request = event["request"]
+        response = self.archive.lookup(request["method"], request["url"], _post_data(request))
+        if response is None:
+            with self._lock:
+                self.stats["missed"] += 1
+                if len(self.missed_urls) < 50:
+                    self.missed_urls.append(request["url"])
+            if self.on_miss == "live":
+                self.session.send("Fetch.continueRequest", {"requestId": event["requestId"]}, wait=False)
+            else:
+                self.session.send("Fetch.failRequest", {"requestId": event["requestId"],
+                                                        "errorReason": "InternetDisconnected"}, wait=False)
+            return
+
+        with self._lock:
+            self.stats["served"] += 1
+        delay_ms = response["latency_ms"] if self.latency == "recorded" else float(self.latency or 0)
+        if delay_ms > 0:
+            # A timer keeps handler threads free while responses are held back
+            threading.Timer(delay_ms / 1000, self._fulfill, args=(event["requestId"], response)).start()
+        else:
+            self._fulfill(event["requestId"], response)
+
+    def _fulfill(self, request_id, response):
+        try:
+            self.session.send("Fetch.fulfillRequest", {
+                "requestId": request_id,
+                "responseCode": response["status"],
+                "responseHeaders": response["headers"],
+                "body": base64.b64encode(self.archive.body(response["body"])).decode("ascii")
+            }, wait=False)
+        except Exception as e:
+            self.logger.debug(f"Failed to fulfill request {request_id}: {str(e)}")
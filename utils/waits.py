@@ -1,11 +1,163 @@
+from contextlib import contextmanager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 
+# The async scripts below always call back on their own (at the latest when their
+# timeout elapses), so they resolve as soon as the browser signals the condition.
+
+# Resolves on 'scrollend', or once the scroll position is unchanged for 3 animation frames
+SCROLL_END_SCRIPT = """
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+let finished = false;
+const finish = (reason) => { if (!finished) { finished = true; done(reason); } };
+
+let lastX = window.scrollX, lastY = window.scrollY, stableFrames = 0;
+function check() {
+    if (finished) return;
+    if (window.scrollX === lastX && window.scrollY === lastY) {
+        if (++stableFrames >= 3) return finish('stable');
+    } else {
+        stableFrames = 0;
+        lastX = window.scrollX;
+        lastY = window.scrollY;
+    }
+    requestAnimationFrame(check);
+}
+window.addEventListener('scrollend', () => finish('scrollend'), {once: true});
+requestAnimationFrame(check);
+setTimeout(() => finish('timeout'), timeoutMs);
+"""
+
+# Installed once per document (at document start in Chrome, otherwise on first use).
+# Tracks the last DOM mutation and every in-flight fetch/XHR in window.__aqaIdle.
+IDLE_MONITOR_SCRIPT = """
+(function () {
+    if (window.__aqaIdle) return;
+    const state = window.__aqaIdle = {lastActivity: performance.now(), requests: new Map(), nextId: 0};
+    const touch = () => { state.lastActivity = performance.now(); };
+    const begin = (url) => { const id = ++state.nextId; state.requests.set(id, {url: String(url), start: performance.now()}); touch(); return id; };
+    const end = (id) => { state.requests.delete(id); touch(); };
+
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            const id = begin(typeof input === 'string' ? input : (input && input.url) || '');
+            return originalFetch.apply(this, arguments).finally(() => end(id));
+        };
+    }
+
+    const originalOpen = XMLHttpRequest.prototype.open;
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__aqaUrl = url;
+        return originalOpen.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        const id = begin(this.__aqaUrl || '');
+        this.addEventListener('loadend', () => end(id), {once: true});
+        return originalSend.apply(this, arguments);
+    };
+
+    // Attribute changes are ignored: animated widgets toggle them constantly
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true, characterData: true});
+})();
+"""
+
+# Resolves once the document is loaded, no tracked request is in flight and nothing
+# has mutated for idleMs. Requests older than maxRequestMs (long polling, streaming)
+# or matching ignorePattern do not keep the page busy.
+DOM_IDLE_SCRIPT = IDLE_MONITOR_SCRIPT + """
+const idleMs = arguments[0], timeoutMs = arguments[1], ignorePattern = arguments[2], maxRequestMs = arguments[3];
+const done = arguments[arguments.length - 1];
+const state = window.__aqaIdle;
+const ignore = ignorePattern ? new RegExp(ignorePattern) : null;
+const started = performance.now();
+
+function pendingRequests(now) {
+    let pending = 0;
+    state.requests.forEach((request) => {
+        if (now - request.start < maxRequestMs && !(ignore && ignore.test(request.url))) pending++;
+    });
+    return pending;
+}
+
+function check() {
+    const now = performance.now();
+    const pending = pendingRequests(now);
+    const quietFor = now - state.lastActivity;
+    if (document.readyState === 'complete' && pending === 0 && quietFor >= idleMs) {
+        return done({state: 'idle', waited_ms: now - started});
+    }
+    if (now - started >= timeoutMs) {
+        return done({state: 'timeout', waited_ms: now - started, pending_requests: pending, quiet_ms: quietFor});
+    }
+    setTimeout(check, 50);
+}
+check();
+"""
+
+# Video segments, playlists and analytics beacons never stop on a live channel page
+DEFAULT_IDLE_IGNORE = r"\.(ts|m3u8|mp4)(\?|$)|usher\.|video-edge|spade\.|countess\.|doubleclick|google-analytics"
+
+# Resolves once a <video> (inside the optional container selector) can play or is playing
+VIDEO_READY_SCRIPT = """
+const containerSelector = arguments[0], timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+let finished = false, observer = null;
+const finish = (reason) => { if (!finished) { finished = true; if (observer) observer.disconnect(); done(reason); } };
+
+function watch() {
+    const root = containerSelector ? document.querySelector(containerSelector) : document;
+    const video = root && root.querySelector('video');
+    if (!video) return false;
+    if (!video.paused && video.readyState >= 3) { finish('playing'); return true; }
+    if (video.readyState >= 3) { finish('ready'); return true; }
+    video.addEventListener('playing', () => finish('playing'), {once: true});
+    video.addEventListener('canplay', () => finish('ready'), {once: true});
+    return true;
+}
+if (!watch()) {
+    observer = new MutationObserver(() => { if (watch()) observer.disconnect(); });
+    observer.observe(document, {childList: true, subtree: true});
+}
+setTimeout(() => finish('timeout'), timeoutMs);
+"""
+
 
 class WaitUtils:
     """Custom wait utilities for more robust element interaction"""
     
+    @staticmethod
+    def set_implicit_wait(driver, seconds):
+        """
+        Set the driver's implicit wait and remember it on the driver
+        
+        Every find_element(s) miss blocks for the implicit wait, so the driver fixture
+        keeps it at 0 and only implicit_wait() raises it for a block of code.
+        """
+        driver.implicitly_wait(seconds)
+        driver._aqa_implicit_wait = seconds
+    
+    @staticmethod
+    @contextmanager
+    def implicit_wait(driver, seconds):
+        """
+        Apply an implicit wait for the duration of a with-block, then restore the previous one
+        
+        Nothing is sent to the driver when the wait is already set to the requested value.
+        """
+        previous = getattr(driver, '_aqa_implicit_wait', 0)
+        if previous == seconds:
+            yield
+            return
+        WaitUtils.set_implicit_wait(driver, seconds)
+        try:
+            yield
+        finally:
+            WaitUtils.set_implicit_wait(driver, previous)
+    
     @staticmethod
     def wait_for_element_visible(driver, locator, timeout=10):
         """Wait for an element to be visible"""
@@ -47,4 +199,47 @@ class WaitUtils:
         """Wait with custom ignored exceptions for flaky elements"""
         ignored_exceptions = (StaleElementReferenceException,)
         wait = WebDriverWait(driver, timeout, ignored_exceptions=ignored_exceptions)
-        return wait.until(condition_method(locator)) 
\ No newline at end of file
+        return wait.until(condition_method(locator)) 
+    
+    @staticmethod
+    def wait_for_scroll_end(driver, timeout=5):
+        """
+        Wait until the current scroll (smooth or instant) has finished
+        
+        Returns:
+            str: 'scrollend', 'stable' or 'timeout'
+        """
+        return driver.execute_async_script(SCROLL_END_SCRIPT, int(timeout * 1000))
+    
+    @staticmethod
+    def wait_for_dom_idle(driver, idle_ms=500, timeout=10, ignore_pattern=DEFAULT_IDLE_IGNORE, max_request_ms=5000):
+        """
+        Wait until the page is loaded and quiet: no DOM mutations and no fetch/XHR in flight
+        
+        The whole wait runs inside the browser, so it costs a single WebDriver round trip.
+        
+        Args:
+            idle_ms: How long the page must stay quiet, in milliseconds
+            timeout: Maximum time to wait in seconds
+            ignore_pattern: Regex of request URLs that never keep the page busy
+            max_request_ms: Requests running longer than this are treated as background traffic
+            
+        Returns:
+            dict: {'state': 'idle' | 'timeout', 'waited_ms': ...} plus pending details on timeout
+        """
+        return driver.execute_async_script(
+            DOM_IDLE_SCRIPT, idle_ms, int(timeout * 1000), ignore_pattern, max_request_ms
+        )
+    
+    @staticmethod
+    def wait_for_video_ready(driver, container_selector=None, timeout=10):
+        """
+        Wait until a video element can play (readyState >= HAVE_FUTURE_DATA) or is playing
+        
+        Args:
+            container_selector: CSS selector of the player container to look in (optional)
+            
+        Returns:
+            str: 'playing', 'ready' or 'timeout'
+        """
+        return driver.execute_async_script(VIDEO_READY_SCRIPT, container_selector, int(timeout * 1000))
@@ -0,0 +1,167 @@
+import datetime
+import json
+import logging
+import os
+import time
+import allure
+from utils import PROJECT_ROOT, get_worker_id
+
+METRICS_DIR = os.path.join(PROJECT_ROOT, "reports", "metrics")
+
+# Installed at document start in Chrome (see DriverFactory) and on first collection elsewhere.
+# Buffered observers also replay entries recorded before the script ran.
+VITALS_OBSERVER_SCRIPT = """
+(function () {
+    if (window.__aqaVitals || !window.PerformanceObserver) return;
+    const vitals = window.__aqaVitals = {lcp: null, cls: 0, inp: null, tbt: 0, long_tasks: 0};
+    const observe = (type, callback, options) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback))
+                .observe(Object.assign({type: type, buffered: true}, options || {}));
+        } catch (e) { /* entry type not supported by this browser */ }
+    };
+    observe('largest-contentful-paint', (entry) => { vitals.lcp = entry.renderTime || entry.loadTime || entry.startTime; });
+    observe('layout-shift', (entry) => { if (!entry.hadRecentInput) vitals.cls += entry.value; });
+    observe('event', (entry) => {
+        if (entry.interactionId) vitals.inp = Math.max(vitals.inp || 0, entry.duration);
+    }, {durationThreshold: 40});
+    observe('longtask', (entry) => { vitals.long_tasks++; vitals.tbt += Math.max(0, entry.duration - 50); });
+})();
+"""
+
+# Marks the start of a same-document (pushState) navigation. The next collection
+# reports only what happened after the mark instead of the document's first load.
+MARK_SOFT_NAVIGATION_SCRIPT = VITALS_OBSERVER_SCRIPT + """
+const vitals = window.__aqaVitals;
+window.__aqaSoftNav = {
+    start: performance.now(),
+    cls: vitals ? vitals.cls : 0,
+    tbt: vitals ? vitals.tbt : 0,
+    long_tasks: vitals ? vitals.long_tasks : 0
+};
+if (vitals) vitals.inp = null;
+"""
+
+COLLECT_SCRIPT = VITALS_OBSERVER_SCRIPT + """
+// A hard navigation replaces the document, so a mark left here means the route changed in place
+const soft = window.__aqaSoftNav || null;
+delete window.__aqaSoftNav;
+const since = soft ? soft.start : 0;
+const vitals = window.__aqaVitals;
+const navigation = soft ? null : performance.getEntriesByType('navigation')[0];
+const paint = {};
+performance.getEntriesByType('paint').forEach((entry) => { paint[entry.name] = entry.startTime; });
+
+const resources = {};
+let totalBytes = 0;
+performance.getEntriesByType('resource').forEach((entry) => {
+    if (entry.startTime < since) return;
+    const summary = resources[entry.initiatorType] = resources[entry.initiatorType] || {count: 0, transfer_bytes: 0, duration_ms: 0};
+    summary.count++;
+    summary.transfer_bytes += entry.transferSize || 0;
+    summary.duration_ms += entry.duration;
+    totalBytes += entry.transferSize || 0;
+});
+
+return {
+    url: location.href,
+    navigation_type: soft ? 'soft' : 'hard',
+    soft_navigation_ms: soft ? performance.now() - soft.start : null,
+    viewport: {width: window.innerWidth, height: window.innerHeight, device_pixel_ratio: window.devicePixelRatio},
+    navigation: navigation ? {
+        type: navigation.type,
+        ttfb_ms: navigation.responseStart - navigation.startTime,
+        dom_content_loaded_ms: navigation.domContentLoadedEventEnd - navigation.startTime,
+        load_ms: navigation.loadEventEnd - navigation.startTime,
+        transfer_bytes: navigation.transferSize
+    } : null,
+    // Paint entries and LCP describe the document's first load only
+    fcp_ms: soft ? null : paint['first-contentful-paint'] || null,
+    lcp_ms: vitals && !soft ? vitals.lcp : null,
+    cls: vitals ? vitals.cls - (soft ? soft.cls : 0) : null,
+    inp_ms: vitals ? vitals.inp : null,
+    tbt_ms: vitals ? vitals.tbt - (soft ? soft.tbt : 0) : null,
+    long_tasks: vitals ? vitals.long_tasks - (soft ? soft.long_tasks : 0) : null,
+    resources: resources,
+    resource_transfer_bytes: totalBytes,
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null
+};
+"""
+
+
+class WebVitalsCollector:
+    """Collects Navigation Timing, resource timing and Web Vitals after page-object navigations
+
+    Single-page-app route changes (history.pushState) keep the document, so its
+    Navigation Timing entry and LCP still describe the first load. Call
+    mark_soft_navigation() before triggering such a route change: the next sample
+    is then tagged as a soft navigation and only counts what happened after the mark.
+    """
+
+    def __init__(self, output_dir=METRICS_DIR, enabled=True):
+        """
+        Args:
+            output_dir: Directory for the per-run time-series files
+            enabled: Whether collect() gathers anything
+        """
+        run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        worker_suffix = f"_{get_worker_id()}" if get_worker_id() else ""
+        self.output_path = os.path.join(output_dir, f"web_vitals_{run_id}{worker_suffix}.jsonl")
+        self.enabled = enabled
+        # Extra fields stored with every sample, e.g. device and test id (set by conftest)
+        self.context = {}
+        self.logger = logging.getLogger(__name__)
+
+    def mark_soft_navigation(self, driver):
+        """
+        Mark the start of an in-page route change, right before the click that triggers it
+
+        Args:
+            driver: WebDriver showing the page the navigation starts from
+        """
+        if not self.enabled:
+            return
+        try:
+            driver.execute_script(MARK_SOFT_NAVIGATION_SCRIPT)
+        except Exception as e:
+            self.logger.warning(f"Failed to mark soft navigation: {str(e)}")
+
+    def collect(self, driver, label):
+        """
+        Read the metrics of the current page, append them to the run's time series
+        and attach them to the Allure report
+
+        Args:
+            driver: WebDriver showing the page to measure
+            label: Name of the navigation, e.g. 'home' or 'streamer'
+
+        Returns:
+            dict: The collected sample, or None if collection is disabled or failed
+        """
+        if not self.enabled:
+            return None
+        try:
+            metrics = driver.execute_script(COLLECT_SCRIPT)
+        except Exception as e:
+            self.logger.warning(f"Failed to collect web vitals for '{label}': {str(e)}")
+            return None
+
+        sample = dict(self.context, timestamp=time.time(), label=label, **metrics)
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        with open(self.output_path, 'a') as f:
+            f.write(json.dumps(sample) + "\n")
+
+        allure.attach(
+            json.dumps(sample, indent=2),
+            name=f"Web vitals: {label}",
+            attachment_type=allure.attachment_type.JSON
+        )
+        self.logger.info(
+            f"Web vitals for '{label}' ({sample['navigation_type']} navigation): LCP {sample['lcp_ms']} ms, CLS {sample['cls']}, "
+            f"TBT {sample['tbt_ms']} ms, {sample['resource_transfer_bytes']} bytes"
+        )
+        return sample
+
+
+# Shared collector; enabled/disabled from the web_vitals section of config.yaml by conftest
+web_vitals_collector = WebVitalsCollector()